@@ -2,9 +2,11 @@ from django.contrib import admin
 from django.utils.html import format_html
 from .models import Article
 from django.utils.safestring import mark_safe
+from cms.admin import FullTextSearchMixin
+from cms.renditions import rendition_url
 
 @admin.register(Article)
-class ArticleAdmin(admin.ModelAdmin):
+class ArticleAdmin(FullTextSearchMixin, admin.ModelAdmin):
     # Fields to show in the list view
     list_display = (
         'title',
@@ -35,7 +37,7 @@ class ArticleAdmin(admin.ModelAdmin):
     # Filters on the right sidebar
     list_filter = ('show_on_homepage', 'is_active', 'created_at')
     
-    # Searchable fields
+    # Searchable fields (full-text index on SQLite, icontains elsewhere)
     search_fields = ('title', 'subtitle', 'content')
     
     # Auto-generate slug from title
@@ -44,10 +46,13 @@ class ArticleAdmin(admin.ModelAdmin):
     # Readonly fields in admin form
     readonly_fields = ('image_thumb',)
     
-    # Function to show image thumbnail
+    # Function to show image thumbnail (a 50px rendition, 100px on high-DPI screens)
     def image_thumb(self, obj):
         if obj.image:
-            return format_html('<img src="{}" width="50" style="object-fit: cover;"/>', obj.image.url)
+            return format_html(
+                '<img src="{}" srcset="{} 2x" width="50" style="object-fit: cover;"/>',
+                rendition_url(obj.image, 50, 50), rendition_url(obj.image, 100, 100),
+            )
         return "-"
     image_thumb.short_description = "Image"
     
@@ -1,10 +1,10 @@
 from django import forms
 from .models import Article
 from django.utils.text import slugify
+from cms.slugs import unique_slug
 from ckeditor_uploader.widgets import CKEditorUploadingWidget
 from django.core.exceptions import ValidationError
-from django.conf import settings
-from PIL import Image as PILImage
+from cms.images import validate_image
 
 
 class ArticleForm(forms.ModelForm):
@@ -53,62 +53,8 @@ class ArticleForm(forms.ModelForm):
         if not hasattr(image, 'file'):
             return image
         
-        # Get validation settings
-        max_size = getattr(settings, 'IMAGE_MAX_FILE_SIZE', 2 * 1024 * 1024)
-        allowed_extensions = getattr(settings, 'IMAGE_ALLOWED_EXTENSIONS', ['jpg', 'jpeg', 'png', 'gif', 'webp','heic'])
-        max_dimensions = getattr(settings, 'IMAGE_MAX_DIMENSIONS', (1920, 1280))
-        allowed_mimetypes = getattr(settings, 'IMAGE_ALLOWED_MIMETYPES', [
-            'image/jpeg', 'image/png', 'image/gif', 'image/webp','image/heic'
-        ])
-        
-        # 1. File size check
-        if image.size > max_size:
-            raise ValidationError(
-                f"Image file too large. Maximum size is {max_size/(1024*1024):.0f}MB. "
-                f"Your file is {image.size / (1024*1024):.1f}MB"
-            )
-        
-        # 2. File extension check
-        file_extension = image.name.split('.')[-1].lower()
-        if file_extension not in allowed_extensions:
-            raise ValidationError(
-                f"Invalid file type '.{file_extension}'. Allowed types: {', '.join(allowed_extensions)}"
-            )
-        
-        # 3. Verify it's actually a valid image file
-        try:
-            img = PILImage.open(image)
-            img.verify()
-            image.seek(0)
-        except Exception:
-            raise ValidationError(
-                "Invalid image file. The file may be corrupted or not a real image."
-            )
-        
-        # 4. Check image dimensions
-        try:
-            img = PILImage.open(image)
-            width, height = img.size
-            
-            max_width, max_height = max_dimensions
-            if width > max_width or height > max_height:
-                raise ValidationError(
-                    f"Image dimensions too large. Maximum is {max_width}x{max_height}px. "
-                    f"Your image is {width}x{height}px"
-                )
-            
-            image.seek(0)
-        except Exception as e:
-            if isinstance(e, ValidationError):
-                raise
-            raise ValidationError("Could not read image dimensions")
-        
-        # 5. MIME type check
-        if hasattr(image, 'content_type'):
-            if image.content_type not in allowed_mimetypes:
-                raise ValidationError(
-                    f"Invalid image format '{image.content_type}'. Allowed: JPEG, PNG, GIF, WebP , HEIC"
-                )
+        # Cheap checks first, one header read for the size, full decode off-thread
+        validate_image(image)
         
         return image
 
@@ -128,14 +74,12 @@ class ArticleForm(forms.ModelForm):
         if not slug:
             raise ValidationError("Slug cannot be empty. Please provide a title or slug.")
         
-        # Check for duplicate slugs in database
-        qs = Article.objects.filter(slug=slug)
-        if self.instance.pk:
-            qs = qs.exclude(pk=self.instance.pk)
-        
-        if qs.exists():
+        # One query: the slug itself if free, otherwise the next free <slug>-N
+        free_slug = unique_slug(Article, slug, exclude_pk=self.instance.pk)
+        if free_slug != slug:
+            # Also when it came from the title: the author picks, we only suggest
             raise ValidationError(
-                f"The slug '{slug}' is already in use. Please choose a different one."
+                f"The slug '{slug}' is already in use. Try '{free_slug}' or choose a different one."
             )
         
         return slug
@@ -0,0 +1,41 @@
+# Generated by Django 6.0 on 2026-10-18 13:57
+
+import ckeditor_uploader.fields
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Article',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255)),
+                ('subtitle', models.CharField(blank=True, max_length=255)),
+                ('slug', models.SlugField(blank=True, unique=True)),
+                ('image', models.ImageField(blank=True, null=True, upload_to='articles/')),
+                ('content', ckeditor_uploader.fields.RichTextUploadingField()),
+                ('show_on_homepage', models.BooleanField(default=False)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('meta_title', models.CharField(blank=True, max_length=60)),
+                ('meta_description', models.TextField(blank=True, max_length=160)),
+                ('meta_keywords', models.CharField(blank=True, max_length=205)),
+                ('author', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['position'],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 6.0 on 2026-10-18 15:20
+
+from django.db import migrations
+
+
+def backfill_rich_text(apps, schema_editor):
+    # Rows saved before 0003 have no sanitized copy yet; the templates and
+    # the API only read content_html / content_text
+    from cms.sanitize import render_rich_text
+
+    Article = apps.get_model('articles', 'Article')
+    queryset = Article.objects.filter(content_html='').exclude(content='').order_by('pk')
+    last_pk = 0
+    while True:
+        objs = list(queryset.filter(pk__gt=last_pk).only('pk', 'content')[:500])
+        if not objs:
+            return
+        for obj in objs:
+            obj.content_html, obj.content_text = render_rich_text(obj.content)
+        Article.objects.bulk_update(objs, ['content_html', 'content_text'])
+        last_pk = objs[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0003_rich_text_columns'),
+    ]
+
+    # The search index is populated from content_text
+    run_before = [
+        ('cms', '0008_populate_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rich_text, migrations.RunPython.noop),
+    ]
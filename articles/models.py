@@ -1,10 +1,12 @@
 import os
 from django.db import models
-from django.db.models import Max
 from django.contrib.auth.models import User
 from django.utils.text import slugify
 from ckeditor_uploader.fields import RichTextUploadingField
 from django.db import transaction  # ✅ Add this import
+from cms.ordering import PositionedManager, reserve_positions
+from cms.sanitize import update_rich_text
+from cms.slugs import save_with_unique_slug
 
 
 class Article(models.Model):
@@ -14,6 +16,9 @@ class Article(models.Model):
 
     image = models.ImageField(upload_to='articles/', blank=True, null=True)
     content = RichTextUploadingField(blank=False)
+    # Sanitized copy of `content` and its plain text, kept in step on save (cms.sanitize)
+    content_html = models.TextField(blank=True, editable=False)
+    content_text = models.TextField(blank=True, editable=False)
     show_on_homepage = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
    
@@ -23,6 +28,8 @@ class Article(models.Model):
 
     position = models.PositiveIntegerField(default=0)
 
+    objects = PositionedManager()
+
     meta_title = models.CharField(
         max_length=60, 
         blank=True, 
@@ -40,28 +47,35 @@ class Article(models.Model):
 
     class Meta:
         ordering = ['position']
+        indexes = [
+            # Keyset pages and the default ordering: (position, id)
+            models.Index(fields=['position', 'id'], name='article_position_idx'),
+            # List pages always filter on the homepage flag first
+            models.Index(fields=['show_on_homepage', 'position', 'id'], name='article_homepage_pos_idx'),
+            # Public pages only ever read active rows
+            models.Index(
+                fields=['show_on_homepage', 'position'],
+                condition=models.Q(is_active=True),
+                name='article_active_pos_idx',
+            ),
+        ]
         
     def save(self, *args, **kwargs):
         # ✅ FIX: Wrap position logic in atomic transaction
+        # Re-sanitize only when the content changed
+        kwargs['update_fields'] = update_rich_text(self, kwargs.get('update_fields'))
+
         with transaction.atomic():
             if not self.id or self.position == 0:
-                # ✅ FIX: Use select_for_update() to lock and prevent race condition
-                last_pos = Article.objects.select_for_update().aggregate(
-                    Max('position')
-                )['position__max']
-                self.position = (last_pos or 0) + 1
-            
-            # Unique Slug Logic
+                # Next slot from the per-model sequence: one counter update, no MAX() scan
+                self.position = reserve_positions(Article)
+
+            # Unique Slug Logic: one query, retried if another writer wins the race
             if not self.slug:
                 base_slug = slugify(self.title, allow_unicode=True)
-                slug = base_slug
-                counter = 1
-                while Article.objects.filter(slug=slug).exists():
-                    slug = f"{base_slug}-{counter}"
-                    counter += 1
-                self.slug = slug
-            
-            super().save(*args, **kwargs)
+                save_with_unique_slug(self, base_slug, lambda: super(Article, self).save(*args, **kwargs))
+            else:
+                super().save(*args, **kwargs)
 
     def __str__(self):
         return self.title
\ No newline at end of file
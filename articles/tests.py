@@ -1,3 +1,168 @@
+from django.db import transaction
 from django.test import TestCase
 
-# Create your tests here.
+from cms.ordering import move_item
+from cms.revisions import compact, get_revision, latest_revision, revisions_for
+from cms.slugs import get_slug_index, unique_slug, unique_slugs
+from .forms import ArticleForm
+from .models import Article
+
+
+class MoveItemTests(TestCase):
+    def test_move_before_first_item_survives_save(self):
+        first = Article.objects.create(title="A", content="a")
+        second = Article.objects.create(title="B", content="b")
+        Article.objects.filter(pk=first.pk).update(position=1)
+
+        move_item(Article, second.pk, first.pk, 'before')
+        second.refresh_from_db()
+        self.assertGreater(second.position, 0)
+
+        second.title = "B edited"
+        second.save()
+        order = list(Article.objects.order_by('position', 'pk').values_list('pk', flat=True))
+        self.assertEqual(order, [second.pk, first.pk])
+
+    def test_move_after_last_item_takes_a_fresh_slot(self):
+        first = Article.objects.create(title="A", content="a")
+        second = Article.objects.create(title="B", content="b")
+        move_item(Article, first.pk, second.pk, 'after')
+        third = Article.objects.create(title="C", content="c")
+        order = list(Article.objects.order_by('position', 'pk').values_list('pk', flat=True))
+        self.assertEqual(order, [second.pk, first.pk, third.pk])
+
+    def test_move_without_a_gap_rebalances(self):
+        items = [Article.objects.create(title=t, content=t) for t in "ABC"]
+        for position, item in enumerate(items, start=1):
+            Article.objects.filter(pk=item.pk).update(position=position)
+        move_item(Article, items[2].pk, items[1].pk, 'before')
+        order = list(Article.objects.order_by('position', 'pk').values_list('pk', flat=True))
+        self.assertEqual(order, [items[0].pk, items[2].pk, items[1].pk])
+        positions = list(Article.objects.order_by('position').values_list('position', flat=True))
+        self.assertTrue(all(b - a >= 2 for a, b in zip(positions, positions[1:])))
+
+    def test_bad_place_and_missing_rows(self):
+        item = Article.objects.create(title="A", content="a")
+        with self.assertRaises(ValueError):
+            move_item(Article, item.pk, item.pk, 'inside')
+        with self.assertRaises(Article.DoesNotExist):
+            move_item(Article, item.pk, item.pk + 1000, 'before')
+
+
+class UniqueSlugTests(TestCase):
+    def test_collisions_get_the_next_number(self):
+        slugs = [Article.objects.create(title="Weekly update", content="x").slug for _ in range(3)]
+        self.assertEqual(slugs, ["weekly-update", "weekly-update-1", "weekly-update-2"])
+        self.assertEqual(unique_slug(Article, "weekly-update"), "weekly-update-3")
+
+    def test_own_slug_is_free_when_excluded(self):
+        article = Article.objects.create(title="Weekly update", content="x")
+        self.assertEqual(unique_slug(Article, article.slug, exclude_pk=article.pk), article.slug)
+
+    def test_batch_never_repeats_a_slug(self):
+        Article.objects.create(title="News", content="x")
+        self.assertEqual(unique_slugs(Article, ["news", "news", "other"]), ["news-1", "news-2", "other"])
+
+    def test_long_base_is_shortened_for_the_suffix(self):
+        max_length = Article._meta.get_field('slug').max_length
+        article = Article.objects.create(title="a" * max_length, content="x")
+        slug = unique_slug(Article, article.slug)
+        self.assertLessEqual(len(slug), max_length)
+        self.assertNotEqual(slug, article.slug)
+
+
+    def test_non_ascii_digit_suffixes_are_ignored(self):
+        Article.objects.create(title="Report", content="x")
+        Article.objects.create(title="Report", content="x", slug="report-\u00b2")
+        Article.objects.create(title="Report", content="x", slug="report-\u0663")
+        self.assertEqual(unique_slug(Article, "report"), "report-1")
+
+    def test_index_suggests_what_unique_slug_allocates(self):
+        for slug in ("news", "news-1", "news-3"):
+            Article.objects.create(title="News", content="x", slug=slug)
+        index = get_slug_index(Article)
+        index.invalidate()
+        self.assertEqual(index.suggest("news"), unique_slug(Article, "news"))
+        self.assertEqual(index.suggest("news"), "news-4")
+        self.assertEqual(index.suggest("fresh"), "fresh")
+
+class ArticleFormSlugTests(TestCase):
+    def form(self, **data):
+        return ArticleForm(data={'title': "Weekly update", 'content': "<p>x</p>", 'slug': '', **data})
+
+    def test_taken_slug_from_the_title_is_an_error(self):
+        Article.objects.create(title="Weekly update", content="x")
+        form = self.form()
+        self.assertFalse(form.is_valid())
+        self.assertIn("'weekly-update' is already in use. Try 'weekly-update-1'", form.errors['slug'][0])
+
+    def test_taken_slug_typed_in_is_an_error(self):
+        Article.objects.create(title="Other", content="x", slug="custom")
+        self.assertIn('slug', self.form(slug="Custom").errors)
+
+    def test_free_slug_and_own_slug_pass(self):
+        form = self.form()
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data['slug'], "weekly-update")
+        article = form.save()
+        edit = ArticleForm(data={'title': "Weekly update", 'content': "<p>y</p>", 'slug': article.slug}, instance=article)
+        self.assertTrue(edit.is_valid(), edit.errors)
+
+class SlugIndexTests(TestCase):
+    def setUp(self):
+        self.index = get_slug_index(Article)
+        self.index.invalidate()
+
+    def test_committed_writes_reach_the_index(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            article = Article.objects.create(title="Launch", content="x")
+        self.assertTrue(self.index.is_taken("launch"))
+        with self.captureOnCommitCallbacks(execute=True):
+            article.delete()
+        self.assertFalse(self.index.is_taken("launch"))
+
+    def test_rolled_back_create_leaves_the_slug_free(self):
+        self.assertFalse(self.index.is_taken("ghost"))
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            Article.objects.create(title="Ghost", content="x")
+            raise RuntimeError
+        self.assertFalse(self.index.is_taken("ghost"))
+
+    def test_rolled_back_delete_keeps_the_slug_taken(self):
+        article = Article.objects.create(title="Keeper", content="x")
+        self.assertTrue(self.index.is_taken("keeper"))
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            article.delete()
+            raise RuntimeError
+        self.assertTrue(self.index.is_taken("keeper"))
+
+class RevisionTests(TestCase):
+    def test_every_revision_replays_to_what_was_saved(self):
+        article = Article.objects.create(title="Draft", content="<p>One.</p>")
+        saved = [{"title": "Draft", "content": "<p>One.</p>"}]
+        for step in range(1, 6):
+            article.content += f"<p>Line {step}. More text.</p>"
+            article.save()
+            saved.append({"title": "Draft", "content": article.content})
+
+        number, latest = latest_revision(Article, article.pk)
+        self.assertEqual((number, latest), (len(saved), saved[-1]))
+        for number, values in enumerate(saved, start=1):
+            self.assertEqual(get_revision(Article, article.pk, number), values)
+        self.assertIsNone(get_revision(Article, article.pk, len(saved) + 1))
+
+    def test_unchanged_save_records_nothing(self):
+        article = Article.objects.create(title="Draft", content="<p>One.</p>")
+        article.save()
+        self.assertEqual(revisions_for(Article, article.pk).count(), 1)
+
+    def test_compact_keeps_the_newest_revisions_replayable(self):
+        article = Article.objects.create(title="Draft", content="<p>0</p>")
+        for step in range(1, 6):
+            article.content = f"<p>{step}</p>"
+            article.save()
+        deleted, _rewritten = compact(Article, article.pk, keep=2)
+        self.assertEqual(deleted, 4)
+        self.assertEqual(get_revision(Article, article.pk, 6)["content"], "<p>5</p>")
+        self.assertEqual(get_revision(Article, article.pk, 5)["content"], "<p>4</p>")
+        self.assertIsNone(get_revision(Article, article.pk, 4))
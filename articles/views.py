@@ -4,62 +4,123 @@ from .models import Article
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
 from django.views.decorators.csrf import ensure_csrf_cookie
-from django.core.paginator import Paginator
-from django.db.models import Q
-from django.template.loader import render_to_string
-from django.http import HttpResponse
+from cms.listing import (
+    InvalidCursor, cached_count, cached_partial_response, cursor_page, filter_params, filter_queryset,
+)
+from django.template.loader import get_template, render_to_string
+from django.http import StreamingHttpResponse
 from django.urls import reverse
 
 
+# Rows are rendered in chunks of this size when streaming "show all"
+STREAM_CHUNK_SIZE = 500
+ROWS_MARKER = '<!--article-rows-->'
+
+
+def _page_url(request, **params):
+    """Current list URL with the cursor params replaced"""
+    query = request.GET.copy()
+    for key in ('after', 'before', 'page'):
+        query.pop(key, None)
+    for key, value in params.items():
+        query[key] = value
+    return f"?{query.urlencode()}"
+
+
+def _stream_rows(request, template_name, context, queryset):
+    """
+    Render the page once with a marker where the rows go, then stream the
+    rows between the two halves straight off a server-side cursor, so "show
+    all" never holds every article in memory.
+    """
+    head, tail = render_to_string(template_name, context, request=request).split(ROWS_MARKER, 1)
+    rows_template = get_template('articles/_list_rows.html')
+
+    def generate():
+        yield head
+        chunk = []
+        streamed = False
+        for article in queryset.iterator(chunk_size=STREAM_CHUNK_SIZE):
+            chunk.append(article)
+            if len(chunk) >= STREAM_CHUNK_SIZE:
+                yield rows_template.render({'articles': chunk}, request)
+                chunk = []
+                streamed = True
+        if chunk or not streamed:
+            yield rows_template.render({'articles': chunk}, request)
+        yield tail
+
+    return StreamingHttpResponse(generate(), content_type='text/html; charset=utf-8')
+
+
+def _page_context(request, articles_qs, per_page):
+    """Rows, cursors and total for one keyset page of the list"""
+    # Keyset pagination on (position, id): no OFFSET, so deep pages cost the same
+    try:
+        articles, next_cursor, prev_cursor = cursor_page(
+            articles_qs, ('position', 'id'),
+            after=request.GET.get('after'), before=request.GET.get('before'), limit=per_page,
+        )
+    except InvalidCursor:
+        articles, next_cursor, prev_cursor = cursor_page(articles_qs, ('position', 'id'), limit=per_page)
+
+    return {
+        'articles': articles,
+        'per_page': per_page,
+        # Total is cached per content version instead of a COUNT(*) per request
+        'total': cached_count('article', articles_qs, request.GET),
+        'next_url': _page_url(request, after=next_cursor) if next_cursor else None,
+        'prev_url': _page_url(request, before=prev_cursor) if prev_cursor else None,
+    }
+
+
 @ensure_csrf_cookie
 @login_required
 def article_list(request):
-    articles_qs = Article.objects.select_related('author').order_by('position')
+    # Only the columns the list renders
+    articles_qs = Article.objects.only('id', 'title', 'slug', 'is_active', 'position')
     
-    # Search
-    query = request.GET.get('q', '')
-    if query:
-        articles_qs = articles_qs.filter(
-            Q(title__icontains=query) | Q(slug__icontains=query)
-        )
+    # Search + homepage filter (shared with filter-based bulk actions)
+    articles_qs = filter_queryset('article', articles_qs, request.GET)
     
-    # Homepage filter
-    homepage_filter = request.GET.get('homepage', 'no')
-    if homepage_filter == 'yes':
-        articles_qs = articles_qs.filter(show_on_homepage=True)
-    else:
-        articles_qs = articles_qs.filter(show_on_homepage=False)
+    is_ajax = request.headers.get('x-requested-with') == 'XMLHttpRequest'
+    template_name = 'articles/_list_partial.html' if is_ajax else 'articles/list.html'
     
     # Per page
     per_page = request.GET.get('per_page', '10')
     if per_page == 'all':
-        per_page = articles_qs.count()  # show everything
-    else:
-        try:
-            per_page = int(per_page)
-            if per_page < 1:
-                per_page = 10
-            elif per_page > 100:
-                per_page = 100
-        except ValueError:
+        context = {
+            'streaming': True,
+            'rows_marker': ROWS_MARKER,
+            'per_page': per_page,
+            'total': cached_count('article', articles_qs, request.GET),
+        }
+        return _stream_rows(request, template_name, context, articles_qs.order_by('position', 'id'))
+
+    try:
+        per_page = int(per_page)
+        if per_page < 1:
             per_page = 10
+        elif per_page > 100:
+            per_page = 100
+    except ValueError:
+        per_page = 10
     
-    # Paginate results
-    paginator = Paginator(articles_qs, per_page)
-    page_obj = paginator.get_page(request.GET.get('page'))
-    
-    context = {
-        'articles': page_obj,
-        'page_obj': page_obj,
-        'per_page': per_page,
-    }
-    
-    # If this is an AJAX request, return only the list partial HTML
-    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-        html = render_to_string('articles/_list_partial.html', context, request=request)
-        return HttpResponse(html)
+    # If this is an AJAX request, return only the list partial HTML: cached
+    # per content version, so unchanged navigation skips the query and render
+    if is_ajax:
+        params = {
+            **filter_params('article', request.GET),
+            'per_page': per_page,
+            'after': request.GET.get('after', ''),
+            'before': request.GET.get('before', ''),
+        }
+        return cached_partial_response(
+            request, Article, params,
+            lambda: render_to_string(template_name, _page_context(request, articles_qs, per_page), request=request),
+        )
     
-    return render(request, 'articles/list.html', context)
+    return render(request, template_name, _page_context(request, articles_qs, per_page))
 
 
 @login_required
@@ -1,3 +1,17 @@
 from django.contrib import admin
 
 # Register your models here.
+from .models import Blog
+from cms.admin import FullTextSearchMixin
+
+
+@admin.register(Blog)
+class BlogAdmin(FullTextSearchMixin, admin.ModelAdmin):
+    list_display = ('title', 'slug', 'homepage', 'active', 'position')
+    list_display_links = ('title', 'slug')
+    list_filter = ('homepage', 'active')
+
+    # Searchable fields (full-text index on SQLite, icontains elsewhere)
+    search_fields = ('title', 'subtitle')
+
+    prepopulated_fields = {"slug": ("title",)}
@@ -2,6 +2,7 @@ from django import forms
 from .models import Blog
 from django.core.exceptions import ValidationError
 from django.utils.text import slugify
+from cms.slugs import unique_slug
 
 class BlogForm(forms.ModelForm):
     class Meta:
@@ -32,14 +33,12 @@ class BlogForm(forms.ModelForm):
         if not slug:
             raise ValidationError("Slug cannot be empty. Please provide a title or slug.")
         
-        # Check for duplicate slugs in database
-        qs = Blog.objects.filter(slug=slug)
-        if self.instance.pk:
-            qs = qs.exclude(pk=self.instance.pk)
-        
-        if qs.exists():
+        # One query: the slug itself if free, otherwise the next free <slug>-N
+        free_slug = unique_slug(Blog, slug, exclude_pk=self.instance.pk)
+        if free_slug != slug:
+            # Also when it came from the title: the author picks, we only suggest
             raise ValidationError(
-                f"The slug '{slug}' is already in use. Please choose a different one."
+                f"The slug '{slug}' is already in use. Try '{free_slug}' or choose a different one."
             )
         
         return slug
@@ -0,0 +1,25 @@
+# Generated by Django 6.0 on 2026-10-18 13:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['position', 'id'], name='blog_position_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['homepage', 'position', 'id'], name='blog_homepage_pos_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(condition=models.Q(('active', True)), fields=['homepage', 'position'], name='blog_active_pos_idx'),
+        ),
+    ]
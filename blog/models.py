@@ -1,6 +1,8 @@
 from django.db import models,transaction
 from django.utils.text import slugify
-from django.db.models import Max
+from cms.ordering import PositionedManager, reserve_positions
+from cms.sanitize import update_rich_text
+from cms.slugs import save_with_unique_slug
 
 # Create your models here.
 class Blog(models.Model):
@@ -8,35 +10,48 @@ class Blog(models.Model):
     slug = models.SlugField(unique=True, blank=True)
     subtitle = models.CharField(max_length=255, blank=True)
     content = models.TextField(blank=True)
+    # Sanitized copy of `content` and its plain text, kept in step on save (cms.sanitize)
+    content_html = models.TextField(blank=True, editable=False)
+    content_text = models.TextField(blank=True, editable=False)
     active = models.BooleanField(default=True)
     homepage = models.BooleanField(default=False)
     position = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = PositionedManager()
 
     class Meta:
         ordering = ['position']
+        indexes = [
+            # Keyset pages and the default ordering: (position, id)
+            models.Index(fields=['position', 'id'], name='blog_position_idx'),
+            # The list page always filters on the homepage flag first
+            models.Index(fields=['homepage', 'position', 'id'], name='blog_homepage_pos_idx'),
+            # Public pages only ever read active rows
+            models.Index(
+                fields=['homepage', 'position'],
+                condition=models.Q(active=True),
+                name='blog_active_pos_idx',
+            ),
+        ]
     
 
     def save(self, *args, **kwargs):
+        # Re-sanitize only when the content changed
+        kwargs['update_fields'] = update_rich_text(self, kwargs.get('update_fields'))
+
     # ✅ FIX: Wrap position logic in atomic transaction
         with transaction.atomic():
             if not self.id or self.position == 0:
-                # ✅ FIX: Use select_for_update() to lock and prevent race condition
-                last_pos = Blog.objects.select_for_update().aggregate(
-                    Max('position')
-                )['position__max']
-                self.position = (last_pos or 0) + 1
-            
-            # Unique Slug Logic
+                # Next slot from the per-model sequence: one counter update, no MAX() scan
+                self.position = reserve_positions(Blog)
+
+            # Unique Slug Logic: one query, retried if another writer wins the race
             if not self.slug:
                 base_slug = slugify(self.title, allow_unicode=True)
-                slug = base_slug
-                counter = 1
-                while Blog.objects.filter(slug=slug).exists():
-                    slug = f"{base_slug}-{counter}"
-                    counter += 1
-                self.slug = slug
-            
-            super().save(*args, **kwargs)
+                save_with_unique_slug(self, base_slug, lambda: super(Blog, self).save(*args, **kwargs))
+            else:
+                super().save(*args, **kwargs)
 
 
     def __str__(self):
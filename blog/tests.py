@@ -1,3 +1,88 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
 
-# Create your tests here.
+from cms.listing import InvalidCursor, cursor_page, encode_cursor, keyset_page
+from .forms import BlogForm
+from .models import Blog
+
+
+class CursorPageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.pks = [Blog.objects.create(title=f"Post {i}").pk for i in range(7)]
+
+    def test_next_and_prev_round_trip(self):
+        queryset = Blog.objects.all()
+        keys = ('position', 'id')
+        pages, after = [], None
+        while True:
+            rows, next_cursor, prev_cursor = cursor_page(queryset, keys, after=after, limit=3)
+            pages.append(([row.pk for row in rows], prev_cursor))
+            if not next_cursor:
+                break
+            after = next_cursor
+
+        self.assertEqual([pk for page, _ in pages for pk in page], self.pks)
+        self.assertIsNone(pages[0][1])
+        # Walking back from the last page gives the same pages in reverse
+        prev_cursor = pages[-1][1]
+        for expected, _ in reversed(pages[:-1]):
+            rows, _next, prev_cursor = cursor_page(queryset, keys, before=prev_cursor, limit=3)
+            self.assertEqual([row.pk for row in rows], expected)
+        self.assertIsNone(prev_cursor)
+
+    def test_rows_added_between_pages_are_not_repeated(self):
+        queryset = Blog.objects.all()
+        rows, cursor = keyset_page(queryset, ('position', 'id'), limit=4)
+        Blog.objects.create(title="Late post")
+        more, _cursor = keyset_page(queryset, ('position', 'id'), cursor=cursor, limit=10)
+        self.assertFalse({row.pk for row in rows} & {row.pk for row in more})
+        self.assertEqual(len(rows) + len(more), len(self.pks) + 1)
+
+    def test_malformed_cursors_are_rejected(self):
+        for cursor in ("not-base64!", encode_cursor([1]), encode_cursor(["a", 1])):
+            with self.assertRaises(InvalidCursor):
+                cursor_page(Blog.objects.all(), ('position', 'id'), after=cursor)
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class BlogListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('editor', password='secret')
+        for i in range(5):
+            Blog.objects.create(title=f"Post {i}")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_json_pages_follow_the_cursor(self):
+        url = reverse('blog_list')
+        first = self.client.get(url, {'format': 'json', 'per_page': 3}).json()
+        second = self.client.get(url, {'format': 'json', 'per_page': 3, 'after': first['next']}).json()
+        self.assertEqual(first['total'], 5)
+        self.assertEqual(len(first['results']) + len(second['results']), 5)
+        self.assertIsNone(second['next'])
+
+    def test_bad_cursor_falls_back_to_the_first_page(self):
+        response = self.client.get(reverse('blog_list'), {'format': 'json', 'after': 'garbage'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 5)
+
+    def test_filter_is_remembered_in_a_cookie(self):
+        response = self.client.get(reverse('blog_list'), {'homepage': '1'})
+        self.assertEqual(response.cookies['blog_homepage'].value, '1')
+
+
+class BlogFormSlugTests(TestCase):
+    def test_taken_slug_from_the_title_is_an_error(self):
+        Blog.objects.create(title="Release notes")
+        form = BlogForm(data={'title': "Release notes", 'slug': '', 'active': True})
+        self.assertFalse(form.is_valid())
+        self.assertIn("Try 'release-notes-1'", form.errors['slug'][0])
+
+    def test_free_slug_from_the_title_passes(self):
+        form = BlogForm(data={'title': "Release notes", 'slug': '', 'active': True})
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data['slug'], "release-notes")
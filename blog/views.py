@@ -3,38 +3,116 @@ from .models import Blog
 from .forms import BlogForm
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import get_object_or_404
-
-
-
+from django.http import JsonResponse
+from django.template.loader import render_to_string
+from django.views.decorators.csrf import ensure_csrf_cookie
+from cms.listing import (
+    InvalidCursor, cached_count, cached_partial_response, cursor_page, filter_params, filter_queryset,
+)
+
+
+
+# The homepage filter lives in the URL; the last choice is remembered in a
+# cookie (not the DB session) for visits without it
+FILTER_COOKIE = 'blog_homepage'
+FILTER_VALUES = ('0', '1')
+PER_PAGE_CHOICES = (10, 20, 50, 100)
+# Columns the list renders (and the JSON variant returns)
+LIST_FIELDS = ['id', 'title', 'slug', 'active', 'homepage', 'position']
+
+
+def _homepage_filter(request):
+    """'1' (homepage) or '0' (inner page): from the URL, else the cookie, else '0'"""
+    for value in (request.GET.get('homepage'), request.COOKIES.get(FILTER_COOKIE)):
+        if value in FILTER_VALUES:
+            return value
+    return '0'
+
+
+def _page_url(query, **params):
+    """List URL for `query` with the cursor params replaced"""
+    query = query.copy()
+    for key in ('after', 'before'):
+        query.pop(key, None)
+    for key, value in params.items():
+        query[key] = value
+    return f"?{query.urlencode()}"
+
+
+def _page_context(query, blogs_qs, per_page):
+    """Rows, cursors and total for one keyset page of the list"""
+    try:
+        blogs, next_cursor, prev_cursor = cursor_page(
+            blogs_qs, ('position', 'id'),
+            after=query.get('after'), before=query.get('before'), limit=per_page,
+        )
+    except InvalidCursor:
+        blogs, next_cursor, prev_cursor = cursor_page(blogs_qs, ('position', 'id'), limit=per_page)
+
+    return {
+        'list': blogs,
+        'next_cursor': next_cursor,
+        'prev_cursor': prev_cursor,
+        'per_page': per_page,
+        'current_filter': query['homepage'],
+        'query': query.get('q', '').strip(),
+        # Total is cached per content version instead of a COUNT(*) per request
+        'total': cached_count('blog', blogs_qs, query),
+        'next_url': _page_url(query, after=next_cursor) if next_cursor else None,
+        'prev_url': _page_url(query, before=prev_cursor) if prev_cursor else None,
+    }
+
+
+@ensure_csrf_cookie
 @login_required
 def blog_list(request):
-    # 1. Capture the parameter if it exists in the URL
-    homepage_param = request.GET.get('homepage')
-    
-    if homepage_param is not None:
-        # Save the choice to the session
-        request.session['homepage_filter'] = homepage_param
-        # Redirect to the 'clean' URL (removes ?homepage=X from address bar)
-        return redirect('blog_list')
-
-    # 2. Get the value from session, default to '1' (Inner Page) if session is empty
-    current_filter = request.session.get('homepage_filter', '0')
-
-    # Filtering
-    blog = Blog.objects.filter(homepage=current_filter).order_by('position')
-    print("Session data:", dict(request.session))  
-
-    return render(request, 'blog/list.html', {
-        'list': blog, 
-        'current_filter': current_filter
-    })
+    # The resolved filter always goes into the query, so page links carry it
+    query = request.GET.copy()
+    query['homepage'] = _homepage_filter(request)
+
+    try:
+        per_page = int(query.get('per_page', PER_PAGE_CHOICES[0]))
+    except ValueError:
+        per_page = PER_PAGE_CHOICES[0]
+    per_page = min(max(per_page, 1), PER_PAGE_CHOICES[-1])
+
+    # Only the columns the list renders; search + homepage filter shared with bulk actions
+    blogs_qs = filter_queryset('blog', Blog.objects.only(*LIST_FIELDS), query)
+
+    is_ajax = request.headers.get('x-requested-with') == 'XMLHttpRequest'
+    if query.get('format') == 'json':
+        context = _page_context(query, blogs_qs, per_page)
+        response = JsonResponse({
+            'fields': LIST_FIELDS,
+            'results': [[getattr(blog, field) for field in LIST_FIELDS] for blog in context['list']],
+            'next': context['next_cursor'],
+            'prev': context['prev_cursor'],
+            'total': context['total'],
+        })
+    elif is_ajax:
+        # Cached per content version, so unchanged navigation skips the query and render
+        params = {
+            **filter_params('blog', query),
+            'per_page': per_page,
+            'after': query.get('after', ''),
+            'before': query.get('before', ''),
+        }
+        response = cached_partial_response(
+            request, Blog, params,
+            lambda: render_to_string('blog/_list_partial.html', _page_context(query, blogs_qs, per_page), request=request),
+        )
+    else:
+        response = render(request, 'blog/list.html', _page_context(query, blogs_qs, per_page))
+
+    if request.GET.get('homepage') in FILTER_VALUES and request.COOKIES.get(FILTER_COOKIE) != query['homepage']:
+        response.set_cookie(FILTER_COOKIE, query['homepage'], max_age=365 * 24 * 3600, samesite='Lax', httponly=True)
+    return response
 
 
 
 @login_required
 def create_blog(request):
-    session_filter = request.session.get('homepage_filter', '0')
-    homepage = (session_filter == '1')
+    homepage = _homepage_filter(request) == '1'
 
     if request.method == 'POST':
         form = BlogForm(request.POST)
@@ -59,15 +137,14 @@ def edit_blog(request, slug):
     # Retrieve the blog object or return 404 if not found
     blog = get_object_or_404(Blog, slug=slug)
 
-    # Get the session filter
-    session_filter = request.session.get('homepage_filter', '0')
-    homepage = (session_filter == '1')
+    # The list's current homepage filter
+    homepage = _homepage_filter(request) == '1'
 
     if request.method == 'POST':
         form = BlogForm(request.POST, instance=blog)
         if form.is_valid():
             blog = form.save(commit=False)
-            blog.homepage = homepage  # Ensure homepage matches session filter
+            blog.homepage = homepage  # Ensure homepage matches the list filter
             blog.save()
             return redirect('blog_list')
     else:
@@ -0,0 +1,28 @@
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+
+from .search import annotate_rank, search_enabled, search_filter
+
+
+class RankedChangeList(ChangeList):
+    """Orders full-text results by relevance unless a column sort was picked."""
+
+    def get_ordering(self, request, queryset):
+        if ORDER_VAR not in request.GET and 'search_rank' in queryset.query.annotations:
+            return ['search_rank', '-pk']
+        return super().get_ordering(request, queryset)
+
+
+class FullTextSearchMixin:
+    """
+    Changelist search through the FTS5 index instead of icontains over
+    search_fields, ranked by bm25.
+    """
+
+    def get_changelist(self, request, **kwargs):
+        return RankedChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip() or not search_enabled(self.model):
+            return super().get_search_results(request, queryset, search_term)
+        queryset = annotate_rank(search_filter(queryset, search_term), search_term, name='search_rank')
+        return queryset, False
@@ -0,0 +1,183 @@
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import require_GET
+
+from .homepage import get_snapshot
+from .listing import (
+    HOMEPAGE_FIELD_MAP,
+    InvalidCursor,
+    cached_json_response,
+    decode_cursor,
+    filter_queryset,
+    flag_filter,
+    keyset_fields,
+    keyset_page,
+    public_row,
+)
+from .views import ACTIVE_FIELD_MAP, MODEL_MAP, check_user_permission
+
+# Columns returned per model; nothing else is ever selected
+LIST_FIELDS_MAP = {
+    "article": ["id", "title", "slug", "is_active", "show_on_homepage", "position"],
+    "blog": ["id", "title", "slug", "active", "homepage", "position"],
+    "user": ["id", "username", "email", "is_active"],
+}
+# The user list has no ACTIVE_FIELD_MAP entry (it can't be toggled) but can be filtered
+ACTIVE_FILTER_MAP = {**ACTIVE_FIELD_MAP, "user": "is_active"}
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+TRUE_VALUES = ('1', 'yes', 'true')
+FALSE_VALUES = ('0', 'no', 'false')
+
+
+@login_required
+@require_GET
+def list_api(request, model_name):
+    """Compact JSON rows for any MODEL_MAP model, paginated with keyset cursors"""
+    model_name = model_name.lower()
+    model_class = MODEL_MAP.get(model_name)
+    if not model_class:
+        return JsonResponse({"error": "Invalid model"}, status=400)
+
+    if not check_user_permission(request, model_class, action="view"):
+        return JsonResponse({"error": "Permission denied"}, status=403)
+
+    declared = LIST_FIELDS_MAP[model_name]
+    requested = [f for f in request.GET.get('fields', '').split(',') if f]
+    if any(f not in declared for f in requested):
+        return JsonResponse({"error": f"Allowed fields: {', '.join(declared)}"}, status=400)
+    fields = requested or declared
+
+    try:
+        limit = min(max(int(request.GET.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+    except ValueError:
+        limit = DEFAULT_LIMIT
+
+    queryset = filter_queryset(model_name, model_class.objects.all(), request.GET, homepage_default=False)
+
+    active = request.GET.get('active', '').lower()
+    active_field = ACTIVE_FILTER_MAP.get(model_name)
+    if active_field and active in TRUE_VALUES + FALSE_VALUES:
+        queryset = queryset.filter(**{active_field: active in TRUE_VALUES})
+
+    keys = keyset_fields(model_class)
+    # Cursor keys must be selected even if the caller didn't ask for them
+    selected = list(dict.fromkeys(fields + list(keys)))
+
+    try:
+        rows, next_cursor = keyset_page(queryset.values(*selected), keys, request.GET.get('cursor'), limit)
+    except InvalidCursor as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse({
+        "fields": fields,
+        "results": [[row[f] for f in fields] for row in rows],
+        "next": next_cursor,
+    })
+
+
+# -------------------------
+# Public read API
+# -------------------------
+# Columns exposed to anonymous clients; `content_text` is sent as a short excerpt
+PUBLIC_LIST_FIELDS_MAP = {
+    "article": ["slug", "title", "subtitle", "image", "show_on_homepage", "created_at", "updated_at", "content_text"],
+    "blog": ["slug", "title", "subtitle", "homepage", "updated_at", "content_text"],
+}
+PUBLIC_DETAIL_FIELDS_MAP = {
+    "article": PUBLIC_LIST_FIELDS_MAP["article"] + ["content_html", "meta_title", "meta_description", "meta_keywords"],
+    "blog": PUBLIC_LIST_FIELDS_MAP["blog"] + ["content_html"],
+}
+
+
+def _public_model(model_name):
+    model_name = model_name.lower()
+    if model_name not in PUBLIC_LIST_FIELDS_MAP:
+        return model_name, None
+    return model_name, MODEL_MAP[model_name]
+
+
+def _newest(rows):
+    """Last-Modified of the rows themselves (updated_at), as a timestamp."""
+    stamps = [row["updated_at"] for row in rows if row.get("updated_at")]
+    return max(stamps).timestamp() if stamps else None
+
+
+@require_GET
+def public_list(request, model_name):
+    """Active articles/blogs, optionally by homepage flag, paginated with keyset cursors"""
+    model_name, model_class = _public_model(model_name)
+    if model_class is None:
+        return JsonResponse({"error": "Invalid model"}, status=404)
+
+    try:
+        limit = min(max(int(request.GET.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+    except ValueError:
+        limit = DEFAULT_LIMIT
+    cursor = request.GET.get('cursor') or None
+    keys = keyset_fields(model_class)
+    if cursor:
+        try:
+            decode_cursor(cursor, len(keys))
+        except InvalidCursor as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+    homepage = request.GET.get('homepage', '').lower()
+    homepage = homepage in TRUE_VALUES if homepage in TRUE_VALUES + FALSE_VALUES else None
+    params = {"homepage": homepage, "cursor": cursor, "limit": limit}
+
+    def build():
+        queryset = model_class.objects.filter(**{ACTIVE_FIELD_MAP[model_name]: True})
+        if homepage is not None:
+            queryset = queryset.filter(flag_filter(HOMEPAGE_FIELD_MAP[model_name][0], homepage))
+        fields = PUBLIC_LIST_FIELDS_MAP[model_name]
+        rows, next_cursor = keyset_page(queryset.values(*fields, *keys), keys, cursor, limit)
+        results = [public_row({f: row[f] for f in fields}) for row in rows]
+        # Rows can leave a list without touching updated_at (deletes), so the
+        # list's Last-Modified is the model's last write
+        return 200, {"results": results, "next": next_cursor}, None
+
+    return cached_json_response(request, model_class, params, build)
+
+
+@require_GET
+def public_detail(request, model_name, slug):
+    """One active article/blog by slug"""
+    model_name, model_class = _public_model(model_name)
+    if model_class is None:
+        return JsonResponse({"error": "Invalid model"}, status=404)
+
+    def build():
+        row = (
+            model_class.objects
+            .filter(**{ACTIVE_FIELD_MAP[model_name]: True}, slug=slug)
+            .values(*PUBLIC_DETAIL_FIELDS_MAP[model_name])
+            .first()
+        )
+        if row is None:
+            return 404, {"error": "Not found"}, None
+        return 200, public_row(row), _newest([row])
+
+    return cached_json_response(request, model_class, {"slug": slug}, build)
+
+
+# Sections of the homepage document -> model_name
+HOMEPAGE_SECTIONS = {"articles": "article", "blogs": "blog"}
+
+
+@require_GET
+def public_homepage(request):
+    """Homepage articles and blogs from the materialized snapshots; rebuilt when a homepage row changes"""
+    snapshots = {section: get_snapshot(MODEL_MAP[name]) for section, name in HOMEPAGE_SECTIONS.items()}
+    etag = '"homepage-{}"'.format('-'.join(snapshot['etag'] for snapshot in snapshots.values()))
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        body = ','.join(f'"{section}":{snapshot["json"]}' for section, snapshot in snapshots.items())
+        response = HttpResponse('{' + body + '}', content_type='application/json')
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
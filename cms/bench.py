@@ -0,0 +1,67 @@
+"""
+Helpers shared by the bench_* management commands (and the timing reports
+of import_content / export_content).
+
+Benchmarks always run against a throwaway test database and throwaway caches
+so they never touch real content or the server's cached pages and counters.
+"""
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .cache import temporary_caches
+
+
+@contextmanager
+def benchmark_database(on_disk=False):
+    """
+    Create a fresh test database (and empty caches) for the duration of the
+    block. on_disk=True gives SQLite a real file so several threads can share it.
+    """
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    old_test_name = test_settings.get('NAME')
+    tmp_dir = None
+    if on_disk and connection.vendor == 'sqlite':
+        tmp_dir = tempfile.mkdtemp()
+        test_settings['NAME'] = os.path.join(tmp_dir, 'bench.sqlite3')
+
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        with temporary_caches():
+            yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        test_settings['NAME'] = old_test_name
+        if tmp_dir:
+            os.rmdir(tmp_dir)
+
+
+def count_queries(fn):
+    """Run fn() once and return the number of SQL statements it issued."""
+    with CaptureQueriesContext(connection) as ctx:
+        fn()
+    return len(ctx.captured_queries)
+
+
+def time_per_call(fn, repeat=1000):
+    """Average wall time of fn() in microseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1_000_000
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where `resource` is unavailable)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
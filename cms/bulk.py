@@ -0,0 +1,220 @@
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import BooleanField, Case, Q, Value, When
+from django.utils import timezone
+
+from .homepage import affects_homepage, homepage_changed, homepage_fields, touches_homepage
+from .listing import filter_queryset
+from .media import delete_with_media_cleanup
+from .models import BulkJob
+from .versions import bump_version
+
+logger = logging.getLogger(__name__)
+
+
+def chunk_size():
+    return getattr(settings, 'BULK_ACTION_CHUNK_SIZE', 500)
+
+
+def toggle_expression(active_field):
+    return Case(
+        When(**{active_field: True}, then=Value(False)),
+        When(**{active_field: False}, then=Value(True)),
+        output_field=BooleanField(),
+    )
+
+
+def supports_update_returning():
+    """UPDATE ... RETURNING: PostgreSQL, and SQLite from 3.35."""
+    if connection.vendor == 'postgresql':
+        return True
+    if connection.vendor == 'sqlite':
+        return connection.Database.sqlite_version_info >= (3, 35)
+    return False
+
+
+def auto_now_values(model_class):
+    """auto_now fields (e.g. updated_at) -> now; a queryset/raw UPDATE doesn't touch them."""
+    return {f.attname: timezone.now() for f in model_class._meta.concrete_fields if getattr(f, 'auto_now', False)}
+
+
+def flip_field(model_class, pk, field_name, label_field):
+    """
+    Flip a boolean column in SQL and return (new_value, label) without
+    loading the row. One statement where UPDATE ... RETURNING is available,
+    so concurrent toggles can't lose an update. Returns None if pk is missing.
+    The homepage flags come back with it, so the homepage snapshot is only
+    rebuilt when the row is or was on the homepage.
+    """
+    meta = model_class._meta
+    qn = connection.ops.quote_name
+    column = qn(meta.get_field(field_name).column)
+    label_column = qn(meta.get_field(label_field).column)
+    flags = [name for name in homepage_fields(model_class) if name != field_name]
+    returning = [column, label_column] + [qn(meta.get_field(name).column) for name in flags]
+
+    touched = auto_now_values(model_class)
+
+    if supports_update_returning():
+        assignments = [f"{column} = NOT {column}"]
+        params = []
+        for attname, value in touched.items():
+            field = meta.get_field(attname)
+            assignments.append(f"{qn(field.column)} = %s")
+            params.append(field.get_db_prep_save(value, connection))
+
+        sql = (
+            f"UPDATE {qn(meta.db_table)} SET {', '.join(assignments)} "
+            f"WHERE {qn(meta.pk.column)} = %s RETURNING {', '.join(returning)}"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params + [meta.pk.get_db_prep_value(pk, connection)])
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        bump_version(model_class)
+        if affects_homepage(model_class, dict(zip(flags, row[2:])), changing=[field_name]):
+            homepage_changed(model_class)
+        return bool(row[0]), row[1]
+
+    with transaction.atomic():
+        updated = model_class.objects.filter(pk=pk).update(
+            **{field_name: toggle_expression(field_name)}, **touched
+        )
+        if not updated:
+            return None
+        bump_version(model_class)
+        value, label, *others = model_class.objects.filter(pk=pk).values_list(field_name, label_field, *flags).get()
+        if affects_homepage(model_class, dict(zip(flags, others)), changing=[field_name]):
+            homepage_changed(model_class)
+        return bool(value), label
+
+
+def apply_action(model_class, action, pks, active_field=None):
+    """Toggle or delete one chunk of rows in its own transaction. Returns rows affected."""
+    with transaction.atomic():
+        queryset = model_class.objects.filter(pk__in=pks)
+        if action == "toggle":
+            bump_version(model_class)
+            if touches_homepage(queryset, changing=[active_field]):
+                homepage_changed(model_class)
+            return queryset.update(**{active_field: toggle_expression(active_field)}, **auto_now_values(model_class))
+        if action == "delete":
+            return delete_with_media_cleanup(queryset)
+    raise ValueError(f"Unknown bulk action: {action}")
+
+
+def apply_action_to_ids(model_class, action, ids, active_field=None):
+    """Selected-ids mode, chunked to stay under SQLite's bound-variable limit."""
+    size = chunk_size()
+    affected = 0
+    for start in range(0, len(ids), size):
+        affected += apply_action(model_class, action, ids[start:start + size], active_field)
+    return affected
+
+
+def stale_before():
+    """Heartbeats older than this belong to a runner that died (worker recycled or crashed)."""
+    return timezone.now() - timedelta(seconds=getattr(settings, 'BULK_JOB_STALE_SECONDS', 120))
+
+
+def claimable_jobs():
+    """Jobs nobody is running: pending ones, and running ones whose runner stopped beating."""
+    return BulkJob.objects.filter(
+        Q(status=BulkJob.STATUS_PENDING)
+        | Q(status=BulkJob.STATUS_RUNNING, heartbeat_at__lt=stale_before())
+        | Q(status=BulkJob.STATUS_RUNNING, heartbeat_at__isnull=True)
+    )
+
+
+def _claim(job):
+    """Take the job over with one conditional UPDATE; False if another runner holds it."""
+    beat = timezone.now()
+    claimed = claimable_jobs().filter(pk=job.pk).update(status=BulkJob.STATUS_RUNNING, heartbeat_at=beat)
+    if claimed:
+        job.status, job.heartbeat_at = BulkJob.STATUS_RUNNING, beat
+    return bool(claimed)
+
+
+def _advance(job, **fields):
+    """
+    Save `fields` and a fresh heartbeat, but only while this runner still
+    holds the job (the heartbeat is the one it wrote last). False otherwise.
+    """
+    beat = timezone.now()
+    held = BulkJob.objects.filter(
+        pk=job.pk, status=BulkJob.STATUS_RUNNING, heartbeat_at=job.heartbeat_at,
+    ).update(heartbeat_at=beat, **fields)
+    if held:
+        job.heartbeat_at = beat
+        for name, value in fields.items():
+            setattr(job, name, value)
+    return bool(held)
+
+
+class LostJob(Exception):
+    """Another runner took the job over; roll back the chunk in hand."""
+
+
+def run_bulk_job(job_id):
+    """
+    Execute (or resume) a filter-based job chunk by chunk, walking the
+    matching rows by primary key. Each chunk commits together with the
+    progress it makes, so a resumed job neither skips nor repeats rows.
+    Does nothing if another live runner holds the job.
+    """
+    from .views import ACTIVE_FIELD_MAP, MODEL_MAP
+
+    job = BulkJob.objects.get(pk=job_id)
+    was_pending = job.status == BulkJob.STATUS_PENDING
+    if not _claim(job):
+        return job
+
+    model_class = MODEL_MAP[job.model_name]
+    active_field = ACTIVE_FIELD_MAP.get(job.model_name)
+    base_qs = filter_queryset(job.model_name, model_class.objects.all(), job.filters)
+
+    try:
+        if was_pending and not _advance(job, total=base_qs.count()):
+            raise LostJob
+        while True:
+            pks = list(
+                base_qs.filter(pk__gt=job.last_pk)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:chunk_size()]
+            )
+            if not pks:
+                break
+
+            with transaction.atomic():
+                apply_action(model_class, job.action, pks, active_field)
+                if not _advance(job, processed=job.processed + len(pks), last_pk=pks[-1]):
+                    raise LostJob
+
+        _advance(job, status=BulkJob.STATUS_DONE, finished_at=timezone.now())
+    except LostJob:
+        logger.warning("Bulk job %s was taken over by another runner", job.pk)
+    except Exception as e:
+        logger.error(f"Bulk job {job.pk} failed: {e}")
+        _advance(job, status=BulkJob.STATUS_FAILED, error=str(e), finished_at=timezone.now())
+    return job
+
+
+def start_bulk_job(job):
+    """
+    Run the job on a background thread once the creating transaction commits.
+    If this worker goes away mid-run the heartbeat stops, and
+    `manage.py run_bulk_jobs` picks the job up where it stopped.
+    """
+    def target():
+        close_old_connections()
+        try:
+            run_bulk_job(job.pk)
+        finally:
+            connection.close()
+
+    transaction.on_commit(lambda: threading.Thread(target=target, daemon=True).start())
@@ -0,0 +1,169 @@
+"""
+SQLite (WAL) cache backend whose counters are shared by every worker process
+on the host, with no external service.
+
+django_ratelimit keeps one counter per (key, time window) via cache.add() and
+cache.incr(); here incr() is a single UPDATE ... RETURNING, so increments from
+different processes never overwrite each other. Expired rows are compacted
+every COMPACT_EVERY writes.
+
+    CACHES = {
+        'ratelimit': {
+            'BACKEND': 'cms.cache.SQLiteCache',
+            'LOCATION': BASE_DIR / 'cache.sqlite3',
+        },
+    }
+"""
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.test.utils import override_settings
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    key TEXT PRIMARY KEY,
+    value BLOB,
+    expires REAL
+) WITHOUT ROWID
+"""
+
+
+class SQLiteCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        self.location = str(location)
+        options = params.get('OPTIONS', {})
+        self.compact_every = int(options.get('COMPACT_EVERY', 1000))
+        self.busy_timeout = float(options.get('TIMEOUT', 5))
+        self._local = threading.local()
+        self._writes = 0
+
+    # -- connection --------------------------------------------------------
+    @property
+    def _db(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.location, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    # close() is left as the BaseCache no-op: the per-thread connection is
+    # reused across requests instead of being reopened each time.
+
+    # -- encoding: ints stay native so they can be incremented in SQL ------
+    @staticmethod
+    def _encode(value):
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _decode(value):
+        if isinstance(value, int):
+            return value
+        return pickle.loads(value)
+
+    def _after_write(self):
+        self._writes += 1
+        if self._writes >= self.compact_every:
+            self._writes = 0
+            self.compact()
+
+    def compact(self):
+        """Drop expired rows."""
+        self._db.execute("DELETE FROM cache_entries WHERE expires IS NOT NULL AND expires <= ?", (time.time(),))
+
+    # -- cache API -----------------------------------------------------------
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        cursor = self._db.execute(
+            "INSERT INTO cache_entries (key, value, expires) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires = excluded.expires "
+            "WHERE cache_entries.expires IS NOT NULL AND cache_entries.expires <= ?",
+            (key, self._encode(value), self.get_backend_timeout(timeout), time.time()),
+        )
+        self._after_write()
+        return cursor.rowcount == 1
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = self._db.execute(
+            "SELECT value FROM cache_entries WHERE key = ? AND (expires IS NULL OR expires > ?)",
+            (key, time.time()),
+        ).fetchone()
+        return default if row is None else self._decode(row[0])
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self._db.execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, expires) VALUES (?, ?, ?)",
+            (key, self._encode(value), self.get_backend_timeout(timeout)),
+        )
+        self._after_write()
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        cursor = self._db.execute(
+            "UPDATE cache_entries SET expires = ? WHERE key = ? AND (expires IS NULL OR expires > ?)",
+            (self.get_backend_timeout(timeout), key, time.time()),
+        )
+        return cursor.rowcount == 1
+
+    def incr(self, key, delta=1, version=None):
+        """Atomic across processes: one UPDATE ... RETURNING."""
+        key = self.make_and_validate_key(key, version=version)
+        row = self._db.execute(
+            "UPDATE cache_entries SET value = value + ? "
+            "WHERE key = ? AND typeof(value) = 'integer' AND (expires IS NULL OR expires > ?) "
+            "RETURNING value",
+            (delta, key, time.time()),
+        ).fetchone()
+        if row is None:
+            raise ValueError("Key '%s' not found" % key)
+        return row[0]
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        cursor = self._db.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+        return cursor.rowcount == 1
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = self._db.execute(
+            "SELECT 1 FROM cache_entries WHERE key = ? AND (expires IS NULL OR expires > ?)",
+            (key, time.time()),
+        ).fetchone()
+        return row is not None
+
+    def clear(self):
+        self._db.execute("DELETE FROM cache_entries")
+
+
+# -------------------------
+# Throwaway caches
+# -------------------------
+@contextmanager
+def temporary_caches():
+    """
+    Point every configured cache at its own SQLite file in a temporary
+    directory for the duration of the block. The test runner and the
+    benchmarks use it, so their content versions, snapshots and rate-limit
+    counters never reach the server's cache files.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        caches = {
+            alias: {**config, 'BACKEND': 'cms.cache.SQLiteCache', 'LOCATION': os.path.join(tmp_dir, f'{alias}.sqlite3')}
+            for alias, config in settings.CACHES.items()
+        }
+        with override_settings(CACHES=caches):
+            yield
@@ -0,0 +1,205 @@
+"""
+Materialized homepage: the active, homepage-flagged articles and blogs.
+
+Each model's homepage items are kept as a small serialized snapshot (just the
+fields a homepage shows, already ordered) in the shared cache and in process
+memory. Reading it costs one cache lookup of the snapshot's version and never
+touches the content tables.
+
+A write rebuilds the snapshot when it commits, but only if the row it touched
+is or was on the homepage (both flags are tracked with cms.tracking, so this
+needs no extra query); writes elsewhere in the table leave it alone. The
+rebuild reads the partial "active homepage" index and takes the excerpt with
+Substr, so it never loads a full body. If a rebuild fails, or the cache lost
+the snapshot, the next read rebuilds it instead.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.functions import Substr
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from .listing import EXCERPT_LENGTH, flag_filter, public_row
+from .tracking import NOT_LOADED, current_value, has_changed
+from .versions import on_commit_once
+
+logger = logging.getLogger(__name__)
+
+# Per model: (active field, homepage field, fields a homepage item carries)
+HOMEPAGE_MAP = {
+    "articles.article": ("is_active", "show_on_homepage", ["slug", "title", "subtitle", "image", "updated_at"]),
+    "blog.blog": ("active", "homepage", ["slug", "title", "subtitle", "updated_at"]),
+}
+
+# label -> snapshot dict, the copy this process last read or built
+_memory = {}
+_lock = threading.Lock()
+
+
+def has_homepage(model):
+    return model._meta.label_lower in HOMEPAGE_MAP
+
+
+def homepage_fields(model):
+    """(active field, homepage field), or () for a model without a homepage."""
+    entry = HOMEPAGE_MAP.get(model._meta.label_lower)
+    return entry[:2] if entry else ()
+
+
+def snapshot_key(model):
+    return f"homepage-snapshot:{model._meta.label_lower}"
+
+
+def snapshot_version_key(model):
+    return f"homepage-version:{model._meta.label_lower}"
+
+
+def _current_version(model):
+    version = cache.get(snapshot_version_key(model))
+    if version is None:
+        # Start from the clock, so a process holding a snapshot from before
+        # the cache was cleared can't mistake it for the current one
+        cache.add(snapshot_version_key(model), time.time_ns(), timeout=None)
+        version = cache.get(snapshot_version_key(model))
+    return version
+
+
+def _next_version(model):
+    try:
+        return cache.incr(snapshot_version_key(model))
+    except ValueError:
+        return _current_version(model)
+
+
+# -------------------------
+# Snapshots
+# -------------------------
+def build_snapshot(model, version=None):
+    """Read the homepage rows and store a fresh snapshot under `version`. Returns it."""
+    version = version if version is not None else _current_version(model)
+    active_field, homepage_field, fields = HOMEPAGE_MAP[model._meta.label_lower]
+    rows = (
+        model._default_manager
+        .filter(**{active_field: True})
+        .filter(flag_filter(homepage_field, True))
+        .order_by('position', 'id')
+        # One character past the excerpt, so Truncator still sees it was cut
+        .annotate(excerpt=Substr('content_text', 1, EXCERPT_LENGTH + 1))
+        .values(*fields, 'excerpt')[:getattr(settings, 'HOMEPAGE_MAX_ITEMS', 50)]
+    )
+    items = [public_row(row) for row in rows]
+    body = json.dumps(items, cls=DjangoJSONEncoder)
+
+    previous = cache.get(snapshot_key(model))
+    if previous is not None and previous['version'] > version:
+        return previous  # a newer rebuild already landed
+
+    snapshot = {
+        'version': version,
+        'etag': hashlib.md5(body.encode()).hexdigest()[:16],
+        'items': items,
+        'json': body,
+    }
+    cache.set(snapshot_key(model), snapshot, timeout=None)
+    with _lock:
+        _memory[model._meta.label_lower] = snapshot
+    return snapshot
+
+
+def get_snapshot(model):
+    """
+    The current homepage snapshot: {'version', 'etag', 'items', 'json'}.
+    Served from memory, then the cache; only built here if neither holds
+    the current version (cold cache, or a rebuild that failed).
+    """
+    version = _current_version(model)
+    label = model._meta.label_lower
+
+    snapshot = _memory.get(label)
+    if snapshot is not None and snapshot['version'] == version:
+        return snapshot
+
+    snapshot = cache.get(snapshot_key(model))
+    if snapshot is not None and snapshot['version'] == version:
+        with _lock:
+            _memory[label] = snapshot
+        return snapshot
+
+    return build_snapshot(model, version)
+
+
+def _rebuild(model):
+    # Runs on commit of the write; a failure here must not surface in the request
+    try:
+        build_snapshot(model, _next_version(model))
+    except Exception:
+        logger.exception("Homepage snapshot rebuild failed for %s", model._meta.label)
+        cache.delete(snapshot_key(model))
+
+
+def homepage_changed(model):
+    """Rebuild `model`'s snapshot once the current transaction commits (once per transaction)."""
+    if has_homepage(model):
+        on_commit_once(f"homepage:{model._meta.label_lower}", lambda: _rebuild(model))
+
+
+# -------------------------
+# Which writes matter
+# -------------------------
+def affects_homepage(model, values, changing=()):
+    """
+    Whether a row with these values (attname -> value) is on the homepage,
+    or would be for some value of the `changing` flags. Values that weren't
+    loaded count as set.
+    """
+    if not has_homepage(model):
+        return False
+    for name in homepage_fields(model):
+        if name in changing:
+            continue
+        value = values.get(name, NOT_LOADED)
+        if value is not NOT_LOADED and not value:
+            return False
+    return True
+
+
+def touches_homepage(queryset, changing=()):
+    """affects_homepage() for any row of `queryset`, with one indexed EXISTS."""
+    model = queryset.model
+    if not has_homepage(model):
+        return False
+    others = [flag_filter(name, True) for name in homepage_fields(model) if name not in changing]
+    return queryset.filter(*others).exists()
+
+
+def _before_save(sender, instance, raw=False, **kwargs):
+    fields = homepage_fields(sender)
+    values = {name: current_value(instance, name) for name in fields}
+    # A flag that changes was the opposite before, so it counts either way
+    changing = () if instance._state.adding else [name for name in fields if has_changed(instance, name)]
+    instance._homepage_pending = not raw and affects_homepage(sender, values, changing)
+
+
+def _after_save(sender, instance, **kwargs):
+    if getattr(instance, '_homepage_pending', False):
+        homepage_changed(sender)
+    instance._homepage_pending = False
+
+
+def _on_delete(sender, instance, **kwargs):
+    values = {name: current_value(instance, name) for name in homepage_fields(sender)}
+    if affects_homepage(sender, values):
+        homepage_changed(sender)
+
+
+def connect_homepage(model):
+    # Change detection runs in pre_save: the field tracker refreshes its snapshot in post_save
+    pre_save.connect(_before_save, sender=model, dispatch_uid=f'homepage:pre:{model._meta.label}')
+    post_save.connect(_after_save, sender=model, dispatch_uid=f'homepage:post:{model._meta.label}')
+    post_delete.connect(_on_delete, sender=model, dispatch_uid=f'homepage:delete:{model._meta.label}')
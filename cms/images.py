@@ -0,0 +1,209 @@
+"""
+Upload validation for images (article images and CKEditor uploads).
+
+Checks run cheapest first: size, extension, MIME type and magic bytes need
+no decoding at all. The dimensions come from a single PIL open, which only
+parses the header. The full decode (Image.verify) is CPU-heavy for large
+or HEIC files, so it runs in a small process pool and a slow upload can't
+stall the request thread.
+"""
+import io
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from PIL import Image
+
+try:  # HEIC needs the optional pillow-heif plugin
+    from pillow_heif import register_heif_opener
+except ImportError:
+    pass
+else:
+    register_heif_opener()
+
+logger = logging.getLogger(__name__)
+
+HEIF_BRANDS = {b'heic', b'heix', b'hevc', b'hevx', b'heim', b'heis', b'mif1', b'msf1'}
+
+
+def sniff_format(head):
+    """Image format from the first bytes of a file, or None."""
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'jpeg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    if head[4:8] == b'ftyp' and head[8:12] in HEIF_BRANDS:
+        return 'heic'
+    return None
+
+
+# Extension -> format its magic bytes show
+EXTENSION_FORMATS = {'jpg': 'jpeg', 'jpeg': 'jpeg', 'png': 'png', 'gif': 'gif', 'webp': 'webp', 'heic': 'heic'}
+
+
+def _settings():
+    return (
+        getattr(settings, 'IMAGE_MAX_FILE_SIZE', 2 * 1024 * 1024),
+        getattr(settings, 'IMAGE_ALLOWED_EXTENSIONS', ['jpg', 'jpeg', 'png', 'gif', 'webp', 'heic']),
+        getattr(settings, 'IMAGE_MAX_DIMENSIONS', (1920, 1280)),
+        getattr(settings, 'IMAGE_ALLOWED_MIMETYPES', [
+            'image/jpeg', 'image/png', 'image/gif', 'image/webp', 'image/heic'
+        ]),
+    )
+
+
+def file_extension(name):
+    return name.rsplit('.', 1)[-1].lower() if '.' in name else ''
+
+
+def is_image_upload(upload):
+    return file_extension(upload.name) in _settings()[1]
+
+
+# -------------------------
+# Full decode in a process pool
+# -------------------------
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = getattr(settings, 'IMAGE_VERIFY_WORKERS', 2)
+            # spawn, not fork: the web worker is multi-threaded
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def pool_processes(pool):
+    """
+    Worker processes of a ProcessPoolExecutor. concurrent.futures has no
+    public way to reach them, so this is the one place that reads the
+    private `_processes` map (None once the pool has been shut down).
+    """
+    return list((getattr(pool, '_processes', None) or {}).values())
+
+
+def _reset_pool(pool=None, terminate=False):
+    """
+    Drop the pool (only if it is still `pool`, when given) so the next call
+    starts a fresh one. terminate=True also kills the workers: shutdown()
+    and Future.cancel() can't stop a decode that is already running.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None or (pool is not None and _pool is not pool):
+            return
+        pool, _pool = _pool, None
+    # shutdown() forgets the worker processes, so collect them first
+    processes = pool_processes(pool) if terminate else []
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+
+def verify_image_data(source):
+    """Fully decode an image (path or bytes). Returns an error message or None."""
+    try:
+        with Image.open(source if isinstance(source, str) else io.BytesIO(source)) as img:
+            img.verify()
+    except Exception as e:
+        return str(e) or e.__class__.__name__
+    return None
+
+
+def _verify(upload):
+    """Run verify_image_data() in the pool (or inline with IMAGE_VERIFY_WORKERS = 0)."""
+    if hasattr(upload, 'temporary_file_path'):
+        source = upload.temporary_file_path()
+    else:
+        upload.seek(0)
+        source = upload.read()
+
+    if not getattr(settings, 'IMAGE_VERIFY_WORKERS', 2):
+        return verify_image_data(source)
+
+    pool = _get_pool()
+    try:
+        future = pool.submit(verify_image_data, source)
+        return future.result(timeout=getattr(settings, 'IMAGE_VERIFY_TIMEOUT', 10))
+    except FutureTimeout:
+        # The decode keeps its worker busy until it finishes: recycle the pool
+        logger.warning("Image verify timed out; restarting the verify pool")
+        _reset_pool(pool, terminate=True)
+        return "timed out"
+    except BrokenProcessPool:
+        logger.warning("Image verify pool broke; verifying inline")
+        _reset_pool(pool)
+        return verify_image_data(source)
+
+
+# -------------------------
+# Pipeline
+# -------------------------
+def validate_image(upload):
+    """
+    Validate an uploaded image and return its (width, height). Raises
+    ValidationError on the first failed check. The file is left at offset 0.
+    """
+    max_size, allowed_extensions, max_dimensions, allowed_mimetypes = _settings()
+
+    # 1. File size
+    if upload.size > max_size:
+        raise ValidationError(
+            f"Image file too large. Maximum size is {max_size/(1024*1024):.0f}MB. "
+            f"Your file is {upload.size / (1024*1024):.1f}MB"
+        )
+
+    # 2. Extension
+    extension = file_extension(upload.name)
+    if extension not in allowed_extensions:
+        raise ValidationError(
+            f"Invalid file type '.{extension}'. Allowed types: {', '.join(allowed_extensions)}"
+        )
+
+    # 3. MIME type as sent by the browser
+    content_type = getattr(upload, 'content_type', None)
+    if content_type and content_type not in allowed_mimetypes:
+        raise ValidationError(
+            f"Invalid image format '{content_type}'. Allowed: JPEG, PNG, GIF, WebP , HEIC"
+        )
+
+    # 4. Magic bytes must be one of the allowed formats (whatever the name says)
+    upload.seek(0)
+    detected = sniff_format(upload.read(32))
+    if detected is None or detected not in {EXTENSION_FORMATS.get(ext) for ext in allowed_extensions}:
+        raise ValidationError("Invalid image file. The file may be corrupted or not a real image.")
+
+    # 5. Dimensions from the header (one lazy open, no pixel decoding)
+    upload.seek(0)
+    try:
+        with Image.open(upload) as img:
+            width, height = img.size
+    except Exception:
+        raise ValidationError("Invalid image file. The file may be corrupted or not a real image.")
+
+    max_width, max_height = max_dimensions
+    if width > max_width or height > max_height:
+        raise ValidationError(
+            f"Image dimensions too large. Maximum is {max_width}x{max_height}px. "
+            f"Your image is {width}x{height}px"
+        )
+
+    # 6. Full decode, off the request thread
+    if _verify(upload) is not None:
+        raise ValidationError("Invalid image file. The file may be corrupted or not a real image.")
+
+    upload.seek(0)
+    return width, height
@@ -0,0 +1,267 @@
+import base64
+import binascii
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import BooleanField, Q, Value
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_etags
+from django.utils.text import Truncator
+
+from .search import search_enabled, search_filter
+from .versions import get_version, last_changed
+
+# Fields searched by the list-page "q" box when there is no full-text index
+SEARCH_FIELDS_MAP = {
+    "article": ["title", "slug"],
+    "blog": ["title", "slug"],
+    "user": ["username", "email"],
+}
+
+# Homepage flag per model: (field, GET value meaning "on homepage", default GET value)
+HOMEPAGE_FIELD_MAP = {
+    "article": ("show_on_homepage", "yes", "no"),
+    "blog": ("homepage", "1", "0"),
+}
+
+
+def flag_filter(field, value):
+    """
+    `field = value` for a boolean column, written so SQLite can seek an index
+    on it. A plain filter(flag=False) compiles to `NOT flag`, which it can't.
+    """
+    return Q(**{field: Value(value, output_field=BooleanField())})
+
+
+def filter_queryset(model_name, queryset, params, homepage_default=True):
+    """
+    Apply the list-page filters (search box + homepage flag) from a GET/POST
+    dict, so list views and filter-based bulk actions select the same rows.
+    With homepage_default=False a missing homepage param means "both".
+    """
+    model_name = model_name.lower()
+
+    query = (params.get('q') or '').strip()
+    search_fields = SEARCH_FIELDS_MAP.get(model_name, [])
+    if query and search_enabled(queryset.model):
+        queryset = search_filter(queryset, query)
+    elif query and search_fields:
+        condition = Q()
+        for field in search_fields:
+            condition |= Q(**{f"{field}__icontains": query})
+        queryset = queryset.filter(condition)
+
+    if model_name in HOMEPAGE_FIELD_MAP:
+        field, on_value, default = HOMEPAGE_FIELD_MAP[model_name]
+        homepage = params.get('homepage') or (default if homepage_default else '')
+        if homepage:
+            queryset = queryset.filter(flag_filter(field, homepage == on_value))
+
+    return queryset
+
+
+def filter_params(model_name, params):
+    """The subset of `params` that filter_queryset() looks at (for storing/replaying)."""
+    keys = ['q']
+    if model_name.lower() in HOMEPAGE_FIELD_MAP:
+        keys.append('homepage')
+    return {key: params.get(key, '') for key in keys}
+
+
+# -------------------------
+# Keyset (cursor) pagination
+# -------------------------
+class InvalidCursor(ValueError):
+    pass
+
+
+def keyset_fields(model_class):
+    """Stable ordering for cursors: (position, id) where there is a position."""
+    field_names = {f.name for f in model_class._meta.fields}
+    return ("position", "id") if "position" in field_names else ("id",)
+
+
+def encode_cursor(values):
+    raw = json.dumps(list(values), separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise InvalidCursor("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size or not all(isinstance(v, int) for v in values):
+        raise InvalidCursor("Invalid cursor")
+    return values
+
+
+def after_cursor(keys, values, lookup='gt'):
+    """Rows strictly after `values` in `keys` order (lookup='lt': before), as an index-friendly OR chain."""
+    condition = Q()
+    for i, key in enumerate(keys):
+        step = Q(**{f"{key}__{lookup}": values[i]})
+        for prev_key, prev_value in zip(keys[:i], values[:i]):
+            step &= Q(**{prev_key: prev_value})
+        condition |= step
+    return condition
+
+
+def _seek(queryset, keys, values=None, limit=50, backward=False):
+    """Up to `limit` rows after (or before) `values`, plus whether more exist."""
+    if backward:
+        queryset = queryset.order_by(*[f"-{key}" for key in keys])
+    else:
+        queryset = queryset.order_by(*keys)
+    if values is not None:
+        queryset = queryset.filter(after_cursor(keys, values, 'lt' if backward else 'gt'))
+
+    rows = list(queryset[:limit + 1])
+    return rows[:limit], len(rows) > limit
+
+
+def _row_cursor(row, keys):
+    get = row.get if isinstance(row, dict) else (lambda key: getattr(row, key))
+    return encode_cursor(get(key) for key in keys)
+
+
+def keyset_page(queryset, keys, cursor=None, limit=50):
+    """
+    Return (rows, next_cursor) for one page. Cost is independent of how deep
+    the page is: no OFFSET, just a range seek on `keys`.
+    """
+    values = decode_cursor(cursor, len(keys)) if cursor else None
+    rows, has_more = _seek(queryset, keys, values, limit)
+    next_cursor = _row_cursor(rows[-1], keys) if has_more and rows else None
+    return rows, next_cursor
+
+
+def cursor_page(queryset, keys, after=None, before=None, limit=50):
+    """
+    Prev/Next navigation over keyset pages: returns (rows, next_cursor,
+    prev_cursor). Going back seeks in reverse and flips the rows.
+    """
+    if before:
+        rows, has_prev = _seek(queryset, keys, decode_cursor(before, len(keys)), limit, backward=True)
+        rows.reverse()
+        has_next = True
+    else:
+        values = decode_cursor(after, len(keys)) if after else None
+        rows, has_next = _seek(queryset, keys, values, limit)
+        has_prev = bool(after)
+
+    next_cursor = _row_cursor(rows[-1], keys) if has_next and rows else None
+    prev_cursor = _row_cursor(rows[0], keys) if has_prev and rows else None
+    return rows, next_cursor, prev_cursor
+
+
+# -------------------------
+# Cached counts
+# -------------------------
+def cached_count(model_name, queryset, params):
+    """
+    COUNT(*) for a filtered list, cached per content version: any write to
+    the model bumps the version, so a stale total is never served.
+    """
+    filters = json.dumps(filter_params(model_name, params), sort_keys=True)
+    digest = hashlib.md5(filters.encode()).hexdigest()
+    key = f"list-count:{queryset.model._meta.label_lower}:{get_version(queryset.model)}:{digest}"
+
+    total = cache.get(key)
+    if total is None:
+        total = queryset.count()
+        cache.set(key, total, getattr(settings, 'LIST_COUNT_CACHE_SECONDS', 300))
+    return total
+
+
+# -------------------------
+# Cached AJAX partials
+# -------------------------
+def cached_partial_response(request, model, params, render):
+    """
+    Serve an AJAX list partial from the cache under (content version, params)
+    with a strong ETag. Unchanged data costs one version lookup: a 304 when
+    the browser already has it, otherwise the cached HTML. render() is only
+    called on a miss, and its output must not contain per-user data.
+    """
+    version = get_version(model)
+    digest = hashlib.md5(json.dumps(params, sort_keys=True).encode()).hexdigest()
+    etag = f'"{model._meta.label_lower}-{version}-{digest}"'
+
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        key = f"list-partial:{etag}"
+        html = cache.get(key)
+        if html is None:
+            html = render()
+            cache.set(key, html, getattr(settings, 'LIST_PARTIAL_CACHE_SECONDS', 300))
+        response = HttpResponse(html)
+
+    response['ETag'] = etag
+    # Always revalidate; the page and its partial share a URL
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ['X-Requested-With'])
+    return response
+
+
+# -------------------------
+# Cached public JSON
+# -------------------------
+EXCERPT_LENGTH = 300
+
+
+def public_row(row):
+    """Serialize a values() row for anonymous clients: media as URLs, text as an excerpt."""
+    if "image" in row:
+        row["image"] = f"{settings.MEDIA_URL}{row['image']}" if row["image"] else None
+    if "content_text" in row:
+        row["excerpt"] = Truncator(row.pop("content_text")).chars(EXCERPT_LENGTH)
+    elif "excerpt" in row:
+        # Already cut in SQL (Substr) to EXCERPT_LENGTH + 1 characters
+        row["excerpt"] = Truncator(row["excerpt"]).chars(EXCERPT_LENGTH)
+    return row
+
+
+def cached_json_response(request, model, params, build):
+    """
+    Serve public JSON from the cache under (content version, params) with an
+    ETag and Last-Modified. build() returns (status, payload, last_modified)
+    and only runs on a miss. A client revalidating with If-None-Match gets
+    its 304 from the version lookup alone, without reading any rows.
+    """
+    version = get_version(model)
+    digest = hashlib.md5(json.dumps(params, sort_keys=True).encode()).hexdigest()
+    etag = f'"{model._meta.label_lower}-{version}-{digest}"'
+
+    # Validators are only ever sent with 200s, so a matching If-None-Match means a 200
+    if request.headers.get('If-None-Match'):
+        response = get_conditional_response(request, etag=etag)
+        if response is not None:
+            response['ETag'] = etag
+            patch_cache_control(response, public=True, no_cache=True)
+            return response
+
+    key = f"public-json:{etag}"
+    entry = cache.get(key)
+    if entry is None:
+        status, payload, modified = build()
+        entry = (status, json.dumps(payload, cls=DjangoJSONEncoder), modified or last_changed(model))
+        cache.set(key, entry, getattr(settings, 'PUBLIC_API_CACHE_SECONDS', 300))
+    status, body, modified = entry
+
+    if status != 200:
+        return HttpResponse(body, status=status, content_type='application/json')
+
+    response = get_conditional_response(request, etag=etag, last_modified=int(modified))
+    if response is None:
+        response = HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(modified)
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
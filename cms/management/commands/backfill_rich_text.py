@@ -0,0 +1,91 @@
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from cms.homepage import homepage_changed
+from cms.sanitize import RICH_TEXT_MAP, render_batch
+from cms.search import has_search_index, index_objects, indexed_fields
+from cms.versions import bump_version
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the sanitized HTML / plain-text columns of articles and blogs. Sanitizing "
+        "runs in worker processes; by default only rows that were never rendered are done."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help="Worker processes (0 = sanitize in this process).")
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--all', action='store_true',
+                            help="Re-render every row, e.g. after changing the allowed tags.")
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        pool = None
+        if workers > 0:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        try:
+            for label, sources in RICH_TEXT_MAP.items():
+                model = apps.get_model(label)
+                for source, (html_field, text_field) in sources.items():
+                    started = time.perf_counter()
+                    total = self.backfill(model, source, html_field, text_field, pool, workers, options)
+                    elapsed = time.perf_counter() - started
+                    rate = total / elapsed if elapsed else 0
+                    self.stdout.write(f"{model._meta.label}.{source}: {total} row(s) in {elapsed:.1f}s ({rate:.0f} rows/s)")
+                    if total:
+                        bump_version(model)
+                        homepage_changed(model)  # excerpts may have changed
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    def batches(self, model, source, html_field, batch_size, everything):
+        """Keyset over pk, so rows written meanwhile don't shift the batches."""
+        queryset = model._default_manager.order_by('pk')
+        if not everything:
+            queryset = queryset.filter(Q(**{html_field: ''}) & ~Q(**{source: ''}))
+        last_pk = 0
+        while True:
+            rows = list(queryset.filter(pk__gt=last_pk).values_list('pk', source)[:batch_size])
+            if not rows:
+                return
+            last_pk = rows[-1][0]
+            yield rows
+
+    def backfill(self, model, source, html_field, text_field, pool, workers, options):
+        batches = self.batches(model, source, html_field, options['batch_size'], options['all'])
+        total = 0
+
+        if pool is None:
+            for rows in batches:
+                total += self.write(model, render_batch(rows), html_field, text_field)
+            return total
+
+        # Keep every worker busy while this process writes finished batches in order
+        pending = deque()
+        for rows in batches:
+            pending.append(pool.submit(render_batch, rows))
+            if len(pending) >= workers * 2:
+                total += self.write(model, pending.popleft().result(), html_field, text_field)
+        while pending:
+            total += self.write(model, pending.popleft().result(), html_field, text_field)
+        return total
+
+    def write(self, model, rendered, html_field, text_field):
+        objs = [model(pk=pk, **{html_field: html, text_field: text}) for pk, html, text in rendered]
+        with transaction.atomic():
+            # bulk_update sends no signals: refresh the search index by hand
+            model._default_manager.bulk_update(objs, [html_field, text_field])
+            if has_search_index(model):
+                index_objects(model, model._default_manager.filter(pk__in=[obj.pk for obj in objs]).only(*indexed_fields(model)))
+        return len(objs)
@@ -0,0 +1,47 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+from articles.models import Article
+from cms.bench import benchmark_database, count_queries, time_per_call
+
+
+class Command(BaseCommand):
+    help = "Requests/s of the public article API: uncached, cached 200, and warm-cache 304 revalidations."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000)
+        parser.add_argument('--requests', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        # benchmark_database() also swaps in empty caches
+        with benchmark_database(), override_settings(ALLOWED_HOSTS=['testserver']):
+            Article.objects.bulk_create([
+                Article(title=f"Article {i}", slug=f"bench-{i}", content=f"<p>Body {i}</p>",
+                        content_html=f"<p>Body {i}</p>", content_text=f"Body {i}", show_on_homepage=i % 3 == 0)
+                for i in range(options['rows'])
+            ])
+
+            client = Client()
+            url = '/api/public/article/?homepage=1&limit=50'
+            first = client.get(url)
+            etag, modified = first['ETag'], first['Last-Modified']
+
+            def uncached():
+                cache.clear()
+                client.get(url)
+
+            scenarios = [
+                ("uncached 200", uncached, max(options['requests'] // 10, 1)),
+                ("cached 200", lambda: client.get(url), options['requests']),
+                ("304 If-None-Match", lambda: client.get(url, HTTP_IF_NONE_MATCH=etag), options['requests']),
+                ("304 If-Modified-Since", lambda: client.get(url, HTTP_IF_MODIFIED_SINCE=modified), options['requests']),
+            ]
+            client.get(url)  # warm
+
+            self.stdout.write(f"{options['rows']} articles, {url}")
+            self.stdout.write(f"{'scenario':<24}{'us/req':>10}{'req/s':>10}{'queries':>9}")
+            for name, run, repeat in scenarios:
+                us = time_per_call(run, repeat)
+                queries = count_queries(run)
+                self.stdout.write(f"{name:<24}{us:>10.0f}{1_000_000 / us:>10.0f}{queries:>9}")
@@ -0,0 +1,68 @@
+import multiprocessing
+import os
+import tempfile
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+from django_ratelimit.core import is_ratelimited
+
+from cms.bench import time_per_call
+
+
+def _hammer(location, key, count):
+    """Child process: increment one shared counter `count` times."""
+    from cms.cache import SQLiteCache
+    cache = SQLiteCache(location, {})
+    for _ in range(count):
+        cache.incr(key)
+
+
+class Command(BaseCommand):
+    help = "Per-check overhead of django_ratelimit on LocMemCache vs the shared SQLite backend."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--checks', type=int, default=5000)
+        parser.add_argument('--processes', type=int, default=4)
+
+    def handle(self, *args, **options):
+        tmp_dir = tempfile.mkdtemp()
+        location = os.path.join(tmp_dir, 'bench-ratelimit.sqlite3')
+        backends = {
+            'locmem': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'sqlite': {'BACKEND': 'cms.cache.SQLiteCache', 'LOCATION': location},
+        }
+
+        request = RequestFactory().post('/toggle-status/article/1/', REMOTE_ADDR='10.0.0.1')
+        request.user = AnonymousUser()
+
+        self.stdout.write(f"{'backend':<10}{'us/check':>10}")
+        for name, config in backends.items():
+            with override_settings(CACHES={'default': config}, RATELIMIT_USE_CACHE='default'):
+                check = lambda: is_ratelimited(
+                    request, group='bench', key='ip', rate='1000000/m', method='POST', increment=True,
+                )
+                check()  # warm up (creates the table / first window)
+                self.stdout.write(f"{name:<10}{time_per_call(check, options['checks']):>10.1f}")
+
+        # Shared counting across processes
+        from cms.cache import SQLiteCache
+        cache = SQLiteCache(location, {})
+        cache.set('shared', 0)
+        per_process = 500
+        processes = [
+            multiprocessing.Process(target=_hammer, args=(location, 'shared', per_process))
+            for _ in range(options['processes'])
+        ]
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join()
+        self.stdout.write(
+            f"{options['processes']} processes x {per_process} increments -> counter = {cache.get('shared')}"
+        )
+
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(location + suffix):
+                os.remove(location + suffix)
+        os.rmdir(tmp_dir)
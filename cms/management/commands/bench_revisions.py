@@ -0,0 +1,94 @@
+import random
+import time
+import zlib
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from articles.models import Article
+from cms.bench import benchmark_database
+from cms.revisions import get_revision, revisions_for
+
+WORDS = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore".split()
+
+
+def sentence(rnd):
+    return ' '.join(rnd.choice(WORDS) for _ in range(rnd.randint(8, 20))).capitalize() + '.'
+
+
+def paragraph(rnd):
+    return '<p>' + ' '.join(sentence(rnd) for _ in range(rnd.randint(2, 5))) + '</p>'
+
+
+def edit(content, rnd):
+    """One editor change: reword a sentence (most often), add or drop a paragraph."""
+    paragraphs = content.split('\n')
+    k = rnd.randrange(len(paragraphs))
+    roll = rnd.random()
+    if roll < 0.7:
+        sentences = paragraphs[k][3:-4].split('. ')
+        sentences[rnd.randrange(len(sentences))] = sentence(rnd).rstrip('.')
+        paragraphs[k] = '<p>' + '. '.join(sentences) + '</p>'
+    elif roll < 0.9 or len(paragraphs) < 5:
+        paragraphs.insert(k, paragraph(rnd))
+    else:
+        del paragraphs[k]
+    return '\n'.join(paragraphs)
+
+
+class Command(BaseCommand):
+    help = "Revision storage size and reconstruction latency for one article edited many times."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--edits', type=int, default=500)
+        parser.add_argument('--paragraphs', type=int, default=30)
+        parser.add_argument('--snapshot-every', type=int, nargs='+', default=[1, 10, 20, 50])
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"1 article, {options['paragraphs']} paragraphs, {options['edits']} edits")
+        self.stdout.write(
+            f"{'snapshot every':<16}{'stored KB':>11}{'vs full':>9}{'save ms':>9}"
+            f"{'rebuild avg ms':>16}{'p95 ms':>8}{'max ms':>8}"
+        )
+
+        with benchmark_database():
+            for every in options['snapshot_every']:
+                with override_settings(REVISION_SNAPSHOT_EVERY=every):
+                    self.run(every, options)
+
+    def run(self, every, options):
+        rnd = random.Random(42)  # same edits for every setting
+        article = Article.objects.create(
+            title="Bench article",
+            content='\n'.join(paragraph(rnd) for _ in range(options['paragraphs'])),
+        )
+        raw_bytes = zipped_bytes = 0
+
+        start = time.perf_counter()
+        for _ in range(options['edits']):
+            article.content = edit(article.content, rnd)
+            article.save()
+            raw_bytes += len(article.content.encode())
+            zipped_bytes += len(zlib.compress(article.content.encode(), 9))
+        save_ms = (time.perf_counter() - start) / options['edits'] * 1000
+
+        revisions = revisions_for(Article, article.pk)
+        stored = sum(len(data) for data in revisions.values_list('data', flat=True))
+        latest = revisions.count()
+
+        timings = []
+        for number in range(1, latest + 1):
+            start = time.perf_counter()
+            get_revision(Article, article.pk, number)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+
+        self.stdout.write(
+            f"{every:<16}{stored / 1024:>11.1f}{stored / raw_bytes:>8.1%} {save_ms:>8.2f}"
+            f"{sum(timings) / len(timings):>16.2f}{timings[int(len(timings) * 0.95)]:>8.2f}{timings[-1]:>8.2f}"
+        )
+        if every == 1:
+            self.stdout.write(
+                f"{'(raw copies)':<16}{raw_bytes / 1024:>11.1f}{1:>8.1%}\n"
+                f"{'(zlib copies)':<16}{zipped_bytes / 1024:>11.1f}{zipped_bytes / raw_bytes:>8.1%}"
+            )
@@ -0,0 +1,112 @@
+import os
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management.base import BaseCommand
+from django.db.models import FileField
+from django.db.models.signals import pre_save
+from django.utils import timezone
+
+from articles.models import Article
+from blog.models import Blog
+from cms.bench import benchmark_database, count_queries
+from cms.media import media_fields
+from cms.signals import global_delete_old_files_on_change
+
+User = get_user_model()
+
+
+def baseline_pre_save(sender, instance, **kwargs):
+    """The project-wide pre_save receiver as shipped before the file tracker (cms/signals.py)."""
+    if not instance.pk:
+        return False
+
+    try:
+        old_instance = sender.objects.get(pk=instance.pk)
+    except sender.DoesNotExist:
+        return False
+
+    for field in instance._meta.fields:
+        if isinstance(field, FileField):
+            old_file = getattr(old_instance, field.name)
+            new_file = getattr(instance, field.name)
+
+            if old_file and old_file != new_file:
+                if old_file.name and os.path.isfile(old_file.path):
+                    try:
+                        os.remove(old_file.path)
+                    except Exception as e:
+                        print(f"Update Error: {e}")
+
+
+def tracker_receivers():
+    """(model, dispatch_uid) of the file tracker's per-model pre_save receivers."""
+    return [
+        (model, f'delete_old_files:{model._meta.label}')
+        for model in apps.get_models() if media_fields(model)[0]
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Count SQL queries per update-save for Article, Blog, User and Session, with the baseline "
+        "pre_save receiver vs the file tracker. Every other receiver is connected in both runs."
+    )
+
+    def handle(self, *args, **options):
+        with benchmark_database():
+            scenarios = self.build_scenarios()
+
+            after = {name: count_queries(fn) for name, fn in scenarios}
+
+            # Swap the tracker for the baseline receiver, measure, put the tracker back
+            receivers = tracker_receivers()
+            for model, uid in receivers:
+                pre_save.disconnect(sender=model, dispatch_uid=uid)
+            pre_save.connect(baseline_pre_save, dispatch_uid='bench_baseline_pre_save')
+            try:
+                before = {name: count_queries(fn) for name, fn in scenarios}
+            finally:
+                pre_save.disconnect(dispatch_uid='bench_baseline_pre_save')
+                for model, uid in receivers:
+                    pre_save.connect(global_delete_old_files_on_change, sender=model, dispatch_uid=uid)
+
+        self.stdout.write(f"{'model':<10}{'baseline receiver':>19}{'file tracker':>14}")
+        for name, _fn in scenarios:
+            self.stdout.write(f"{name:<10}{before[name]:>19}{after[name]:>14}")
+
+    def build_scenarios(self):
+        Article.objects.create(title="Bench article", content="<p>Body</p>")
+        Blog.objects.create(title="Bench blog", content="Body")
+        User.objects.create_user(username="bench")
+        session = SessionStore()
+        session['seen'] = 0
+        session.create()
+
+        def save_article():
+            article = Article.objects.get(title="Bench article")
+            article.subtitle = "changed"
+            article.save()
+
+        def save_blog():
+            blog = Blog.objects.get(title="Bench blog")
+            blog.subtitle = "changed"
+            blog.save()
+
+        def save_user():
+            user = User.objects.get(username="bench")
+            user.last_login = timezone.now()
+            user.save(update_fields=['last_login'])
+
+        def save_session():
+            store = SessionStore(session_key=session.session_key)
+            store['seen'] = store.get('seen', 0) + 1
+            store.save()
+
+        return [
+            ("Article", save_article),
+            ("Blog", save_blog),
+            ("User", save_user),
+            ("Session", save_session),
+        ]
@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q
+
+from articles.models import Article
+from cms.bench import benchmark_database, time_per_call
+from cms.search import rebuild_index, search_filter
+
+SYLLABLES = "ka lo mi ren tas vel dor sun pri qua bel zor nim fey tul".split()
+# ~3400 pseudo-words, so each term only appears in a fraction of the articles
+WORDS = [a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES]
+
+QUERIES = [WORDS[10], f"{WORDS[200]} {WORDS[201]}", WORDS[3000][:4], "zebra"]
+
+
+def legacy_search(queryset, query):
+    """The old list/admin search: icontains over title, subtitle and raw HTML content."""
+    return queryset.filter(
+        Q(title__icontains=query) | Q(subtitle__icontains=query) | Q(content__icontains=query)
+    )
+
+
+class Command(BaseCommand):
+    help = "Compare icontains search with the FTS5 index on a generated set of articles."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=20000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("The full-text index needs SQLite (FTS5).")
+
+        with benchmark_database():
+            self.populate(options['rows'])
+            rebuild_index(Article)
+
+            self.stdout.write(f"{options['rows']} articles")
+            self.stdout.write(f"{'query':<20}{'icontains ms':>14}{'fts ms':>10}{'hits':>8}")
+            base = Article.objects.all()
+            for query in QUERIES:
+                legacy = time_per_call(lambda: list(legacy_search(base, query).values_list('pk')[:50]), options['repeat'])
+                fts = time_per_call(lambda: list(search_filter(base, query).values_list('pk')[:50]), options['repeat'])
+                hits = search_filter(base, query).count()
+                self.stdout.write(f"{query:<20}{legacy / 1000:>14.2f}{fts / 1000:>10.2f}{hits:>8}")
+
+    def populate(self, rows):
+        batch = []
+        for i in range(rows):
+            words = [WORDS[(i * 7919 + j * j * 104729) % len(WORDS)] for j in range(60)]
+            batch.append(Article(
+                title=f"{WORDS[i % len(WORDS)].title()} {WORDS[(i // 3) % len(WORDS)]} {i}",
+                slug=f"bench-{i}",
+                content=f"<p>{' '.join(words)}</p>" * 5,
+            ))
+            if len(batch) >= 1000:
+                Article.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            Article.objects.bulk_create(batch)
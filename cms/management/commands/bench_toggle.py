@@ -0,0 +1,69 @@
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+
+from blog.models import Blog
+from cms.bench import benchmark_database, count_queries, time_per_call
+from cms.bulk import flip_field
+
+
+def legacy_toggle(pk):
+    """The old view: load the whole row, flip in Python, save(update_fields)."""
+    obj = Blog.objects.get(pk=pk)
+    obj.active = not obj.active
+    obj.save(update_fields=['active'])
+
+
+def atomic_toggle(pk):
+    flip_field(Blog, pk, 'active', 'title')
+
+
+class Command(BaseCommand):
+    help = "Queries and latency per status toggle, and lost updates under concurrent clicks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument('--clicks', type=int, default=25, help="Toggles per thread per round.")
+        parser.add_argument('--rounds', type=int, default=10)
+
+    def handle(self, *args, **options):
+        with benchmark_database(on_disk=True):
+            blog = Blog.objects.create(title="Toggle me", content="x" * 20000)
+
+            self.stdout.write(f"{'':<10}{'queries':>10}{'us/toggle':>12}{'wrong rounds':>14}")
+            for name, toggle in (("legacy", legacy_toggle), ("atomic", atomic_toggle)):
+                queries = count_queries(lambda: toggle(blog.pk))
+                latency = time_per_call(lambda: toggle(blog.pk), repeat=200)
+                wrong = self.concurrent_rounds(toggle, blog.pk, options)
+                self.stdout.write(f"{name:<10}{queries:>10}{latency:>12.1f}{wrong:>14}/{options['rounds']}")
+
+    def concurrent_rounds(self, toggle, pk, options):
+        """Rounds whose final state disagrees with the number of clicks made."""
+        wrong = 0
+        for _ in range(options['rounds']):
+            before = Blog.objects.values_list('active', flat=True).get(pk=pk)
+            done = []
+
+            def clicker():
+                ok = 0
+                for _ in range(options['clicks']):
+                    try:
+                        toggle(pk)
+                        ok += 1
+                    except OperationalError:
+                        pass  # "database is locked": the click failed, it was not lost
+                done.append(ok)
+                connection.close()
+
+            threads = [threading.Thread(target=clicker) for _ in range(options['threads'])]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+            after = Blog.objects.values_list('active', flat=True).get(pk=pk)
+            expected = before if sum(done) % 2 == 0 else not before
+            if after != expected:
+                wrong += 1
+        return wrong
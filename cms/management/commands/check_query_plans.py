@@ -0,0 +1,85 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from articles.models import Article
+from blog.models import Blog
+from cms.bench import benchmark_database
+from cms.listing import after_cursor, filter_queryset, flag_filter, keyset_fields
+
+# Plan lines that mean "read the whole table" or "sort the whole result"
+FULL_SCAN_RE = re.compile(r'^SCAN (?!.*\bUSING\b)|USE TEMP B-TREE FOR ORDER BY')
+
+
+def hot_queries():
+    """(name, callable) for the list/filter queries the views run on every request."""
+    keys = keyset_fields(Article)
+    article_list = Article.objects.only('id', 'title', 'slug', 'is_active', 'position').order_by(*keys)
+    queries = []
+    for homepage in ('no', 'yes'):
+        page = filter_queryset('article', article_list, {'homepage': homepage})
+        queries += [
+            (f"article_list homepage={homepage}", lambda page=page: list(page[:11])),
+            (f"article_list homepage={homepage}, next page",
+             lambda page=page: list(page.filter(after_cursor(keys, [4096, 4]))[:11])),
+            (f"article_list homepage={homepage}, count", lambda page=page: page.count()),
+        ]
+    queries += [
+        ("article api, no filter", lambda: list(Article.objects.values('id', 'title').order_by(*keys)[:51])),
+        ("article default ordering", lambda: list(Article.objects.all()[:10])),
+        ("article active by homepage",
+         lambda: list(Article.objects.filter(flag_filter('show_on_homepage', True), is_active=True)
+                      .order_by('position')[:10])),
+    ]
+
+    queries.append(("public article by slug",
+                    lambda: Article.objects.filter(is_active=True, slug='bench-1').values('slug', 'title').first()))
+
+    blog_keys = keyset_fields(Blog)
+    for homepage in ('0', '1'):
+        page = filter_queryset('blog', Blog.objects.order_by(*blog_keys), {'homepage': homepage})
+        queries += [
+            (f"blog_list homepage={homepage}", lambda page=page: list(page[:11])),
+            (f"blog_list homepage={homepage}, next page",
+             lambda page=page: list(page.filter(after_cursor(blog_keys, [4096, 4]))[:11])),
+            (f"blog_list homepage={homepage}, count", lambda page=page: page.count()),
+        ]
+    queries += [
+        ("blog api, no filter", lambda: list(Blog.objects.values('id', 'title').order_by(*blog_keys)[:51])),
+        ("blog active by homepage",
+         lambda: list(Blog.objects.filter(flag_filter('homepage', True), active=True).order_by('position')[:10])),
+    ]
+    return queries
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN QUERY PLAN the list/filter hot paths and fail if any of them needs a full scan or sort."
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("check_query_plans reads SQLite's EXPLAIN QUERY PLAN output.")
+
+        failures = []
+        # Plans come from the shipped migrations, not from whatever the local DB has
+        with benchmark_database():
+            for name, run in hot_queries():
+                with CaptureQueriesContext(connection) as ctx:
+                    run()
+                details = []
+                with connection.cursor() as cursor:
+                    for captured in ctx.captured_queries:
+                        cursor.execute(f"EXPLAIN QUERY PLAN {captured['sql']}")
+                        details += [row[-1] for row in cursor.fetchall()]
+
+                bad = [detail for detail in details if FULL_SCAN_RE.search(detail)]
+                self.stdout.write(f"{'FULL SCAN' if bad else 'ok':<10} {name}")
+                for detail in details:
+                    self.stdout.write(f"           {detail}")
+                if bad:
+                    failures.append(name)
+
+        if failures:
+            raise CommandError(f"{len(failures)} query plan(s) fall back to a full scan: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS("All hot-path queries use an index."))
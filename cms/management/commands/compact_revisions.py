@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db.models import CharField, Count, Sum
+from django.db.models.functions import Cast, Length
+from django.utils import timezone
+
+from cms.models import ContentRevision
+from cms.revisions import compact, has_revisions
+from cms.views import MODEL_MAP
+
+REVISIONED = sorted(name for name, model in MODEL_MAP.items() if has_revisions(model))
+
+
+class Command(BaseCommand):
+    help = "Apply revision retention (REVISION_KEEP / REVISION_KEEP_DAYS) and re-encode the remaining revisions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', choices=REVISIONED, help="Only this model (default: all)")
+        parser.add_argument('--keep', type=int, default=None, help="Newest revisions kept per object")
+        parser.add_argument('--days', type=int, default=None, help="Also keep revisions younger than this")
+        parser.add_argument('--reencode', action='store_true',
+                            help="Rewrite every object's revisions, e.g. after changing REVISION_SNAPSHOT_EVERY")
+        parser.add_argument('--purge-deleted', action='store_true', help="Drop the history of deleted objects")
+
+    def handle(self, *args, **options):
+        keep = options['keep'] if options['keep'] is not None else getattr(settings, 'REVISION_KEEP', 200)
+        days = options['days'] if options['days'] is not None else getattr(settings, 'REVISION_KEEP_DAYS', 90)
+        before = timezone.now() - timedelta(days=days) if days else None
+        names = [options['model']] if options['model'] else REVISIONED
+        size_before = self.stored_bytes()
+
+        for name in names:
+            model = MODEL_MAP[name]
+            revisions = ContentRevision.objects.filter(content_type=ContentType.objects.get_for_model(model))
+            purged = 0
+            if options['purge_deleted']:
+                live = model._base_manager.annotate(key=Cast('pk', CharField())).values('key')
+                purged = revisions.exclude(object_id__in=live).delete()[0]
+
+            owners = revisions.values('object_id').annotate(total=Count('id'))
+            if not options['reencode']:
+                owners = owners.filter(total__gt=keep)
+
+            objects = deleted = rewritten = 0
+            for owner in owners.order_by('object_id').iterator():
+                removed, changed = compact(model, owner['object_id'], keep, before, reencode=options['reencode'])
+                objects += 1
+                deleted += removed
+                rewritten += changed
+
+            self.stdout.write(
+                f"{model._meta.label}: {objects} object(s) checked, {deleted} revision(s) deleted, "
+                f"{rewritten} re-encoded, {purged} purged"
+            )
+
+        size_after = self.stored_bytes()
+        self.stdout.write(f"Revision data: {size_before / 1024:.1f} KB -> {size_after / 1024:.1f} KB")
+
+    def stored_bytes(self):
+        return ContentRevision.objects.aggregate(total=Sum(Length('data')))['total'] or 0
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from cms.media import process_pending_deletions
+
+
+class Command(BaseCommand):
+    help = "Remove media files queued for deletion once their grace period has passed."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--loop', action='store_true', help="Keep running as a background worker.")
+        parser.add_argument('--interval', type=float, default=10.0, help="Seconds to sleep when the queue is empty.")
+
+    def handle(self, *args, **options):
+        while True:
+            deleted, failed = self.drain(options['batch_size'])
+            if deleted or failed:
+                self.stdout.write(f"Deleted {deleted} file(s), {failed} failure(s) will be retried.")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def drain(self, batch_size):
+        """Process batches until nothing due is left."""
+        total_deleted = total_failed = 0
+        while True:
+            deleted, failed = process_pending_deletions(batch_size)
+            total_deleted += deleted
+            total_failed += failed
+            if not deleted:
+                return total_deleted, total_failed
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from articles.models import Article
+from blog.models import Blog
+from cms.ordering import rebalance_positions
+
+ORDERED_MODELS = [Article, Blog]
+
+
+class Command(BaseCommand):
+    help = "Renumber positions with even gaps so drag-and-drop moves stay single-row updates."
+
+    def handle(self, *args, **options):
+        for model in ORDERED_MODELS:
+            rebalance_positions(model)
+            self.stdout.write(f"{model._meta.label}: {model._default_manager.count()} row(s) rebalanced")
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+
+from cms.media import extract_media_paths, media_fields, tracked_models
+from cms.models import MediaReference
+
+
+class Command(BaseCommand):
+    help = "Backfill the media reference index from every model that can reference media files."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        with transaction.atomic():
+            MediaReference.objects.all().delete()
+
+            for model in tracked_models():
+                content_type = ContentType.objects.get_for_model(model)
+                file_fields, text_fields = media_fields(model)
+                only = [model._meta.pk.attname] + [f.attname for f in file_fields + text_fields]
+
+                batch = []
+                total = 0
+                for instance in model._default_manager.only(*only).iterator(chunk_size=batch_size):
+                    for field_name, path in extract_media_paths(instance):
+                        batch.append(MediaReference(
+                            path=path,
+                            content_type=content_type,
+                            object_id=str(instance.pk),
+                            field=field_name,
+                        ))
+                    if len(batch) >= batch_size:
+                        MediaReference.objects.bulk_create(batch, ignore_conflicts=True)
+                        total += len(batch)
+                        batch = []
+
+                if batch:
+                    MediaReference.objects.bulk_create(batch, ignore_conflicts=True)
+                    total += len(batch)
+
+                self.stdout.write(f"{model._meta.label}: {total} reference(s)")
+
+        self.stdout.write(self.style.SUCCESS("Media reference index rebuilt."))
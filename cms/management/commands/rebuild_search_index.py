@@ -0,0 +1,21 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from cms.search import SEARCH_INDEX_MAP, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Recreate the FTS5 full-text search tables from the current articles and blogs."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("The full-text index needs SQLite (FTS5); other databases use icontains search.")
+
+        for label in SEARCH_INDEX_MAP:
+            model = apps.get_model(label)
+            total = rebuild_index(model, batch_size=options['batch_size'])
+            self.stdout.write(f"{model._meta.label}: {total} row(s) indexed")
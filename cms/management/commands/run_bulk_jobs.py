@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from cms.bulk import claimable_jobs, run_bulk_job
+
+
+class Command(BaseCommand):
+    help = (
+        "Run or resume filter-based bulk jobs that are pending or whose runner stopped "
+        "(no heartbeat for BULK_JOB_STALE_SECONDS)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Keep running as a background worker.")
+        parser.add_argument('--interval', type=float, default=10.0, help="Seconds to sleep when there is nothing to run.")
+
+    def handle(self, *args, **options):
+        while True:
+            for job_id in claimable_jobs().order_by('created_at').values_list('pk', flat=True):
+                job = run_bulk_job(job_id)
+                self.stdout.write(f"Job {job.pk}: {job.status} ({job.processed}/{job.total})")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,311 @@
+import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+from functools import lru_cache
+
+from django.apps import apps
+from django.core.exceptions import SuspiciousFileOperation
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import FileField, Q, TextField
+from django.utils import timezone
+from django.utils._os import safe_join
+
+from .models import MediaReference, PendingFileDeletion
+from .sanitize import derived_fields
+
+logger = logging.getLogger(__name__)
+
+# Apps whose models never hold user media (sessions, admin log, our own bookkeeping)
+UNTRACKED_APPS = {'admin', 'auth', 'contenttypes', 'sessions', 'cms'}
+
+
+# -------------------------
+# Model introspection
+# -------------------------
+@lru_cache(maxsize=None)
+def media_fields(model):
+    """
+    Return (file_fields, text_fields) that can point at files under MEDIA_ROOT.
+    Sanitized copies of rich text (content_html) are skipped: their source
+    field already records the same images.
+    """
+    derived = derived_fields(model)
+    file_fields = tuple(f for f in model._meta.concrete_fields if isinstance(f, FileField))
+    text_fields = tuple(
+        f for f in model._meta.concrete_fields if isinstance(f, TextField) and f.name not in derived
+    )
+    return file_fields, text_fields
+
+
+def is_tracked_model(model):
+    """True if instances of this model can reference media files."""
+    if model._meta.app_label in UNTRACKED_APPS or model._meta.proxy:
+        return False
+    file_fields, text_fields = media_fields(model)
+    return bool(file_fields or text_fields)
+
+
+def tracked_models():
+    return [model for model in apps.get_models() if is_tracked_model(model)]
+
+
+@lru_cache(maxsize=1)
+def _media_src_pattern():
+    return re.compile(r'src="' + re.escape(settings.MEDIA_URL) + r'([^"]+)"')
+
+
+def media_file_path(path):
+    """Absolute path of a MEDIA_ROOT-relative path, or None if it escapes MEDIA_ROOT."""
+    try:
+        return safe_join(settings.MEDIA_ROOT, path)
+    except (SuspiciousFileOperation, ValueError):
+        return None
+
+
+def inline_media_paths(html):
+    """
+    Paths (relative to MEDIA_ROOT) of every src="MEDIA_URL..." in a rich-text
+    value. The markup is author-controlled: paths that escape MEDIA_ROOT
+    (src="/media/../x") are dropped.
+    """
+    if not html:
+        return []
+    return [path for path in _media_src_pattern().findall(html) if media_file_path(path)]
+
+
+def extract_media_paths(instance):
+    """Return a set of (field_name, path) pairs referenced by an instance."""
+    refs = set()
+    file_fields, text_fields = media_fields(type(instance))
+
+    for field in file_fields:
+        file = getattr(instance, field.attname)
+        if file and file.name:
+            refs.add((field.name, file.name))
+
+    for field in text_fields:
+        for path in inline_media_paths(getattr(instance, field.attname, "")):
+            refs.add((field.name, path))
+
+    return refs
+
+
+# -------------------------
+# Reference index
+# -------------------------
+def _owner_filter(instance):
+    return {
+        'content_type': ContentType.objects.get_for_model(instance, for_concrete_model=True),
+        'object_id': str(instance.pk),
+    }
+
+
+def sync_media_references(instance):
+    """Bring the index rows for one instance in line with its current field values."""
+    owner = _owner_filter(instance)
+    wanted = extract_media_paths(instance)
+    existing = set(
+        MediaReference.objects.filter(**owner).values_list('field', 'path')
+    )
+
+    stale = existing - wanted
+    if stale:
+        condition = Q()
+        for field_name, path in stale:
+            condition |= Q(field=field_name, path=path)
+        MediaReference.objects.filter(condition, **owner).delete()
+
+    missing = wanted - existing
+    if missing:
+        MediaReference.objects.bulk_create(
+            [MediaReference(field=field_name, path=path, **owner) for field_name, path in missing],
+            ignore_conflicts=True,
+        )
+
+
+def sync_media_references_bulk(model, instances):
+    """sync_media_references() for a batch of one model's objects (bulk writes send no signals)."""
+    content_type = ContentType.objects.get_for_model(model, for_concrete_model=True)
+    object_ids = [str(instance.pk) for instance in instances]
+    for start in range(0, len(object_ids), 500):
+        MediaReference.objects.filter(
+            content_type=content_type, object_id__in=object_ids[start:start + 500],
+        ).delete()
+    MediaReference.objects.bulk_create(
+        [
+            MediaReference(field=field_name, path=path, content_type=content_type, object_id=str(instance.pk))
+            for instance in instances
+            for field_name, path in extract_media_paths(instance)
+        ],
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+
+
+def remove_media_references(instance):
+    MediaReference.objects.filter(**_owner_filter(instance)).delete()
+
+
+def is_media_referenced(path, exclude=None):
+    """
+    Single indexed lookup: is this MEDIA_ROOT-relative path still used anywhere?
+    `exclude` is an instance whose own references should be ignored.
+    """
+    qs = MediaReference.objects.filter(path=path)
+    if exclude is not None:
+        qs = qs.exclude(**_owner_filter(exclude))
+    return qs.exists()
+
+
+def referenced_paths(paths):
+    """Return the subset of `paths` that still has at least one reference."""
+    paths = list(set(paths))
+    found = set()
+    # Stay under SQLite's bound-variable limit
+    for start in range(0, len(paths), 500):
+        chunk = paths[start:start + 500]
+        found.update(
+            MediaReference.objects.filter(path__in=chunk).values_list('path', flat=True)
+        )
+    return found
+
+
+# -------------------------
+# Bulk deletes
+# -------------------------
+_cleanup_state = threading.local()
+
+
+@contextmanager
+def suppress_media_cleanup():
+    """Silence the per-row post_delete cleanup while a bulk path handles media itself."""
+    _cleanup_state.depth = getattr(_cleanup_state, 'depth', 0) + 1
+    try:
+        yield
+    finally:
+        _cleanup_state.depth -= 1
+
+
+def media_cleanup_suppressed():
+    return getattr(_cleanup_state, 'depth', 0) > 0
+
+
+def delete_with_media_cleanup(queryset):
+    """
+    Delete every row of `queryset` and clean up their media as one set:
+    one pass to collect paths, one set-based reference lookup, one queue write.
+    Returns the number of rows deleted from `queryset.model`.
+    """
+    model = queryset.model
+    if not is_tracked_model(model):
+        return queryset.delete()[1].get(model._meta.label, 0)
+
+    file_fields, text_fields = media_fields(model)
+    only = [model._meta.pk.attname] + [f.attname for f in file_fields + text_fields]
+
+    pks = []
+    paths = set()
+    for instance in queryset.only(*only).iterator(chunk_size=500):
+        pks.append(instance.pk)
+        paths.update(path for _field, path in extract_media_paths(instance))
+
+    if not pks:
+        return 0
+
+    content_type = ContentType.objects.get_for_model(model, for_concrete_model=True)
+    with transaction.atomic(), suppress_media_cleanup():
+        deleted = 0
+        for start in range(0, len(pks), 500):
+            chunk = pks[start:start + 500]
+            deleted += model._default_manager.filter(pk__in=chunk).delete()[1].get(model._meta.label, 0)
+            MediaReference.objects.filter(
+                content_type=content_type,
+                object_id__in=[str(pk) for pk in chunk],
+            ).delete()
+
+        queue_file_deletion(paths - referenced_paths(paths))
+
+    return deleted
+
+
+# -------------------------
+# Deferred deletion
+# -------------------------
+def deletion_grace_period():
+    return timedelta(seconds=getattr(settings, 'MEDIA_DELETION_GRACE_SECONDS', 60))
+
+
+def queue_file_deletion(paths):
+    """
+    Queue MEDIA_ROOT-relative paths for removal. Nothing is written until the
+    surrounding transaction commits, so a rollback never loses media.
+    """
+    paths = sorted({path for path in paths if path})
+    if not paths:
+        return
+    transaction.on_commit(lambda: _enqueue(paths))
+
+
+def _enqueue(paths):
+    not_before = timezone.now() + deletion_grace_period()
+    PendingFileDeletion.objects.bulk_create(
+        [PendingFileDeletion(path=path, not_before=not_before) for path in paths],
+        ignore_conflicts=True,
+    )
+
+
+def process_pending_deletions(batch_size=None):
+    """
+    Remove one batch of due files. Paths that picked up a new reference during
+    the grace period are dropped from the queue without touching the disk.
+    Failures are retried with exponential backoff. Returns (deleted, failed).
+    """
+    batch_size = batch_size or getattr(settings, 'MEDIA_DELETION_BATCH_SIZE', 200)
+    max_attempts = getattr(settings, 'MEDIA_DELETION_MAX_ATTEMPTS', 5)
+    now = timezone.now()
+
+    due = list(
+        PendingFileDeletion.objects
+        .filter(not_before__lte=now, attempts__lt=max_attempts)
+        .order_by('not_before')[:batch_size]
+    )
+    if not due:
+        return 0, 0
+
+    still_used = referenced_paths(entry.path for entry in due)
+    done, failed = [], []
+
+    for entry in due:
+        if entry.path in still_used:
+            logger.info("CLEANUP: Skipped %s (still referenced)", entry.path)
+            done.append(entry.pk)
+            continue
+
+        full_path = media_file_path(entry.path)
+        if full_path is None:
+            logger.warning("CLEANUP: Dropped %s (outside MEDIA_ROOT)", entry.path)
+            done.append(entry.pk)
+            continue
+        try:
+            if os.path.isfile(full_path):
+                os.remove(full_path)
+            done.append(entry.pk)
+            logger.info("CLEANUP: Deleted %s", entry.path)
+        except OSError as e:
+            entry.attempts += 1
+            entry.last_error = str(e)
+            entry.not_before = now + deletion_grace_period() * (2 ** entry.attempts)
+            failed.append(entry)
+            logger.warning("CLEANUP: Could not delete %s (attempt %s): %s", entry.path, entry.attempts, e)
+
+    if done:
+        PendingFileDeletion.objects.filter(pk__in=done).delete()
+    if failed:
+        PendingFileDeletion.objects.bulk_update(failed, ['attempts', 'last_error', 'not_before'])
+
+    return len(done), len(failed)
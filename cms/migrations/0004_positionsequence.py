@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-18 13:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cms', '0003_bulkjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PositionSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100, unique=True)),
+                ('last_position', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 6.0 on 2026-10-18 14:20
+
+from django.db import migrations
+
+
+def create_search_tables(apps, schema_editor):
+    # FTS5 is SQLite-only; other databases use the icontains fallback
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    from django.apps import apps as global_apps
+    from cms.search import SEARCH_INDEX_MAP, create_search_table
+
+    with schema_editor.connection.cursor() as cursor:
+        for label in SEARCH_INDEX_MAP:
+            create_search_table(global_apps.get_model(label), cursor)
+
+
+def drop_search_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    from django.apps import apps as global_apps
+    from cms.search import SEARCH_INDEX_MAP, drop_search_table
+
+    with schema_editor.connection.cursor() as cursor:
+        for label in SEARCH_INDEX_MAP:
+            drop_search_table(global_apps.get_model(label), cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cms', '0004_positionsequence'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_tables, drop_search_tables),
+    ]
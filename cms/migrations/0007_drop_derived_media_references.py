@@ -0,0 +1,26 @@
+# Generated by Django 6.0 on 2026-10-18 15:10
+
+from django.db import migrations
+
+# Sanitized copies of `content`; their images are already recorded under `content`
+DERIVED = {('articles', 'article'): ['content_html', 'content_text'], ('blog', 'blog'): ['content_html', 'content_text']}
+
+
+def drop_derived_references(apps, schema_editor):
+    MediaReference = apps.get_model('cms', 'MediaReference')
+    for (app_label, model), fields in DERIVED.items():
+        MediaReference.objects.filter(
+            content_type__app_label=app_label, content_type__model=model, field__in=fields,
+        ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cms', '0006_contentrevision'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_derived_references, migrations.RunPython.noop),
+    ]
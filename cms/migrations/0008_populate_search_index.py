@@ -0,0 +1,27 @@
+# Generated by Django 6.0 on 2026-10-18 15:05
+
+from django.db import migrations
+
+
+def populate_search_tables(apps, schema_editor):
+    # 0005 created the tables empty, and search switches to them as soon as
+    # they exist: index the rows that predate them
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    from cms.search import SEARCH_INDEX_MAP, rebuild_index
+
+    for label in SEARCH_INDEX_MAP:
+        rebuild_index(apps.get_model(label))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cms', '0007_drop_derived_media_references'),
+        ('articles', '0003_rich_text_columns'),
+        ('blog', '0003_rich_text_columns'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_search_tables, migrations.RunPython.noop),
+    ]
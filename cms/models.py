@@ -0,0 +1,122 @@
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+
+
+class MediaReference(models.Model):
+    """
+    One place where a file under MEDIA_ROOT is used:
+    (media path -> owning model, pk, field).
+    """
+    path = models.CharField(max_length=500, db_index=True)
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.CharField(max_length=64)
+    field = models.CharField(max_length=100)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['content_type', 'object_id'], name='cms_mediaref_owner_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['content_type', 'object_id', 'field', 'path'],
+                name='cms_mediaref_unique',
+            ),
+        ]
+
+    def __str__(self):
+        return self.path
+
+
+class PendingFileDeletion(models.Model):
+    """
+    A file under MEDIA_ROOT waiting to be removed. Rows are only written once
+    the transaction that orphaned the file commits.
+    """
+    path = models.CharField(max_length=500, unique=True)
+    queued_at = models.DateTimeField(auto_now_add=True)
+    not_before = models.DateTimeField(db_index=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    def __str__(self):
+        return self.path
+
+
+class BulkJob(models.Model):
+    """
+    A bulk toggle/delete over "everything matching the current filter",
+    executed in fixed-size chunks so progress can be polled.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    model_name = models.CharField(max_length=50)
+    action = models.CharField(max_length=20)
+    filters = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    # Keyset cursor: the highest pk already handled, so a job can resume
+    last_pk = models.BigIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Set by the runner on claim and after every chunk; a running job whose
+    # heartbeat is older than BULK_JOB_STALE_SECONDS can be taken over
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.action} {self.model_name} ({self.status})"
+
+    @property
+    def percent(self):
+        if not self.total:
+            return 100 if self.status == self.STATUS_DONE else 0
+        return min(100, int(self.processed * 100 / self.total))
+
+
+class PositionSequence(models.Model):
+    """
+    Last position handed out per ordered model, so inserts take the next slot
+    with one counter update instead of a MAX(position) over the whole table.
+    """
+    model = models.CharField(max_length=100, unique=True)
+    last_position = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.model}: {self.last_position}"
+
+
+class ContentRevision(models.Model):
+    """
+    One saved state of an object's revisioned fields (see cms.revisions).
+    `data` is zlib-compressed JSON: the full field values when is_snapshot,
+    otherwise a delta against the previous revision.
+    """
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.CharField(max_length=64)
+    number = models.PositiveIntegerField()
+    is_snapshot = models.BooleanField(default=False)
+    data = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['content_type', 'object_id', 'number'],
+                name='cms_revision_unique',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.content_type_id}:{self.object_id} #{self.number}"
@@ -0,0 +1,160 @@
+from django.db import connection, models, transaction
+from django.db.models import F, Max, Q
+
+from .bulk import supports_update_returning
+from .homepage import affects_homepage, homepage_changed, homepage_fields
+from .models import PositionSequence
+from .versions import bump_version
+
+# Distance between neighbouring positions. A move takes the midpoint of two
+# neighbours, so ~10 moves into the same slot fit before a rebalance.
+POSITION_GAP = 1024
+
+
+# -------------------------
+# Position sequence
+# -------------------------
+def _advance_sequence(label, step):
+    """Add `step` to the counter and return the new value (None if there is no row yet)."""
+    if supports_update_returning():
+        table = connection.ops.quote_name(PositionSequence._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} SET last_position = last_position + %s WHERE model = %s RETURNING last_position",
+                [step, label],
+            )
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+    sequences = PositionSequence.objects.filter(model=label)
+    if not sequences.update(last_position=F('last_position') + step):
+        return None
+    return sequences.values_list('last_position', flat=True).get()
+
+
+def reserve_positions(model, count=1):
+    """
+    Reserve `count` consecutive slots at the end of the list and return the
+    first one; the rest follow at POSITION_GAP intervals. The counter row is
+    seeded from MAX(position) the first time a model asks for a slot.
+    """
+    label = model._meta.label_lower
+    step = count * POSITION_GAP
+    with transaction.atomic():
+        last = _advance_sequence(label, step)
+        if last is None:
+            current = model._default_manager.aggregate(Max('position'))['position__max'] or 0
+            PositionSequence.objects.get_or_create(model=label, defaults={'last_position': current})
+            last = _advance_sequence(label, step)
+    return last - step + POSITION_GAP
+
+
+def reset_sequence(model, last_position):
+    PositionSequence.objects.update_or_create(
+        model=model._meta.label_lower, defaults={'last_position': last_position},
+    )
+
+
+class PositionedManager(models.Manager):
+    """bulk_create() gives unpositioned objects one contiguous block of positions."""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        pending = [obj for obj in objs if not obj.position]
+        with transaction.atomic(using=self.db):
+            if pending:
+                first = reserve_positions(self.model, len(pending))
+                for index, obj in enumerate(pending):
+                    obj.position = first + index * POSITION_GAP
+            return super().bulk_create(objs, *args, **kwargs)
+
+
+# -------------------------
+# Moves
+# -------------------------
+
+def _neighbour(model, pivot_pk, pivot_pos, place, exclude_pk):
+    """Position of the row just before/after the pivot in (position, id) order."""
+    if place == 'before':
+        condition = Q(position__lt=pivot_pos) | Q(position=pivot_pos, pk__lt=pivot_pk)
+        ordering = ('-position', '-pk')
+    else:
+        condition = Q(position__gt=pivot_pos) | Q(position=pivot_pos, pk__gt=pivot_pk)
+        ordering = ('position', 'pk')
+    return (
+        model._default_manager.filter(condition)
+        .exclude(pk=exclude_pk)
+        .order_by(*ordering)
+        .values_list('position', flat=True)
+        .first()
+    )
+
+
+def _slot(pivot_pos, neighbour_pos, place):
+    """Free position between pivot and neighbour, or None if there is no gap."""
+    if neighbour_pos is None:
+        # Only reached for 'before' the first row; move_item() handles the end
+        # Position 0 means "unpositioned" to save(), so never hand it out
+        return pivot_pos // 2 if pivot_pos >= 2 else None
+
+    low, high = sorted((pivot_pos, neighbour_pos))
+    if high - low < 2:
+        return None
+    return (low + high) // 2
+
+
+def move_item(model, obj_id, target_id, place='before'):
+    """
+    Move obj_id directly before/after target_id. In the common case this
+    updates exactly one row; when the gap is used up, positions are
+    rebalanced first. Returns the new position.
+    """
+    if place not in ('before', 'after'):
+        raise ValueError("place must be 'before' or 'after'")
+
+    with transaction.atomic():
+        rows = {
+            row['pk']: row
+            for row in model._default_manager.filter(pk__in=[obj_id, target_id]).values('pk', 'position', *homepage_fields(model))
+        }
+        if obj_id not in rows or target_id not in rows:
+            raise model.DoesNotExist
+        positions = {pk: row['position'] for pk, row in rows.items()}
+
+        for _attempt in range(2):
+            target_pos = positions[target_id]
+            neighbour_pos = _neighbour(model, target_id, target_pos, place, exclude_pk=obj_id)
+            if neighbour_pos is None and place == 'after':
+                # Moving to the very end: take a fresh slot so later inserts stay after it
+                new_pos = reserve_positions(model)
+            else:
+                new_pos = _slot(target_pos, neighbour_pos, place)
+            if new_pos is not None:
+                model._default_manager.filter(pk=obj_id).update(position=new_pos)
+                bump_version(model)
+                if affects_homepage(model, rows[obj_id]):
+                    homepage_changed(model)
+                return new_pos
+
+            rebalance_positions(model)
+            positions = dict(
+                model._default_manager.filter(pk__in=[obj_id, target_id]).values_list('pk', 'position')
+            )
+
+    raise RuntimeError("Could not find a free position after rebalancing")
+
+
+def rebalance_positions(model, batch_size=500):
+    """Renumber every row to POSITION_GAP multiples, keeping the current order."""
+    with transaction.atomic():
+        pks = list(model._default_manager.order_by('position', 'pk').values_list('pk', flat=True))
+        batch = []
+        for index, pk in enumerate(pks, start=1):
+            batch.append(model(pk=pk, position=index * POSITION_GAP))
+            if len(batch) >= batch_size:
+                model._default_manager.bulk_update(batch, ['position'])
+                batch = []
+        if batch:
+            model._default_manager.bulk_update(batch, ['position'])
+        reset_sequence(model, len(pks) * POSITION_GAP)
+        bump_version(model)
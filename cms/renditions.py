@@ -0,0 +1,190 @@
+"""
+Resized WebP renditions of uploaded images, served from /media/r/<w>x<h>/<path>.
+
+A rendition is generated with Pillow the first time it is requested and kept
+in IMAGE_RENDITION_ROOT. The file name hashes the source path, size and the
+source's mtime, so replacing an upload never serves an old thumbnail. The
+directory is capped at IMAGE_RENDITION_MAX_BYTES: every hit touches the file's
+mtime and the least recently used files are evicted first.
+
+Requests for the same rendition in one process wait on a per-key lock instead
+of all resizing the same image; across processes the atomic rename makes a
+duplicate render harmless.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+
+from django.conf import settings
+from django.utils._os import safe_join
+from django.utils.encoding import filepath_to_uri
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+
+def _root():
+    return str(getattr(settings, 'IMAGE_RENDITION_ROOT', os.path.join(settings.BASE_DIR, 'renditions')))
+
+
+def allowed_sizes():
+    return {tuple(size) for size in getattr(settings, 'IMAGE_RENDITION_SIZES', [(50, 50), (100, 100)])}
+
+
+def rendition_url(image, width, height):
+    """URL of a width x height rendition of a FieldFile or a path under MEDIA_ROOT."""
+    if (width, height) not in allowed_sizes():
+        raise ValueError(f"Rendition size {width}x{height} is not in IMAGE_RENDITION_SIZES")
+    name = getattr(image, 'name', image)
+    return f"{settings.MEDIA_URL}r/{width}x{height}/{filepath_to_uri(name)}"
+
+
+# -------------------------
+# Per-key locks
+# -------------------------
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+class _KeyLock:
+    """Lock for one cache key, dropped from the table once nobody holds it."""
+
+    def __init__(self, key):
+        self.key = key
+
+    def __enter__(self):
+        with _locks_guard:
+            entry = _locks.setdefault(self.key, [threading.Lock(), 0])
+            entry[1] += 1
+        entry[0].acquire()
+
+    def __exit__(self, *exc):
+        with _locks_guard:
+            entry = _locks[self.key]
+            entry[0].release()
+            entry[1] -= 1
+            if not entry[1]:
+                del _locks[self.key]
+
+
+# -------------------------
+# LRU eviction
+# -------------------------
+_usage = {'bytes': None}
+_evict_lock = threading.Lock()
+
+
+def _scan():
+    """(mtime, size, path) of every rendition on disk."""
+    files = []
+    for dirpath, _dirnames, filenames in os.walk(_root()):
+        for filename in filenames:
+            if not filename.endswith('.webp'):
+                continue  # a render still being written
+            path = os.path.join(dirpath, filename)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+    return files
+
+
+def evict(max_bytes=None):
+    """Delete least recently used renditions until the cache is under ~90% of its cap."""
+    max_bytes = max_bytes if max_bytes is not None else getattr(settings, 'IMAGE_RENDITION_MAX_BYTES', 256 * 1024 * 1024)
+    with _evict_lock:
+        files = _scan()
+        total = sum(size for _mtime, size, _path in files)
+        if total > max_bytes:
+            target = max_bytes * 0.9
+            for _mtime, size, path in sorted(files):
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+        _usage['bytes'] = total
+        return total
+
+
+def _account(size):
+    """Track bytes written by this process; other processes' writes show up at the next scan."""
+    if _usage['bytes'] is None:
+        evict()
+    with _evict_lock:
+        _usage['bytes'] += size
+        over = _usage['bytes'] > getattr(settings, 'IMAGE_RENDITION_MAX_BYTES', 256 * 1024 * 1024)
+    if over:
+        evict()
+
+
+# -------------------------
+# Rendering
+# -------------------------
+def source_path(name):
+    """Absolute path of an upload, or None if it escapes MEDIA_ROOT or doesn't exist."""
+    try:
+        path = safe_join(settings.MEDIA_ROOT, name)
+    except Exception:
+        return None
+    return path if os.path.isfile(path) else None
+
+
+def rendition_path(source, width, height):
+    stat = os.stat(source)
+    digest = hashlib.sha1(f"{source}|{width}x{height}|{stat.st_mtime_ns}".encode()).hexdigest()
+    return os.path.join(_root(), digest[:2], f"{digest}.webp")
+
+
+def render(source, target, width, height):
+    """Write a WebP of `source` fitting in width x height to `target` (atomically)."""
+    with Image.open(source) as img:
+        img.draft('RGB', (width, height))  # JPEG: decode at a reduced scale
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((width, height), Image.LANCZOS)
+        if img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGBA' if 'A' in img.getbands() or 'transparency' in img.info else 'RGB')
+
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                img.save(out, 'WEBP', quality=getattr(settings, 'IMAGE_RENDITION_QUALITY', 80), method=4)
+            os.replace(tmp, target)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    return os.path.getsize(target)
+
+
+def get_rendition(name, width, height):
+    """
+    Path of the rendition on disk, rendering it on a miss. Returns None if the
+    size isn't allowed or the source is missing or not an image.
+    """
+    if (width, height) not in allowed_sizes():
+        return None
+    source = source_path(name)
+    if source is None:
+        return None
+    target = rendition_path(source, width, height)
+
+    with _KeyLock(target):
+        try:
+            os.utime(target)  # hit: mark as recently used
+            return target
+        except FileNotFoundError:
+            pass
+        try:
+            size = render(source, target, width, height)
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            logger.warning(f"Rendition {width}x{height} of {name} failed: {e}")
+            return None
+
+    _account(size)
+    return target
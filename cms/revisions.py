@@ -0,0 +1,288 @@
+"""
+Revision history for the editable text fields of articles and blogs.
+
+Every save that changes a field listed in REVISION_FIELDS_MAP stores a
+ContentRevision. Full copies of every edit grow the table far faster than
+the content itself, so most revisions are a delta against the previous one:
+the changed fields only, as a list of "copy tokens i..j of the old text" /
+"insert this text" operations (tokens are HTML tags, lines and sentences).
+Every REVISION_SNAPSHOT_EVERY-th revision stores the full values instead,
+so rebuilding any revision reads one snapshot plus fewer than that many
+deltas (two queries). All payloads are zlib-compressed JSON.
+
+`manage.py compact_revisions` applies the retention settings and re-encodes
+what is left.
+"""
+import json
+import re
+import zlib
+from difflib import SequenceMatcher
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+from django.db.models.signals import post_save, pre_save
+
+from .models import ContentRevision
+from .tracking import NOT_LOADED, current_value, has_changed, original_value
+
+# Fields whose history is kept, per model
+REVISION_FIELDS_MAP = {
+    "articles.article": ["title", "content"],
+    "blog.blog": ["title", "content"],
+}
+
+# Split after tags, newlines and sentence ends; ''.join(tokens) == text
+TOKEN_RE = re.compile(r'(?<=[>\n])|(?<=[.!?] )')
+
+
+def has_revisions(model):
+    return model._meta.label_lower in REVISION_FIELDS_MAP
+
+
+def revision_fields(model):
+    return REVISION_FIELDS_MAP[model._meta.label_lower]
+
+
+def _snapshot_every():
+    return getattr(settings, 'REVISION_SNAPSHOT_EVERY', 20)
+
+
+# -------------------------
+# Encoding
+# -------------------------
+def encode(payload):
+    return zlib.compress(json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode(), 9)
+
+
+def decode(data):
+    return json.loads(zlib.decompress(bytes(data)))
+
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.split(text or '') if token]
+
+
+def make_delta(old, new):
+    """Operations turning `old` into `new`: [i, j] copies old tokens i..j, a string is inserted."""
+    old_tokens, new_tokens = tokenize(old), tokenize(new)
+    ops = []
+    matcher = SequenceMatcher(None, old_tokens, new_tokens, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append([i1, i2])
+        elif tag in ('replace', 'insert'):
+            ops.append(''.join(new_tokens[j1:j2]))
+    return ops
+
+
+def patch_tokens(old_tokens, ops):
+    new_tokens = []
+    for op in ops:
+        if isinstance(op, str):
+            new_tokens += tokenize(op)
+        else:
+            new_tokens += old_tokens[op[0]:op[1]]
+    return new_tokens
+
+
+def apply_delta(old, ops):
+    return ''.join(patch_tokens(tokenize(old), ops))
+
+
+def encode_revision(number, values, previous=None):
+    """
+    (is_snapshot, data) for revision `number`. A snapshot on every
+    REVISION_SNAPSHOT_EVERY-th number, without a previous revision, or when
+    the delta would not be smaller.
+    """
+    snapshot = encode(values)
+    if previous is None or (number - 1) % _snapshot_every() == 0:
+        return True, snapshot
+    delta = encode({
+        field: make_delta(previous.get(field), value)
+        for field, value in values.items()
+        if previous.get(field) != value
+    })
+    if len(delta) >= len(snapshot):
+        return True, snapshot
+    return False, delta
+
+
+def iter_states(revisions):
+    """
+    State after each of `revisions` (in number order, starting at a
+    snapshot). Fields rebuilt from deltas stay token lists, so a chain is
+    not re-joined and re-split at every step; join_state() gives the values.
+    """
+    state = None
+    for revision in revisions:
+        payload = decode(revision.data)
+        if revision.is_snapshot or state is None:
+            state = payload
+        else:
+            state = dict(state)
+            for field, ops in payload.items():
+                old = state.get(field)
+                state[field] = patch_tokens(old if isinstance(old, list) else tokenize(old), ops)
+        yield state
+
+
+def join_state(state):
+    return {field: ''.join(value) if isinstance(value, list) else value for field, value in state.items()}
+
+
+def replay(revisions):
+    """Field values after applying `revisions`."""
+    state = None
+    for state in iter_states(revisions):
+        pass
+    return None if state is None else join_state(state)
+
+
+# -------------------------
+# Reading
+# -------------------------
+def revisions_for(model, pk):
+    return ContentRevision.objects.filter(content_type=ContentType.objects.get_for_model(model), object_id=str(pk))
+
+
+def _load(model, pk, number=None):
+    """(number, values) of revision `number` (the latest if None), or (0, None)."""
+    revisions = revisions_for(model, pk)
+    if number is not None:
+        revisions = revisions.filter(number__lte=number)
+    start = revisions.filter(is_snapshot=True).aggregate(start=Max('number'))['start']
+    if start is None:
+        return 0, None
+    rows = list(revisions.filter(number__gte=start).order_by('number').only('number', 'is_snapshot', 'data'))
+    if number is not None and rows[-1].number != number:
+        return 0, None
+    return rows[-1].number, replay(rows)
+
+
+def get_revision(model, pk, number=None):
+    """
+    Field values of revision `number` of one object (the latest if None),
+    or None if there is no such revision. Reads the nearest snapshot at or
+    before `number` and the deltas after it.
+    """
+    return _load(model, pk, number)[1]
+
+
+def latest_revision(model, pk):
+    """(number, values) of an object's newest revision, or (0, None)."""
+    return _load(model, pk)
+
+
+# -------------------------
+# Writing
+# -------------------------
+def _store(model, pk, number, values, previous):
+    is_snapshot, data = encode_revision(number, values, previous)
+    ContentRevision.objects.create(
+        content_type=ContentType.objects.get_for_model(model),
+        object_id=str(pk),
+        number=number,
+        is_snapshot=is_snapshot,
+        data=data,
+    )
+
+
+def record_revision(instance, base=None):
+    """
+    Store the current values of the instance's revisioned fields as its next
+    revision. `base` (the values as loaded) becomes revision 1 when an
+    object that predates its history is edited for the first time.
+    """
+    model = type(instance)
+    fields = revision_fields(model)
+
+    for attempt in range(3):
+        number, previous = latest_revision(model, instance.pk)
+        values = {field: current_value(instance, field) for field in fields}
+        missing = [field for field, value in values.items() if value is NOT_LOADED]
+        if missing:
+            loaded = previous or model._base_manager.filter(pk=instance.pk).values(*missing).first() or {}
+            values.update({field: loaded.get(field) for field in missing})
+        if values == previous:
+            return None
+
+        try:
+            with transaction.atomic():
+                if previous is None and base is not None and base != values:
+                    _store(model, instance.pk, 1, base, None)
+                    number, previous = 1, base
+                _store(model, instance.pk, number + 1, values, previous)
+            return number + 1
+        except IntegrityError:
+            if attempt == 2:
+                raise  # another writer keeps taking the number
+
+
+# -------------------------
+# Retention
+# -------------------------
+def compact(model, pk, keep, before=None, reencode=False):
+    """
+    Delete an object's revisions beyond the newest `keep` that are also older
+    than `before` (a datetime, or None for no age limit), then re-encode the
+    rest so the oldest kept one is a snapshot and snapshots follow the current
+    REVISION_SNAPSHOT_EVERY. Returns (deleted, rewritten).
+    """
+    revisions = list(revisions_for(model, pk).order_by('number'))
+    if not revisions:
+        return 0, 0
+
+    droppable = revisions[:-keep] if keep else revisions[:-1]
+    dropped = [r for r in droppable if before is None or r.created_at < before]
+    # Only a run of the oldest revisions can go, or replaying the rest would break
+    cut = 0
+    while cut < len(dropped) and dropped[cut] is revisions[cut]:
+        cut += 1
+    if not cut and not reencode:
+        return 0, 0
+
+    # Rebuild every revision's values in one pass before anything is deleted
+    states = [join_state(state) for state in iter_states(revisions)]
+
+    rewritten, previous = [], None
+    for revision, values in zip(revisions[cut:], states[cut:]):
+        is_snapshot, data = encode_revision(revision.number, values, previous)
+        if is_snapshot != revision.is_snapshot or bytes(data) != bytes(revision.data):
+            revision.is_snapshot, revision.data = is_snapshot, data
+            rewritten.append(revision)
+        previous = values
+
+    with transaction.atomic():
+        ContentRevision.objects.filter(pk__in=[r.pk for r in revisions[:cut]]).delete()
+        ContentRevision.objects.bulk_update(rewritten, ['is_snapshot', 'data'], batch_size=200)
+    return cut, len(rewritten)
+
+
+# -------------------------
+# Signals
+# -------------------------
+def _before_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    fields = revision_fields(sender)
+    if update_fields is not None:
+        fields = [field for field in fields if field in update_fields]
+    instance._revision_pending = not raw and bool(fields) and (
+        instance._state.adding or any(has_changed(instance, field) for field in fields)
+    )
+    # The values as loaded, in case this object has no history yet
+    base = {field: original_value(instance, field) for field in revision_fields(sender)}
+    instance._revision_base = None if NOT_LOADED in base.values() or instance._state.adding else base
+
+
+def _after_save(sender, instance, created, raw=False, **kwargs):
+    if getattr(instance, '_revision_pending', False):
+        record_revision(instance, base=instance._revision_base)
+    instance._revision_pending = False
+
+
+def connect_revisions(model):
+    # Change detection runs in pre_save: the field tracker refreshes its snapshot in post_save
+    pre_save.connect(_before_save, sender=model, dispatch_uid=f'revisions:pre:{model._meta.label}')
+    post_save.connect(_after_save, sender=model, dispatch_uid=f'revisions:post:{model._meta.label}')
@@ -0,0 +1,123 @@
+"""
+Sanitized HTML and plain text for rich-text fields, computed at save time.
+
+CKEditor accepts any markup (allowedContent: True), so the raw `content` is
+never safe to output. Models listed in RICH_TEXT_MAP store a bleach-cleaned,
+normalized copy and a plain-text copy next to it; both are recomputed only
+when the source field changed (see cms.tracking), so rendering them costs
+nothing. Rows written without save() (bulk_create, bulk_update, raw SQL) are
+filled in by `manage.py backfill_rich_text`.
+
+Nothing here reads settings, so worker processes can import it without
+configuring Django.
+"""
+import html
+import re
+
+import bleach
+
+from .tracking import NOT_LOADED, current_value, has_changed
+
+# Per model: source field -> (sanitized HTML field, plain-text field)
+RICH_TEXT_MAP = {
+    "articles.article": {"content": ("content_html", "content_text")},
+    "blog.blog": {"content": ("content_html", "content_text")},
+}
+
+# What the CKEditor toolbar produces, minus scripting and inline styles
+ALLOWED_TAGS = {
+    'p', 'br', 'hr', 'div', 'span',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'strong', 'b', 'em', 'i', 'u', 's', 'strike', 'sub', 'sup', 'small',
+    'blockquote', 'pre', 'code',
+    'ul', 'ol', 'li', 'dl', 'dt', 'dd',
+    'a', 'img', 'figure', 'figcaption',
+    'table', 'caption', 'thead', 'tbody', 'tfoot', 'tr', 'th', 'td',
+}
+ALLOWED_ATTRIBUTES = {
+    '*': ['class'],
+    'a': ['href', 'title', 'target', 'rel'],
+    'img': ['src', 'alt', 'title', 'width', 'height'],
+    'th': ['colspan', 'rowspan', 'scope'],
+    'td': ['colspan', 'rowspan'],
+    'ol': ['start', 'type'],
+}
+ALLOWED_PROTOCOLS = {'http', 'https', 'mailto', 'tel'}
+
+# bleach strips the tags but keeps their text; these elements' text is code, not content
+DROP_ELEMENTS_RE = re.compile(r'<(script|style|template|noscript)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+BLOCK_BOUNDARY_RE = re.compile(r'<(?:br|hr|/?(?:p|div|h[1-6]|li|dt|dd|blockquote|pre|tr|td|th|figure|figcaption|table))\b[^>]*>', re.IGNORECASE)
+TAG_RE = re.compile(r'<[^>]*>')
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Building a Cleaner sets up an html5lib parser; reuse one per process
+_cleaner = bleach.Cleaner(
+    tags=ALLOWED_TAGS,
+    attributes=ALLOWED_ATTRIBUTES,
+    protocols=ALLOWED_PROTOCOLS,
+    strip=True,
+    strip_comments=True,
+)
+
+
+def sanitize_html(value):
+    """Cleaned, well-formed HTML safe to output with |safe."""
+    if not value:
+        return ''
+    return _cleaner.clean(DROP_ELEMENTS_RE.sub('', value)).strip()
+
+
+def plain_text(clean_html):
+    """Text of already-sanitized HTML, block elements separated by spaces."""
+    if not clean_html:
+        return ''
+    text = TAG_RE.sub('', BLOCK_BOUNDARY_RE.sub(' ', clean_html))
+    return WHITESPACE_RE.sub(' ', html.unescape(text)).strip()
+
+
+def render_rich_text(value):
+    """(sanitized HTML, plain text) for one source value."""
+    clean = sanitize_html(value)
+    return clean, plain_text(clean)
+
+
+def has_rich_text(model):
+    return model._meta.label_lower in RICH_TEXT_MAP
+
+
+def rich_text_sources(model):
+    return list(RICH_TEXT_MAP.get(model._meta.label_lower, {}))
+
+
+def derived_fields(model):
+    """Names of the columns computed from a rich-text source (copies, not sources)."""
+    return {name for pair in RICH_TEXT_MAP.get(model._meta.label_lower, {}).values() for name in pair}
+
+
+def update_rich_text(instance, update_fields=None):
+    """
+    Recompute the derived columns whose source changed since load. Call from
+    save(); returns `update_fields` with the derived columns added when the
+    caller restricted the save to their source.
+    """
+    added = []
+    for source, (html_field, text_field) in RICH_TEXT_MAP[instance._meta.label_lower].items():
+        if update_fields is not None and source not in update_fields:
+            continue
+        if current_value(instance, source) is NOT_LOADED:
+            continue  # deferred: not being saved either
+        if not instance._state.adding and not has_changed(instance, source):
+            continue
+        clean, text = render_rich_text(getattr(instance, source))
+        setattr(instance, html_field, clean)
+        setattr(instance, text_field, text)
+        added += [html_field, text_field]
+
+    if update_fields is None:
+        return None
+    return list(update_fields) + added
+
+
+def render_batch(rows):
+    """[(pk, source)] -> [(pk, html, text)]; runs in backfill worker processes."""
+    return [(pk, *render_rich_text(value)) for pk, value in rows]
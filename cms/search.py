@@ -0,0 +1,197 @@
+"""
+Full-text search over articles and blogs with SQLite FTS5.
+
+Each indexed model gets its own FTS5 table whose rowid is the object's pk,
+so keeping it in sync is a DELETE + INSERT by rowid on save and a DELETE on
+delete. Rich text is stored HTML-stripped. Results can be filtered with a
+`pk IN (SELECT rowid ... MATCH ...)` subquery and ranked with bm25().
+
+On other databases, or before the tables exist, callers fall back to
+icontains lookups.
+"""
+import html
+import re
+
+from django.db import connection, transaction
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save
+from django.utils.html import strip_tags
+
+# Per model: FTS column -> (model fields joined into it, bm25 weight)
+SEARCH_INDEX_MAP = {
+    "articles.article": {
+        "title": (["title"], 10.0),
+        "subtitle": (["subtitle"], 5.0),
+        "body": (["content_text"], 1.0),
+        "meta": (["meta_title", "meta_description", "meta_keywords"], 2.0),
+    },
+    "blog.blog": {
+        "title": (["title"], 10.0),
+        "subtitle": (["subtitle"], 5.0),
+        "body": (["content_text"], 1.0),
+    },
+}
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+_ready = set()
+
+
+def _columns(model):
+    return SEARCH_INDEX_MAP[model._meta.label_lower]
+
+
+def has_search_index(model):
+    return model._meta.label_lower in SEARCH_INDEX_MAP
+
+
+def fts_table(model):
+    return f"cms_fts_{model._meta.db_table}"
+
+
+def search_enabled(model):
+    """True when `model` is indexed and its FTS5 table exists on this database."""
+    if not has_search_index(model) or connection.vendor != 'sqlite':
+        return False
+    table = fts_table(model)
+    if table not in _ready:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [table])
+            if cursor.fetchone() is None:
+                return False
+        _ready.add(table)
+    return True
+
+
+# -------------------------
+# Schema
+# -------------------------
+def create_search_table(model, cursor):
+    columns = ', '.join(_columns(model))
+    cursor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table(model)} "
+        f"USING fts5({columns}, tokenize='unicode61 remove_diacritics 2')"
+    )
+
+
+def drop_search_table(model, cursor):
+    cursor.execute(f"DROP TABLE IF EXISTS {fts_table(model)}")
+    _ready.discard(fts_table(model))
+
+
+# -------------------------
+# Documents
+# -------------------------
+def _text(value):
+    """Plain text of a (possibly rich-text) value."""
+    if not value:
+        return ''
+    return html.unescape(strip_tags(str(value)))
+
+
+def document(instance):
+    """Row values for the FTS table, in column order."""
+    return [
+        ' '.join(filter(None, (_text(getattr(instance, name)) for name in fields)))
+        for fields, _weight in _columns(type(instance)).values()
+    ]
+
+
+def indexed_fields(model):
+    return [name for fields, _weight in _columns(model).values() for name in fields]
+
+
+def index_objects(model, objs):
+    """(Re)index objects, e.g. after bulk_create, which sends no signals."""
+    if not search_enabled(model):
+        return
+    table = fts_table(model)
+    placeholders = ', '.join(['%s'] * (len(_columns(model)) + 1))
+    rows = [[obj.pk] + document(obj) for obj in objs]
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {table} WHERE rowid = %s", [[row[0]] for row in rows])
+        cursor.executemany(f"INSERT INTO {table} (rowid, {', '.join(_columns(model))}) VALUES ({placeholders})", rows)
+
+
+def unindex(model, pk):
+    if not search_enabled(model):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {fts_table(model)} WHERE rowid = %s", [pk])
+
+
+def rebuild_index(model, batch_size=1000):
+    """Recreate the table from scratch (picks up column changes too). Returns rows indexed."""
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            drop_search_table(model, cursor)
+            create_search_table(model, cursor)
+
+        total = 0
+        batch = []
+        for obj in model._default_manager.only(*indexed_fields(model)).iterator(chunk_size=batch_size):
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                index_objects(model, batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            index_objects(model, batch)
+            total += len(batch)
+    return total
+
+
+# -------------------------
+# Queries
+# -------------------------
+def match_expression(query):
+    """
+    User input -> FTS5 query: every word must match, as a prefix, so
+    "weekly upd" finds "Weekly update". Returns None if there are no words.
+    """
+    tokens = TOKEN_RE.findall(query or '')
+    if not tokens:
+        return None
+    return ' '.join('"{}"*'.format(token.replace('"', '""')) for token in tokens)
+
+
+def search_filter(queryset, query):
+    """Restrict `queryset` to full-text matches (caller checks search_enabled first)."""
+    expression = match_expression(query)
+    if expression is None:
+        return queryset
+    table = fts_table(queryset.model)
+    return queryset.filter(pk__in=RawSQL(f"SELECT rowid FROM {table} WHERE {table} MATCH %s", [expression]))
+
+
+def annotate_rank(queryset, query, name='rank'):
+    """Add bm25() relevance as `name` (lower is better)."""
+    expression = match_expression(query)
+    if expression is None:
+        return queryset
+    model = queryset.model
+    table = fts_table(model)
+    weights = ', '.join(str(weight) for _fields, weight in _columns(model).values())
+    pk_column = f"{connection.ops.quote_name(model._meta.db_table)}.{connection.ops.quote_name(model._meta.pk.column)}"
+    return queryset.annotate(**{name: RawSQL(
+        f"SELECT bm25({table}, {weights}) FROM {table} WHERE {table} MATCH %s AND rowid = {pk_column}",
+        [expression],
+    )})
+
+
+# -------------------------
+# Signals
+# -------------------------
+def _on_save(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not set(update_fields) & set(indexed_fields(sender)):
+        return
+    index_objects(sender, [instance])
+
+
+def _on_delete(sender, instance, **kwargs):
+    unindex(sender, instance.pk)
+
+
+def connect_search_index(model):
+    post_save.connect(_on_save, sender=model, dispatch_uid=f'search_index:save:{model._meta.label}')
+    post_delete.connect(_on_delete, sender=model, dispatch_uid=f'search_index:delete:{model._meta.label}')
@@ -89,6 +89,28 @@ DATABASES = {
 }
 
 
+# Cache
+# Counters (rate limits, content versions) must be shared by every worker
+# process, so the cache lives in SQLite (WAL) files instead of LocMemCache.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'cms.cache.SQLiteCache',
+        'LOCATION': BASE_DIR / 'cache.sqlite3',
+    },
+    'ratelimit': {
+        'BACKEND': 'cms.cache.SQLiteCache',
+        'LOCATION': BASE_DIR / 'ratelimit.sqlite3',
+        'OPTIONS': {'COMPACT_EVERY': 1000},
+    },
+}
+
+RATELIMIT_USE_CACHE = 'ratelimit'
+
+# Tests get throwaway copies of these caches (cms.cache.temporary_caches)
+TEST_RUNNER = 'cms.test_runner.TestRunner'
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -176,6 +198,50 @@ IMAGE_ALLOWED_MIMETYPES = [
     'image/webp',
     'image/heic'
 ]
+# Full image decodes run in this many worker processes (0 = in the request thread)
+IMAGE_VERIFY_WORKERS = 2
+IMAGE_VERIFY_TIMEOUT = 10  # seconds
+
+# Resized WebP renditions served from MEDIA_URL + 'r/<w>x<h>/<path>'
+IMAGE_RENDITION_ROOT = BASE_DIR / 'renditions'
+IMAGE_RENDITION_SIZES = [(50, 50), (100, 100), (300, 200), (600, 400)]  # the only sizes served
+IMAGE_RENDITION_MAX_BYTES = 256 * 1024 * 1024  # least recently used renditions are evicted past this
+IMAGE_RENDITION_QUALITY = 80
+IMAGE_RENDITION_MAX_AGE = 86400  # browser cache, seconds
+
+
+# Orphaned media is removed by `manage.py process_file_deletions`
+MEDIA_DELETION_GRACE_SECONDS = 60
+MEDIA_DELETION_MAX_ATTEMPTS = 5
+MEDIA_DELETION_BATCH_SIZE = 200
+
+# "Select all matching" bulk actions run in chunks of this many rows
+BULK_ACTION_CHUNK_SIZE = 500
+# A running bulk job without a heartbeat for this long is taken over by run_bulk_jobs
+BULK_JOB_STALE_SECONDS = 120
+
+# List totals and AJAX list partials are cached per content version; these only
+# bound how long an unused entry lingers
+LIST_COUNT_CACHE_SECONDS = 300
+LIST_PARTIAL_CACHE_SECONDS = 300
+PUBLIC_API_CACHE_SECONDS = 300
+
+# Most items kept per model in the materialized homepage snapshot
+HOMEPAGE_MAX_ITEMS = 50
+
+# sitemap.xml and feeds: where the public pages live (None = the requesting host)
+PUBLIC_SITE_URL = None
+PUBLIC_URL_PATTERNS = {"article": "/articles/{slug}/", "blog": "/blog/{slug}/"}
+SITEMAP_MAX_URLS = 50000
+FEED_MAX_ITEMS = 50
+SYNDICATION_CACHE_SECONDS = 3600
+
+# Revision history: a full snapshot every N revisions, deltas in between.
+# compact_revisions keeps the newest REVISION_KEEP revisions per object, and
+# anything younger than REVISION_KEEP_DAYS (None = no age limit)
+REVISION_SNAPSHOT_EVERY = 20
+REVISION_KEEP = 200
+REVISION_KEEP_DAYS = 90
 
 
 CKEDITOR_UPLOAD_PATH = "uploads/"
@@ -34,91 +34,130 @@
 #             if old_file and old_file != new_file:
 #                 if os.path.isfile(old_file.path):
 #                     old_file.delete(save=False)
-import os
-import re
-from django.db.models.signals import post_delete, pre_save
+import logging
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
-from django.db.models import FileField, TextField
-from django.conf import settings
 from django.apps import apps
 
+from .media import (
+    extract_media_paths,
+    is_media_referenced,
+    is_tracked_model,
+    media_cleanup_suppressed,
+    media_fields,
+    queue_file_deletion,
+    referenced_paths,
+    remove_media_references,
+    sync_media_references,
+)
+from .homepage import connect_homepage, has_homepage, homepage_fields
+from .sanitize import has_rich_text, rich_text_sources
+from .revisions import connect_revisions, has_revisions, revision_fields
+from .search import connect_search_index, has_search_index
+from .slugs import connect_slug_index
+from .tracking import NOT_LOADED, current_value, original_value, track_fields
+from .versions import connect_versioning, has_versions
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------
+# 0. Keep the media reference index in sync
+# ---------------------------------------------------------
+@receiver(post_save)
+def global_sync_media_references(sender, instance, raw=False, **kwargs):
+    if raw or not is_tracked_model(sender):
+        return
+    sync_media_references(instance)
+
 # ---------------------------------------------------------
 # 1. Cleanup when object is DELETED (With Cross-Model Check)
 # ---------------------------------------------------------
 @receiver(post_delete)
 def global_delete_files_on_delete(sender, instance, **kwargs):
     """
-    Deletes files only if they are not used by ANY model in the project.
-    """
-    for field in instance._meta.fields:
-        # A. Standard FileFields
-        if isinstance(field, FileField):
-            file = getattr(instance, field.name)
-            if file and file.name and os.path.isfile(file.path):
-                try:
-                    os.remove(file.path)
-                except Exception as e:
-                    print(f"Error: {e}")
-
-        # B. CKEditor Images with Cross-Model Check
-        elif isinstance(field, TextField):
-            content = getattr(instance, field.name, "")
-            if not content:
-                continue
-
-            pattern = r'src="' + re.escape(settings.MEDIA_URL) + r'([^"]+)"'
-            image_paths = re.findall(pattern, content)
-
-            for path in image_paths:
-                full_path = os.path.join(settings.MEDIA_ROOT, path)
-                img_url_to_check = settings.MEDIA_URL + path
-                
-                if is_image_in_use_anywhere(img_url_to_check):
-                    print(f"CLEANUP: Skipped {path} (Still used in another record)")
-                else:
-                    if os.path.exists(full_path):
-                        try:
-                            os.remove(full_path)
-                            print(f"CLEANUP: Deleted {path} (No usage anywhere)")
-                        except Exception as e:
-                            print(f"ERROR: {e}")
-
-def is_image_in_use_anywhere(img_url):
+    Queues files for deletion only if they are not used by ANY model in the
+    project. Usage is resolved with one lookup against the media reference index.
     """
-    Searches all models in the project for a specific image URL.
-    """
-    # Loop through every model registered in your Django project
-    for model in apps.get_models():
-        # Look for models that have TextFields
-        text_fields = [f.name for f in model._meta.fields if isinstance(f, TextField)]
-        
-        for field_name in text_fields:
-            # Check if any record in this model contains the image URL
-            if model.objects.filter(**{f"{field_name}__icontains": img_url}).exists():
-                return True
-    return False
+    if not is_tracked_model(sender) or media_cleanup_suppressed():
+        return
+
+    paths = {path for _field, path in extract_media_paths(instance)}
+    remove_media_references(instance)
+    if not paths:
+        return
+
+    still_used = referenced_paths(paths)
+    orphaned = paths - still_used
+    for path in still_used:
+        logger.info("CLEANUP: Skipped %s (Still used in another record)", path)
+    queue_file_deletion(orphaned)
 
 # ---------------------------------------------------------
 # 2. Cleanup when file is UPDATED (FileFields)
 # ---------------------------------------------------------
-@receiver(pre_save)
 def global_delete_old_files_on_change(sender, instance, **kwargs):
-    if not instance.pk:
+    """
+    Only connected to models that declare FileFields. Old file names come
+    from the snapshot taken when the instance was loaded, so no SELECT runs.
+    """
+    if not instance.pk or instance._state.adding:
         return False
 
-    try:
-        old_instance = sender.objects.get(pk=instance.pk)
-    except sender.DoesNotExist:
-        return False
+    file_fields = media_fields(sender)[0]
+    old_names = {f.attname: original_value(instance, f.attname) for f in file_fields}
+
+    # Deferred file fields were never loaded; fetch just those columns
+    not_loaded = [attname for attname, name in old_names.items() if name is NOT_LOADED]
+    if not_loaded:
+        row = sender._base_manager.filter(pk=instance.pk).values(*not_loaded).first()
+        if row is None:
+            return False
+        old_names.update(row)
+
+    orphaned = []
+    for field in file_fields:
+        old_name = old_names[field.attname]
+        new_name = current_value(instance, field.attname)
+
+        if old_name and old_name != new_name:
+            if not is_media_referenced(old_name, exclude=instance):
+                orphaned.append(old_name)
+
+    # Removed from disk only after the save commits (see process_file_deletions)
+    queue_file_deletion(orphaned)
+
+
+for _model in apps.get_models():
+    if media_fields(_model)[0]:
+        track_fields(_model, [f.attname for f in media_fields(_model)[0]])
+        pre_save.connect(
+            global_delete_old_files_on_change,
+            sender=_model,
+            dispatch_uid=f'delete_old_files:{_model._meta.label}',
+        )
+
+    # Rich-text sources, so sanitized copies are only rebuilt when they change
+    if has_rich_text(_model):
+        track_fields(_model, rich_text_sources(_model))
+
+    # Keep the in-memory slug index used by ajax_check_slug coherent
+    if any(f.name == 'slug' and f.unique for f in _model._meta.concrete_fields):
+        connect_slug_index(_model)
+
+    # Keep the FTS5 search tables in step with saves and deletes
+    if has_search_index(_model):
+        connect_search_index(_model)
+
+    # Content version counters behind cached counts and list partials
+    if has_versions(_model):
+        connect_versioning(_model)
+
+    # Homepage snapshots, rebuilt only when a homepage row changes
+    if has_homepage(_model):
+        track_fields(_model, homepage_fields(_model))
+        connect_homepage(_model)
 
-    for field in instance._meta.fields:
-        if isinstance(field, FileField):
-            old_file = getattr(old_instance, field.name)
-            new_file = getattr(instance, field.name)
-
-            if old_file and old_file != new_file:
-                if old_file.name and os.path.isfile(old_file.path):
-                    try:
-                        os.remove(old_file.path)
-                    except Exception as e:
-                        print(f"Update Error: {e}")
\ No newline at end of file
+    # Delta-compressed edit history of the text fields
+    if has_revisions(_model):
+        track_fields(_model, revision_fields(_model))
+        connect_revisions(_model)
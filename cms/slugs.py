@@ -0,0 +1,245 @@
+import re
+import threading
+
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+
+# ASCII digits only: \d and str.isdigit() also accept digits int() can't parse
+SUFFIX_RE = re.compile(r'^(?P<base>.+)-(?P<number>[0-9]+)$')
+NUMBER_RE = re.compile(r'[0-9]+')
+
+
+def split_suffix(slug):
+    """'weekly-update-3' -> ('weekly-update', 3); 'weekly-update' -> ('weekly-update', None)"""
+    match = SUFFIX_RE.match(slug)
+    if not match:
+        return slug, None
+    return match.group('base'), int(match.group('number'))
+
+
+# -------------------------
+# Allocation
+# -------------------------
+def _suffixed(base):
+    """`<base>-...` as a lookup the slug index can serve."""
+    if connection.vendor == 'sqlite':
+        # LIKE is case-insensitive in SQLite and skips the index; a range doesn't
+        return Q(slug__gte=f"{base}-", slug__lt=f"{base}.")
+    # PostgreSQL/MySQL serve LIKE 'base-%' from the (pattern) index
+    return Q(slug__startswith=f"{base}-")
+
+
+def _allocate(base, max_length, taken_for):
+    """
+    `base` if it is free, otherwise `<base>-<highest N + 1>`. `taken_for(base)`
+    returns the taken slugs among `base` and `<base>-...`; unique_slug() and
+    SlugIndex.suggest() differ only in where they look.
+    """
+    base = base[:max_length]
+    while True:
+        taken = taken_for(base)
+        if base not in taken:
+            return base
+
+        prefix = f"{base}-"
+        numbers = [
+            int(slug[len(prefix):]) for slug in taken
+            if slug.startswith(prefix) and NUMBER_RE.fullmatch(slug[len(prefix):])
+        ]
+        slug = f"{prefix}{max(numbers, default=0) + 1}"
+        if len(slug) <= max_length:
+            return slug
+        # No room for the suffix: shorten the base and look again
+        base = base[:max_length - (len(slug) - len(base))].rstrip('-')
+
+
+def unique_slug(model, base, exclude_pk=None):
+    """
+    `base` if it is free, otherwise `<base>-<highest N + 1>`, found with one
+    indexed query however many copies already exist.
+    """
+    def taken_for(base):
+        # order_by(): the default ordering would make SQLite walk the position index
+        queryset = model._default_manager.filter(Q(slug=base) | _suffixed(base)).order_by()
+        if exclude_pk is not None:
+            queryset = queryset.exclude(pk=exclude_pk)
+        return set(queryset.values_list('slug', flat=True))
+
+    return _allocate(base, model._meta.get_field('slug').max_length, taken_for)
+
+
+def unique_slugs(model, bases):
+    """
+    unique_slug() for a batch of new objects (bulk imports): one query per
+    200 distinct bases, and no slug is handed out twice within the batch.
+    """
+    max_length = model._meta.get_field('slug').max_length
+    bases = [base[:max_length] for base in bases]
+    distinct = list(dict.fromkeys(bases))
+
+    taken = set()
+    for start in range(0, len(distinct), 200):
+        condition = Q()
+        for base in distinct[start:start + 200]:
+            condition |= Q(slug=base) | _suffixed(base)
+        taken.update(model._default_manager.filter(condition).order_by().values_list('slug', flat=True))
+
+    highest = {}
+    for slug in taken:
+        base, number = split_suffix(slug)
+        if number is not None:
+            highest[base] = max(highest.get(base, 0), number)
+
+    slugs = []
+    for base in bases:
+        slug = base
+        if slug in taken:
+            highest[base] = highest.get(base, 0) + 1
+            slug = f"{base}-{highest[base]}"
+            if len(slug) > max_length:
+                # No room for the suffix: let unique_slug() shorten the base
+                slug = unique_slug(model, base[:max_length - (len(slug) - len(base))].rstrip('-'))
+                while slug in taken:
+                    stem, number = split_suffix(slug)
+                    slug = f"{stem}-{(number or 0) + 1}"
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def save_with_unique_slug(instance, base, save, attempts=5):
+    """
+    Give `instance` a free slug and call save(). Two writers can still pick
+    the same slug; the unique constraint catches that and we allocate again.
+    """
+    model = type(instance)
+    for attempt in range(attempts):
+        instance.slug = unique_slug(model, base, exclude_pk=instance.pk)
+        try:
+            with transaction.atomic():
+                save()
+            return
+        except IntegrityError:
+            clash = model._default_manager.filter(slug=instance.slug).exclude(pk=instance.pk).exists()
+            if not clash or attempt == attempts - 1:
+                raise
+
+
+# -------------------------
+# In-memory availability index
+# -------------------------
+class SlugIndex:
+    """
+    Per-process map of slug -> pk for one model, so availability checks never
+    touch the database. Local saves/deletes update it through signals; a
+    version counter in the cache tells other processes to reload.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.version_key = f"slug-index:{model._meta.label_lower}"
+        self.lock = threading.Lock()
+        self.version = None
+        self.by_slug = {}
+        self.by_pk = {}
+
+    # -- coherence ---------------------------------------------------------
+    def _shared_version(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            cache.add(self.version_key, 1, timeout=None)
+            version = cache.get(self.version_key, 1)
+        return version
+
+    def _bump(self):
+        try:
+            new_version = cache.incr(self.version_key)
+        except ValueError:
+            cache.add(self.version_key, 1, timeout=None)
+            new_version = None
+        # Keep our (already updated) copy unless someone else wrote in between
+        if new_version is not None and self.version is not None and new_version == self.version + 1:
+            self.version = new_version
+        else:
+            self.version = None
+
+    def _ensure_fresh(self):
+        shared = self._shared_version()
+        if self.version == shared:
+            return
+        rows = self.model._default_manager.values_list('slug', 'pk')
+        self.by_slug = dict(rows)
+        self.by_pk = {pk: slug for slug, pk in self.by_slug.items()}
+        self.version = shared
+
+    # -- writes (from signals) ---------------------------------------------
+    def record(self, pk, slug):
+        with self.lock:
+            old_slug = self.by_pk.pop(pk, None)
+            if old_slug is not None and self.by_slug.get(old_slug) == pk:
+                del self.by_slug[old_slug]
+            if slug:
+                self.by_slug[slug] = pk
+                self.by_pk[pk] = slug
+            self._bump()
+
+    def forget(self, pk):
+        self.record(pk, None)
+
+    def invalidate(self):
+        """For writes that bypass signals (queryset.update, bulk_create)."""
+        with self.lock:
+            self._bump()
+            self.version = None
+
+    # -- reads ---------------------------------------------------------------
+    def is_taken(self, slug, exclude_pk=None):
+        with self.lock:
+            self._ensure_fresh()
+            owner = self.by_slug.get(slug)
+        return owner is not None and owner != exclude_pk
+
+    def suggest(self, slug, exclude_pk=None):
+        """The slug unique_slug() would hand out for `slug`, from memory."""
+        if not self.is_taken(slug, exclude_pk):
+            return slug
+
+        def taken_for(base):
+            prefix = f"{base}-"
+            with self.lock:
+                return {
+                    taken for taken, pk in self.by_slug.items()
+                    if pk != exclude_pk and (taken == base or taken.startswith(prefix))
+                }
+
+        return _allocate(slug, self.model._meta.get_field('slug').max_length, taken_for)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_slug_index(model):
+    with _indexes_lock:
+        if model not in _indexes:
+            _indexes[model] = SlugIndex(model)
+        return _indexes[model]
+
+
+def _on_save(sender, instance, raw=False, **kwargs):
+    # Only once the write commits: a rolled-back create must not leave its
+    # slug taken, nor a rolled-back delete report a live slug as free
+    pk, slug = instance.pk, instance.slug
+    transaction.on_commit(lambda: get_slug_index(sender).record(pk, slug))
+
+
+def _on_delete(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: get_slug_index(sender).forget(pk))
+
+
+def connect_slug_index(model):
+    post_save.connect(_on_save, sender=model, dispatch_uid=f'slug_index:save:{model._meta.label}')
+    post_delete.connect(_on_delete, sender=model, dispatch_uid=f'slug_index:delete:{model._meta.label}')
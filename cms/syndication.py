@@ -0,0 +1,211 @@
+"""
+sitemap.xml and RSS/Atom feeds of active articles and blogs.
+
+Output is cached per content version (and site URL), so a crawler only
+causes a query after the content changed; with Last-Modified/ETag it
+usually gets a 304 without even that. Sitemaps stream from an
+.only()/.iterator() query and never load `content`. Past SITEMAP_MAX_URLS
+the sitemap becomes an index of per-model shards, split on pk boundaries
+so a shard is a range seek, not an OFFSET.
+"""
+import hashlib
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.encoding import iri_to_uri
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.http import http_date
+from django.utils.html import escape
+from django.utils.text import Truncator
+from django.views.decorators.http import require_GET
+
+from .versions import get_version, last_changed
+from .views import ACTIVE_FIELD_MAP, MODEL_MAP
+
+# Models in the sitemap and feeds -> feed title
+SYNDICATED_MODELS = {"article": "Articles", "blog": "Blog"}
+FEED_TYPES = {"rss": Rss201rev2Feed, "atom": Atom1Feed}
+
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+
+# -------------------------
+# Helpers
+# -------------------------
+def _site_url(request):
+    """Where the public pages live: PUBLIC_SITE_URL, or the host that asked."""
+    return (getattr(settings, 'PUBLIC_SITE_URL', None) or request.build_absolute_uri('/')).rstrip('/')
+
+
+def public_url(site_url, model_name, slug):
+    patterns = getattr(settings, 'PUBLIC_URL_PATTERNS', {"article": "/articles/{slug}/", "blog": "/blog/{slug}/"})
+    return iri_to_uri(site_url + patterns[model_name].format(slug=slug))
+
+
+def _active(model_name):
+    return MODEL_MAP[model_name]._default_manager.filter(**{ACTIVE_FIELD_MAP[model_name]: True})
+
+
+def _stamp(model_names, *extra):
+    """(ETag, Last-Modified timestamp) from the content versions of `model_names`."""
+    versions = '-'.join(f"{name}{get_version(MODEL_MAP[name])}" for name in model_names)
+    digest = hashlib.md5('|'.join(map(str, extra)).encode()).hexdigest()[:12]
+    modified = max(last_changed(MODEL_MAP[name]) for name in model_names)
+    return f'"{versions}-{digest}"', modified
+
+
+def _cached_xml(request, key, etag, modified, chunks, content_type='application/xml'):
+    """
+    304 if the client is current; else the cached document; else stream
+    chunks() to the client and cache the whole document once it completes.
+    """
+    response = get_conditional_response(request, etag=etag, last_modified=int(modified))
+    if response is None:
+        body = cache.get(key)
+        if body is not None:
+            response = HttpResponse(body, content_type=content_type)
+        else:
+            def stream():
+                parts = []
+                for chunk in chunks():
+                    parts.append(chunk)
+                    yield chunk
+                cache.set(key, ''.join(parts), getattr(settings, 'SYNDICATION_CACHE_SECONDS', 3600))
+
+            response = StreamingHttpResponse(stream(), content_type=content_type)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(modified)
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+# -------------------------
+# Sitemap
+# -------------------------
+def _max_urls():
+    return getattr(settings, 'SITEMAP_MAX_URLS', 50000)
+
+
+def shard_bounds(model_name):
+    """
+    (row count, [first pk of each shard]) for one model, cached per content
+    version. Reads only the pk index.
+    """
+    model = MODEL_MAP[model_name]
+    key = f"sitemap-shards:{model._meta.label_lower}:{get_version(model)}:{_max_urls()}"
+    bounds = cache.get(key)
+    if bounds is None:
+        count, starts = 0, []
+        for pk in _active(model_name).order_by('pk').values_list('pk', flat=True).iterator(chunk_size=10000):
+            if count % _max_urls() == 0:
+                starts.append(pk)
+            count += 1
+        bounds = (count, starts)
+        cache.set(key, bounds, getattr(settings, 'SYNDICATION_CACHE_SECONDS', 3600))
+    return bounds
+
+
+def _url_entries(site_url, model_name, start=None, stop=None):
+    queryset = _active(model_name).order_by('pk')
+    if start is not None:
+        queryset = queryset.filter(pk__gte=start)
+    if stop is not None:
+        queryset = queryset.filter(pk__lt=stop)
+    for obj in queryset.only('pk', 'slug', 'updated_at').iterator(chunk_size=2000):
+        yield (
+            f"<url><loc>{escape(public_url(site_url, model_name, obj.slug))}</loc>"
+            f"<lastmod>{obj.updated_at.date().isoformat()}</lastmod></url>\n"
+        )
+
+
+def _urlset(site_url, parts):
+    """parts: [(model_name, start_pk, stop_pk)]"""
+    yield f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_NS}">\n'
+    for model_name, start, stop in parts:
+        yield from _url_entries(site_url, model_name, start, stop)
+    yield '</urlset>\n'
+
+
+@require_GET
+def sitemap(request):
+    """All active articles and blogs in one urlset, or a sitemap index once that would exceed SITEMAP_MAX_URLS"""
+    site_url = _site_url(request)
+    names = list(SYNDICATED_MODELS)
+    etag, modified = _stamp(names, site_url, request.get_host(), _max_urls())
+    bounds = {name: shard_bounds(name) for name in names}
+
+    if sum(count for count, _starts in bounds.values()) <= _max_urls():
+        chunks = lambda: _urlset(site_url, [(name, None, None) for name in names])
+        return _cached_xml(request, f"sitemap:{etag}", etag, modified, chunks)
+
+    def index():
+        yield f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{SITEMAP_NS}">\n'
+        for name in names:
+            lastmod = datetime.fromtimestamp(last_changed(MODEL_MAP[name]), timezone.utc).isoformat(timespec='seconds')
+            for page in range(1, len(bounds[name][1]) + 1):
+                loc = request.build_absolute_uri(reverse('sitemap_shard', args=[name, page]))
+                yield f"<sitemap><loc>{escape(loc)}</loc><lastmod>{lastmod}</lastmod></sitemap>\n"
+        yield '</sitemapindex>\n'
+
+    return _cached_xml(request, f"sitemap-index:{etag}", etag, modified, index)
+
+
+@require_GET
+def sitemap_shard(request, model_name, page):
+    """One SITEMAP_MAX_URLS slice of a model's URLs, between two pk boundaries"""
+    if model_name not in SYNDICATED_MODELS:
+        raise Http404("No such sitemap")
+    _count, starts = shard_bounds(model_name)
+    if not 1 <= page <= len(starts):
+        raise Http404("No such sitemap")
+
+    site_url = _site_url(request)
+    start = starts[page - 1]
+    stop = starts[page] if page < len(starts) else None
+    etag, modified = _stamp([model_name], site_url, _max_urls(), page)
+    chunks = lambda: _urlset(site_url, [(model_name, start, stop)])
+    return _cached_xml(request, f"sitemap-shard:{etag}", etag, modified, chunks)
+
+
+# -------------------------
+# Feeds
+# -------------------------
+@require_GET
+def feed(request, model_name, kind):
+    """RSS 2.0 / Atom feed of the most recently updated active items"""
+    if model_name not in SYNDICATED_MODELS or kind not in FEED_TYPES:
+        raise Http404("No such feed")
+
+    site_url = _site_url(request)
+    etag, modified = _stamp([model_name], site_url, request.build_absolute_uri(), kind)
+
+    def chunks():
+        generator = FEED_TYPES[kind](
+            title=SYNDICATED_MODELS[model_name],
+            link=site_url + '/',
+            description=f"Latest {SYNDICATED_MODELS[model_name].lower()}",
+            feed_url=request.build_absolute_uri(),
+        )
+        items = (
+            _active(model_name)
+            .only('pk', 'slug', 'title', 'content_text', 'updated_at')
+            .order_by('-updated_at', '-pk')[:getattr(settings, 'FEED_MAX_ITEMS', 50)]
+        )
+        for obj in items.iterator():
+            link = public_url(site_url, model_name, obj.slug)
+            generator.add_item(
+                title=obj.title,
+                link=link,
+                unique_id=link,
+                description=Truncator(obj.content_text).chars(500),
+                updateddate=obj.updated_at,
+                pubdate=obj.updated_at,
+            )
+        yield generator.writeString('utf-8')
+
+    return _cached_xml(request, f"feed:{etag}", etag, modified, chunks, FEED_TYPES[kind].content_type)
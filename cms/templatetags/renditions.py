@@ -0,0 +1,17 @@
+from django import template
+
+from cms.renditions import rendition_url
+
+register = template.Library()
+
+
+@register.filter
+def rendition(image, size):
+    """
+    URL of a resized WebP rendition of an image field, e.g.
+    {{ article.image|rendition:"100x100" }}. Empty if there is no image.
+    """
+    if not image:
+        return ''
+    width, height = (int(part) for part in size.split('x'))
+    return rendition_url(image, width, height)
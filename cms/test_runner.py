@@ -0,0 +1,18 @@
+from contextlib import ExitStack
+
+from django.test.runner import DiscoverRunner
+
+from .cache import temporary_caches
+
+
+class TestRunner(DiscoverRunner):
+    """DiscoverRunner that gives the test run its own caches (see temporary_caches)."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._caches = ExitStack()
+        self._caches.enter_context(temporary_caches())
+
+    def teardown_test_environment(self, **kwargs):
+        self._caches.close()
+        super().teardown_test_environment(**kwargs)
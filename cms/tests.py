@@ -0,0 +1,857 @@
+import io
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import closing
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from PIL import Image
+
+from . import homepage, images, renditions
+from .bulk import apply_action, claimable_jobs, flip_field, run_bulk_job
+from .cache import SQLiteCache
+from .homepage import get_snapshot
+from .media import inline_media_paths, media_file_path, process_pending_deletions
+from .models import BulkJob, PendingFileDeletion
+from .ordering import POSITION_GAP, move_item
+from .sanitize import render_rich_text, sanitize_html
+from .search import rebuild_index, search_enabled, search_filter
+from .syndication import shard_bounds
+from .transfer import (
+    FORMATS,
+    batched,
+    clean_row,
+    export_rows,
+    import_batch,
+    read_rows,
+    transfer_fields,
+    write_rows,
+)
+from .versions import bump_version, get_version
+
+
+class SQLiteCacheTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.location = os.path.join(directory.name, 'cache.sqlite3')
+        self.cache = SQLiteCache(self.location, {})
+
+    def test_set_get_and_expiry(self):
+        self.cache.set('key', {'a': 1})
+        self.assertEqual(self.cache.get('key'), {'a': 1})
+        self.cache.set('gone', 1, timeout=-1)
+        self.assertIsNone(self.cache.get('gone'))
+        self.assertTrue(self.cache.add('gone', 2))
+        self.assertFalse(self.cache.add('gone', 3))
+        self.assertEqual(self.cache.get('gone'), 2)
+
+    def test_incr_is_shared_between_connections(self):
+        self.cache.add('hits', 0)
+
+        def hit():
+            other = SQLiteCache(self.location, {})
+            for _ in range(50):
+                other.incr('hits')
+
+        threads = [threading.Thread(target=hit) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.cache.get('hits'), 200)
+
+    def test_incr_of_a_missing_key_raises(self):
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+
+
+class PendingDeletionTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = os.path.join(directory.name, 'media')
+        os.makedirs(os.path.join(self.root, 'uploads'))
+        self.outside = os.path.join(directory.name, 'keep.txt')
+        for path in (os.path.join(self.root, 'uploads', 'old.png'), self.outside):
+            with open(path, 'w') as f:
+                f.write('x')
+        settings = override_settings(MEDIA_ROOT=self.root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def _queue(self, path):
+        PendingFileDeletion.objects.create(path=path, not_before=timezone.now() - timedelta(seconds=1))
+
+    def test_due_file_is_deleted(self):
+        self._queue('uploads/old.png')
+        self.assertEqual(process_pending_deletions(), (1, 0))
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'uploads', 'old.png')))
+        self.assertFalse(PendingFileDeletion.objects.exists())
+
+    def test_paths_outside_media_root_are_dropped(self):
+        self._queue('../keep.txt')
+        self.assertEqual(process_pending_deletions(), (1, 0))
+        self.assertTrue(os.path.exists(self.outside))
+        self.assertFalse(PendingFileDeletion.objects.exists())
+
+    def test_entries_not_yet_due_wait(self):
+        PendingFileDeletion.objects.create(path='uploads/old.png', not_before=timezone.now() + timedelta(minutes=1))
+        self.assertEqual(process_pending_deletions(), (0, 0))
+        self.assertTrue(os.path.exists(os.path.join(self.root, 'uploads', 'old.png')))
+
+    def test_inline_paths_must_stay_in_media_root(self):
+        self.assertIsNone(media_file_path('../keep.txt'))
+        html = '<img src="/media/uploads/a.png"><img src="/media/../keep.txt">'
+        self.assertEqual(inline_media_paths(html), ['uploads/a.png'])
+
+
+class SearchIndexTests(TestCase):
+    def test_saved_rows_are_found_by_prefix(self):
+        from blog.models import Blog
+
+        if not search_enabled(Blog):
+            self.skipTest("FTS5 needs SQLite")
+        Blog.objects.create(title="Weekly update", content="<p>Hello <b>world</b></p>")
+        Blog.objects.create(title="Other", content="<p>Nothing here</p>")
+        found = search_filter(Blog.objects.all(), "weekly wor")
+        self.assertEqual(list(found.values_list('title', flat=True)), ["Weekly update"])
+
+    def test_rebuild_indexes_rows_written_without_signals(self):
+        from blog.models import Blog
+
+        if not search_enabled(Blog):
+            self.skipTest("FTS5 needs SQLite")
+        Blog.objects.bulk_create([Blog(title="Imported post", slug="imported-post")])
+        self.assertFalse(search_filter(Blog.objects.all(), "imported").exists())
+        self.assertEqual(rebuild_index(Blog), 1)
+        self.assertTrue(search_filter(Blog.objects.all(), "imported").exists())
+
+
+def png_bytes(size=(4, 4)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, 'red').save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class SanitizeTests(TestCase):
+    def test_scripting_is_stripped(self):
+        dirty = (
+            '<p onclick="steal()">Hi<script>alert(1)</script></p>'
+            '<img src="x.png" onerror="steal()">'
+            '<a href="javascript:steal()">link</a>'
+            '<a href="  JaVaScRiPt:steal()">other</a>'
+        )
+        clean = sanitize_html(dirty)
+        for fragment in ('script', 'alert', 'onclick', 'onerror', 'steal', 'javascript'):
+            self.assertNotIn(fragment, clean.lower())
+        self.assertIn('<p>Hi</p>', clean)
+        self.assertIn('<img src="x.png">', clean)
+
+    def test_ckeditor_markup_is_kept(self):
+        markup = (
+            '<h2>Title</h2>'
+            '<p><strong>bold</strong> <em>it</em> <a href="https://example.com/" title="t">x</a></p>'
+            '<ul><li>one</li></ul>'
+            '<figure class="image"><img alt="a" height="20" src="/media/uploads/a.png" width="30">'
+            '<figcaption>caption</figcaption></figure>'
+            '<table><tbody><tr><td colspan="2">cell</td></tr></tbody></table>'
+        )
+        self.assertEqual(sanitize_html(markup), markup)
+
+    def test_inline_styles_are_dropped(self):
+        self.assertEqual(sanitize_html('<p style="color: red">x</p><style>p {}</style>'), '<p>x</p>')
+
+    def test_plain_text_separates_blocks_and_unescapes(self):
+        clean, text = render_rich_text('<h2>Fish &amp; chips</h2><p>one<br>two</p><ul><li>a</li><li>b</li></ul>')
+        self.assertEqual(text, 'Fish & chips one two a b')
+        self.assertEqual(render_rich_text(''), ('', ''))
+        self.assertEqual(render_rich_text(None), ('', ''))
+
+    def test_derived_columns_follow_the_content(self):
+        from articles.models import Article
+
+        article = Article.objects.create(title="A", content='<p onclick="x()">Hello <b>world</b></p>')
+        self.assertEqual(article.content_html, '<p>Hello <b>world</b></p>')
+        self.assertEqual(article.content_text, 'Hello world')
+
+        article.content = '<p>Changed</p>'
+        article.save(update_fields=['content'])
+        article.refresh_from_db()
+        self.assertEqual((article.content_html, article.content_text), ('<p>Changed</p>', 'Changed'))
+
+    def test_unchanged_content_is_not_recomputed(self):
+        from articles.models import Article
+
+        article = Article.objects.create(title="A", content='<p>Hello</p>')
+        Article.objects.filter(pk=article.pk).update(content_text='stale')
+        article = Article.objects.get(pk=article.pk)
+        article.title = "B"
+        article.save()
+        article.refresh_from_db()
+        self.assertEqual(article.content_text, 'stale')
+
+
+class ValidateImageTests(TestCase):
+    def setUp(self):
+        self.addCleanup(images._reset_pool, terminate=True)
+
+    def upload(self, data, name='a.png', content_type='image/png'):
+        return SimpleUploadedFile(name, data, content_type=content_type)
+
+    def test_valid_image_passes_through_the_pool(self):
+        upload = self.upload(png_bytes((40, 30)))
+        self.assertEqual(images.validate_image(upload), (40, 30))
+        self.assertEqual(upload.tell(), 0)
+
+    def test_corrupt_pixel_data_is_rejected(self):
+        data = bytearray(png_bytes((40, 30)))
+        # Damage the compressed pixels: the header (and so the size) still parses
+        start = data.index(b'IDAT') + 8
+        data[start:start + 8] = b'\x00' * 8
+        for workers in (2, 0):
+            with self.subTest(workers=workers), override_settings(IMAGE_VERIFY_WORKERS=workers):
+                with self.assertRaisesMessage(ValidationError, "corrupted"):
+                    images.validate_image(self.upload(bytes(data)))
+
+    def test_cheap_checks_reject_before_decoding(self):
+        cases = [
+            (self.upload(b"not an image at all", name='a.png'), "Invalid image file"),
+            (self.upload(png_bytes(), name='a.exe'), "Invalid file type"),
+            (self.upload(png_bytes(), content_type='text/html'), "Invalid image format"),
+            (self.upload(png_bytes((4000, 10))), "dimensions too large"),
+        ]
+        for upload, message in cases:
+            with self.subTest(message=message), self.assertRaisesMessage(ValidationError, message):
+                images.validate_image(upload)
+
+
+class ImageVerifyPoolTests(TestCase):
+    def setUp(self):
+        self.addCleanup(images._reset_pool, terminate=True)
+
+    def test_timeout_recycles_the_pool(self):
+        upload = SimpleUploadedFile('a.png', png_bytes(), content_type='image/png')
+        pool = images._get_pool()
+        # Far shorter than it takes to start a worker
+        with override_settings(IMAGE_VERIFY_TIMEOUT=0.001):
+            self.assertEqual(images._verify(upload), "timed out")
+        self.assertIsNot(images._get_pool(), pool)
+
+    def test_recycling_stops_a_running_task(self):
+        pool = images._get_pool()
+        future = pool.submit(time.sleep, 60)
+        deadline = time.monotonic() + 30
+        while not future.running() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        workers = images.pool_processes(pool)
+        images._reset_pool(pool, terminate=True)
+        for worker in workers:
+            worker.join(10)
+            self.assertFalse(worker.is_alive())
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'], IMAGE_RENDITION_SIZES=[(50, 50), (100, 100)])
+class RenditionTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = os.path.join(directory.name, 'media')
+        self.cache_root = os.path.join(directory.name, 'renditions')
+        os.makedirs(os.path.join(self.root, 'uploads'))
+        for name in ('a', 'b', 'c'):
+            with open(os.path.join(self.root, 'uploads', f'{name}.png'), 'wb') as f:
+                f.write(png_bytes((400, 300)))
+        with open(os.path.join(directory.name, 'secret.png'), 'wb') as f:
+            f.write(png_bytes())
+        settings = override_settings(MEDIA_ROOT=self.root, IMAGE_RENDITION_ROOT=self.cache_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        renditions._usage['bytes'] = None  # byte count of the previous test's directory
+
+    def url(self, width, height, path):
+        return reverse('image_rendition', kwargs={'width': width, 'height': height, 'path': path})
+
+    def test_rendition_is_served_and_reused(self):
+        response = self.client.get(self.url(100, 100, 'uploads/a.png'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        with Image.open(io.BytesIO(b''.join(response.streaming_content))) as img:
+            self.assertEqual(img.size, (100, 75))
+        path = renditions.get_rendition('uploads/a.png', 100, 100)
+        self.assertEqual(renditions._scan()[0][2], path)
+
+    def test_only_whitelisted_sizes_are_rendered(self):
+        self.assertIsNone(renditions.get_rendition('uploads/a.png', 51, 51))
+        self.assertEqual(self.client.get(self.url(51, 51, 'uploads/a.png')).status_code, 404)
+        with self.assertRaises(ValueError):
+            renditions.rendition_url('uploads/a.png', 51, 51)
+        self.assertEqual(renditions._scan(), [])
+
+    def test_paths_outside_media_root_are_rejected(self):
+        for path in ('../secret.png', 'uploads/../../secret.png', os.path.join(os.path.dirname(self.root), 'secret.png')):
+            with self.subTest(path=path):
+                self.assertIsNone(renditions.get_rendition(path, 50, 50))
+        self.assertEqual(self.client.get(self.url(50, 50, 'uploads/../../secret.png')).status_code, 404)
+        self.assertEqual(renditions._scan(), [])
+
+    def test_least_recently_used_rendition_is_evicted(self):
+        a = renditions.get_rendition('uploads/a.png', 100, 100)
+        b = renditions.get_rendition('uploads/b.png', 100, 100)
+        os.utime(a, (time.time() - 20,) * 2)
+        os.utime(b, (time.time() - 10,) * 2)
+        renditions.get_rendition('uploads/a.png', 100, 100)  # a hit makes `a` the most recent
+        size = os.path.getsize(a)
+        # Room for a bit less than three: writing `c` has to evict `b`
+        with override_settings(IMAGE_RENDITION_MAX_BYTES=3 * size - 1):
+            c = renditions.get_rendition('uploads/c.png', 100, 100)
+        self.assertTrue(os.path.exists(a))
+        self.assertFalse(os.path.exists(b))
+        self.assertTrue(os.path.exists(c))
+        self.assertEqual(renditions._usage['bytes'], 2 * size)
+
+    def test_concurrent_requests_render_once(self):
+        calls = []
+        real_render = renditions.render
+
+        def slow_render(*args):
+            calls.append(args)
+            time.sleep(0.2)
+            return real_render(*args)
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(renditions.get_rendition('uploads/a.png', 50, 50)))
+            for _ in range(4)
+        ]
+        with mock.patch.object(renditions, 'render', slow_render):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(set(results)), 1)
+        self.assertTrue(os.path.exists(results[0]))
+        self.assertEqual(renditions._locks, {})
+
+
+class HomepageSnapshotTests(TransactionTestCase):
+    # Real commits: snapshots are rebuilt on commit
+    def setUp(self):
+        from blog.models import Blog
+
+        cache.clear()
+        homepage._memory.clear()
+        self.front = Blog.objects.create(title="Front page", homepage=True, content="<p>Front</p>")
+        self.inner = Blog.objects.create(title="Inner page", content="<p>Inner</p>")
+
+    def titles(self):
+        from blog.models import Blog
+
+        # Reads never touch the content tables
+        with self.assertNumQueries(0):
+            return [item['title'] for item in get_snapshot(Blog)['items']]
+
+    def version(self):
+        from blog.models import Blog
+
+        return get_snapshot(Blog)['version']
+
+    def test_homepage_edit_is_rebuilt_on_commit(self):
+        from blog.models import Blog
+
+        snapshot = get_snapshot(Blog)
+        self.front.title = "Front page, edited"
+        self.front.save()
+        self.assertEqual(self.titles(), ["Front page, edited"])
+        self.assertNotEqual(get_snapshot(Blog)['etag'], snapshot['etag'])
+
+    def test_writes_off_the_homepage_leave_it_alone(self):
+        from blog.models import Blog
+
+        version = self.version()
+        self.inner.title = "Inner page, edited"
+        self.inner.save()
+        Blog.objects.create(title="Another inner page")
+        flip_field(Blog, self.inner.pk, 'active', 'title')
+        move_item(Blog, self.inner.pk, self.front.pk, 'before')
+        self.inner.delete()
+        self.assertEqual(self.version(), version)
+        self.assertEqual(self.titles(), ["Front page"])
+
+    def test_flag_changes_add_and_remove_rows(self):
+        from blog.models import Blog
+
+        self.inner.homepage = True
+        self.inner.save()
+        self.assertEqual(self.titles(), ["Front page", "Inner page"])
+        flip_field(Blog, self.front.pk, 'active', 'title')
+        self.assertEqual(self.titles(), ["Inner page"])
+        with transaction.atomic():
+            apply_action(Blog, 'toggle', [self.front.pk, self.inner.pk], 'active')
+        self.assertEqual(self.titles(), ["Front page"])
+        self.front.delete()
+        self.assertEqual(self.titles(), [])
+
+    def test_moving_a_homepage_row_reorders_it(self):
+        from blog.models import Blog
+
+        second = Blog.objects.create(title="Second front page", homepage=True)
+        move_item(Blog, second.pk, self.front.pk, 'before')
+        self.assertEqual(self.titles(), ["Second front page", "Front page"])
+
+    def test_excerpt_is_cut_in_sql(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from blog.models import Blog
+
+        self.front.content = "<p>" + "word " * 200 + "</p>"
+        with CaptureQueriesContext(connection) as queries:
+            self.front.save()
+        rebuild = queries.captured_queries[-1]['sql']
+        self.assertIn('SUBSTR', rebuild.upper())
+        excerpt = get_snapshot(Blog)['items'][0]['excerpt']
+        self.assertLessEqual(len(excerpt), 300)
+        self.assertTrue(excerpt.endswith('…'))
+
+    def test_a_lost_snapshot_is_rebuilt_by_the_next_read(self):
+        from blog.models import Blog
+
+        cache.clear()
+        homepage._memory.clear()
+        self.assertEqual([item['title'] for item in get_snapshot(Blog)['items']], ["Front page"])
+        self.assertEqual(self.titles(), ["Front page"])
+
+
+class CacheIsolationTests(TestCase):
+    def test_tests_never_write_the_server_cache_files(self):
+        from django.core.cache import caches
+
+        from cms import settings as project_settings
+
+        for alias, config in project_settings.CACHES.items():
+            server_file = str(config['LOCATION'])
+            self.assertNotEqual(caches[alias].location, server_file)
+
+            key = f"isolation-check-{alias}"
+            caches[alias].set(key, 1)
+            if os.path.exists(server_file):
+                # Read-only, so the check itself leaves the file alone
+                with closing(sqlite3.connect(f"file:{server_file}?mode=ro", uri=True)) as db:
+                    row = db.execute("SELECT 1 FROM cache_entries WHERE key LIKE ?", [f"%{key}"]).fetchone()
+                self.assertIsNone(row)
+
+
+class ContentVersionTests(TestCase):
+    def test_one_bump_per_model_per_transaction(self):
+        from blog.models import Blog
+
+        before = get_version(Blog)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with transaction.atomic():
+                for i in range(3):
+                    bump_version(Blog)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(get_version(Blog), before + 1)
+
+    def test_rolled_back_bump_does_not_swallow_the_next_one(self):
+        from blog.models import Blog
+
+        before = get_version(Blog)
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            bump_version(Blog)
+            raise RuntimeError
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            bump_version(Blog)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(get_version(Blog), before + 1)
+
+    def test_saves_of_versioned_models_bump(self):
+        from blog.models import Blog
+
+        before = get_version(Blog)
+        with self.captureOnCommitCallbacks(execute=True):
+            Blog.objects.create(title="New post")
+        self.assertEqual(get_version(Blog), before + 1)
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'], BULK_ACTION_CHUNK_SIZE=2)
+class BulkJobTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        from django.contrib.auth.models import User
+
+        from articles.models import Article
+
+        cls.editor = User.objects.create_user('editor', password='secret')
+        cls.other = User.objects.create_user('other', password='secret')
+        cls.matching = [Article.objects.create(title=f"Match {i}", content="x") for i in range(5)]
+        cls.homepage = Article.objects.create(title="Front", content="x", show_on_homepage=True)
+        cls.unrelated = Article.objects.create(title="Unrelated", content="x")
+
+    def start(self, action):
+        """POST a select-all action for "Match" on inner pages; returns the job."""
+        self.client.force_login(self.editor)
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(
+                reverse('bulk_action', args=['article']),
+                {'select_all': '1', 'action': action, 'q': 'Match', 'homepage': 'no'},
+                HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+            )
+        self.assertEqual(response.json()['status'], 'started')
+        # The view only queues the runner; run it here as the worker would
+        self.assertEqual(len(callbacks), 1)
+        return run_bulk_job(response.json()['job_id'])
+
+    def test_select_all_delete_removes_only_matching_rows(self):
+        from articles.models import Article
+
+        job = self.start('delete')
+        self.assertEqual((job.status, job.processed, job.total), (BulkJob.STATUS_DONE, 5, 5))
+        remaining = set(Article.objects.values_list('pk', flat=True))
+        self.assertEqual(remaining, {self.homepage.pk, self.unrelated.pk})
+
+    def test_select_all_toggle_flips_only_matching_rows(self):
+        from articles.models import Article
+
+        job = self.start('toggle')
+        self.assertEqual((job.status, job.processed), (BulkJob.STATUS_DONE, 5))
+        inactive = set(Article.objects.filter(is_active=False).values_list('pk', flat=True))
+        self.assertEqual(inactive, {article.pk for article in self.matching})
+
+    def test_progress_is_only_shown_to_the_owner_and_superusers(self):
+        from django.contrib.auth.models import User
+
+        job = self.start('toggle')
+        url = reverse('bulk_progress', args=[job.pk])
+
+        self.client.force_login(self.other)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_login(self.editor)
+        self.assertEqual(self.client.get(url).json()['percent'], 100)
+
+        self.client.force_login(User.objects.create_superuser('admin', password='secret'))
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_stale_running_job_is_resumed_where_it_stopped(self):
+        from articles.models import Article
+
+        # A runner that died after the first chunk of two
+        job = BulkJob.objects.create(
+            model_name='article', action='toggle', filters={'q': 'Match', 'homepage': 'no'},
+            status=BulkJob.STATUS_RUNNING, total=5, processed=2, last_pk=self.matching[1].pk,
+            heartbeat_at=timezone.now() - timedelta(hours=1),
+        )
+        self.assertIn(job.pk, claimable_jobs().values_list('pk', flat=True))
+        job = run_bulk_job(job.pk)
+        self.assertEqual((job.status, job.processed), (BulkJob.STATUS_DONE, 5))
+        toggled = set(Article.objects.filter(is_active=False).values_list('pk', flat=True))
+        self.assertEqual(toggled, {article.pk for article in self.matching[2:]})
+
+    def test_job_with_a_live_runner_is_left_alone(self):
+        from articles.models import Article
+
+        job = BulkJob.objects.create(
+            model_name='article', action='delete', filters={},
+            status=BulkJob.STATUS_RUNNING, total=5, heartbeat_at=timezone.now(),
+        )
+        self.assertNotIn(job.pk, claimable_jobs().values_list('pk', flat=True))
+        self.assertEqual(run_bulk_job(job.pk).processed, 0)
+        self.assertEqual(Article.objects.count(), 7)
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class ToggleStatusTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        from django.contrib.auth.models import User
+
+        from articles.models import Article
+        from blog.models import Blog
+
+        cls.editor = User.objects.create_user('editor', password='secret')
+        cls.admin = User.objects.create_superuser('admin', password='secret')
+        cls.article = Article.objects.create(title="Launch", content="x")
+        cls.blog = Blog.objects.create(title="Post")
+
+    def toggle(self, model_name, pk, user=None):
+        self.client.force_login(user or self.editor)
+        return self.client.post(reverse('toggle_status', args=[model_name, pk]))
+
+    def test_flip_field_is_one_statement(self):
+        from articles.models import Article
+
+        with self.assertNumQueries(1):
+            result = flip_field(Article, self.article.pk, 'is_active', 'title')
+        self.assertEqual(result, (False, "Launch"))
+        self.assertIsNone(flip_field(Article, 10**6, 'is_active', 'title'))
+
+    def test_toggle_flips_and_touches_updated_at(self):
+        from articles.models import Article
+
+        Article.objects.filter(pk=self.article.pk).update(updated_at=timezone.now() - timedelta(days=1))
+        before = Article.objects.get(pk=self.article.pk).updated_at
+        response = self.toggle('article', self.article.pk)
+
+        self.assertEqual(response.json(), {"status": False, "message": '"Launch" status changed.'})
+        article = Article.objects.get(pk=self.article.pk)
+        self.assertFalse(article.is_active)
+        self.assertGreater(article.updated_at, before)
+
+    def test_missing_object_is_a_404_before_other_errors(self):
+        self.assertEqual(self.toggle('article', 10**6).status_code, 404)
+        # No permission for blogs, no active field for users: still 404 first
+        self.assertEqual(self.toggle('blog', 10**6).status_code, 404)
+        self.assertEqual(self.toggle('user', 10**6, user=self.admin).status_code, 404)
+
+    def test_error_responses_for_existing_objects(self):
+        self.assertEqual(self.toggle('blog', self.blog.pk).status_code, 403)
+        self.assertEqual(self.toggle('user', self.editor.pk, user=self.admin).status_code, 400)
+        self.assertEqual(self.toggle('nothing', 1).status_code, 400)
+        self.assertEqual(self.client.get(reverse('toggle_status', args=['article', self.article.pk])).status_code, 405)
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class ToggleVersionTests(TransactionTestCase):
+    # Real commits: the bump is queued for the commit of the toggle
+    def test_moves_the_content_version(self):
+        from django.contrib.auth.models import User
+
+        from articles.models import Article
+
+        article = Article.objects.create(title="Launch", content="x")
+        self.client.force_login(User.objects.create_user('editor', password='secret'))
+        before = get_version(Article)
+        self.client.post(reverse('toggle_status', args=['article', article.pk]))
+        self.assertEqual(get_version(Article), before + 1)
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class PublicApiTests(TransactionTestCase):
+    def setUp(self):
+        from articles.models import Article
+
+        cache.clear()
+        self.article = Article.objects.create(title="Live", content="<p>Body</p>", slug="live")
+        Article.objects.create(title="Hidden", content="x", slug="hidden", is_active=False)
+        self.list_url = reverse('public_list', args=['article'])
+        self.detail_url = reverse('public_detail', args=['article', 'live'])
+
+    def test_list_sends_validators(self):
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['slug'] for row in response.json()['results']], ['live'])
+        self.assertEqual(response.json()['results'][0]['excerpt'], 'Body')
+        self.assertTrue(response['ETag'].startswith('"articles.article-'))
+        self.assertIn('Last-Modified', response)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_if_none_match_gets_304_without_queries(self):
+        etag = self.client.get(self.list_url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        # Other parameters are another document
+        self.assertEqual(self.client.get(self.list_url, {'limit': 1}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_if_modified_since_gets_304(self):
+        for url in (self.list_url, self.detail_url):
+            with self.subTest(url=url):
+                modified = self.client.get(url)['Last-Modified']
+                self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=modified).status_code, 304)
+
+    def test_a_write_changes_the_etag(self):
+        etag = self.client.get(self.detail_url)['ETag']
+        self.article.title = "Edited"
+        self.article.save()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['title'], "Edited")
+
+    def test_detail_last_modified_is_the_row_update(self):
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response['Last-Modified'], http_date(self.article.updated_at.timestamp()))
+        self.assertIn('content_html', response.json())
+
+    def test_missing_inactive_and_unknown_are_404(self):
+        from articles.models import Article
+
+        for url in (
+            reverse('public_detail', args=['article', 'nope']),
+            reverse('public_detail', args=['article', 'hidden']),
+            reverse('public_list', args=['user']),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 404)
+                self.assertNotIn('ETag', response)
+        # A cached 404 doesn't outlive the row being created
+        Article.objects.create(title="Nope", content="x", slug="nope")
+        self.assertEqual(self.client.get(reverse('public_detail', args=['article', 'nope'])).status_code, 200)
+
+
+class TransferTests(TestCase):
+    def import_text(self, model, text, fmt, upsert=False, batch_size=100):
+        created = updated = 0
+        rows = (clean_row(model, row) for row in read_rows(io.StringIO(text), fmt))
+        for batch in batched(rows, batch_size):
+            rendered = [render_rich_text(row.get('content')) for row in batch]
+            counts = import_batch(model, batch, rendered, upsert)
+            created, updated = created + counts[0], updated + counts[1]
+        return created, updated
+
+    def export_text(self, model, fmt):
+        stream = io.StringIO()
+        write_rows(export_rows(model), stream, fmt, transfer_fields(model))
+        return stream.getvalue()
+
+    def test_round_trip(self):
+        from django.contrib.auth.models import User
+
+        from articles.models import Article
+
+        author = User.objects.create_user('writer')
+        Article.objects.create(title="First", content="<p>One, \"two\"\nthree</p>", author=author,
+                               show_on_homepage=True, image='articles/a.png', meta_title="Meta")
+        Article.objects.create(title="Second", content="<p>Two</p>", is_active=False)
+        for fmt in FORMATS:
+            with self.subTest(fmt=fmt):
+                exported = self.export_text(Article, fmt)
+                Article.objects.all().delete()
+                self.assertEqual(self.import_text(Article, exported, fmt), (2, 0))
+                self.assertEqual(self.export_text(Article, fmt), exported)
+                first = Article.objects.get(slug='first')
+                self.assertEqual((first.author, first.content_text), (author, 'One, "two" three'))
+
+    def test_upsert_updates_the_row_with_that_slug(self):
+        from blog.models import Blog
+
+        post = Blog.objects.create(title="Old title", content="<p>Old</p>", slug="hello")
+        Blog.objects.filter(pk=post.pk).update(updated_at=timezone.now() - timedelta(days=1))
+        line = '{"slug": "hello", "title": "New title", "content": "<p>New</p>"}\n'
+
+        self.assertEqual(self.import_text(Blog, line, 'jsonl', upsert=True), (0, 1))
+        post.refresh_from_db()
+        self.assertEqual((post.title, post.content_html), ("New title", "<p>New</p>"))
+        self.assertGreater(post.updated_at, timezone.now() - timedelta(minutes=1))
+        self.assertEqual(Blog.objects.count(), 1)
+
+        # Without --upsert the same row is a new post under a free slug
+        self.assertEqual(self.import_text(Blog, line, 'jsonl'), (1, 0))
+        self.assertTrue(Blog.objects.filter(slug='hello-1', title="New title").exists())
+
+    def test_slugs_collide_within_a_batch(self):
+        from blog.models import Blog
+
+        Blog.objects.create(title="Post")
+        text = 'title,content\nPost,a\nPost,b\nPost,c\n'
+        self.assertEqual(self.import_text(Blog, text, 'csv'), (3, 0))
+        self.assertEqual(
+            list(Blog.objects.order_by('position').values_list('slug', flat=True)),
+            ['post', 'post-1', 'post-2', 'post-3'],
+        )
+        # The same slug twice in one upsert batch: the later row wins
+        text = '{"slug": "dup", "title": "A"}\n{"slug": "dup", "title": "B"}\n'
+        self.assertEqual(self.import_text(Blog, text, 'jsonl', upsert=True), (1, 0))
+        self.assertEqual(Blog.objects.get(slug='dup').title, "B")
+
+    def test_imported_rows_take_one_block_of_positions(self):
+        from blog.models import Blog
+
+        last = Blog.objects.create(title="Existing").position
+        text = ''.join(f'{{"title": "Row {i}"}}\n' for i in range(5))
+        self.import_text(Blog, text, 'jsonl', batch_size=2)
+        positions = list(Blog.objects.exclude(title="Existing").order_by('pk').values_list('position', flat=True))
+        self.assertEqual(positions, [last + (i + 1) * POSITION_GAP for i in range(5)])
+        self.assertGreater(Blog.objects.create(title="After").position, positions[-1])
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'], PUBLIC_SITE_URL='https://example.com')
+class SyndicationTests(TransactionTestCase):
+    def setUp(self):
+        from articles.models import Article
+        from blog.models import Blog
+
+        cache.clear()
+        self.articles = [Article.objects.create(title=f"Article {i}", content=f"<p>Body {i}</p>") for i in range(2)]
+        Article.objects.create(title="Hidden", content="x", is_active=False)
+        self.articles.append(Article.objects.create(title="Article 2", content="<p>Body 2</p>"))
+        self.blogs = [Blog.objects.create(title=f"Post {i}", content="x") for i in range(2)]
+
+    def get(self, url, **headers):
+        response = self.client.get(url, **headers)
+        content = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, content.decode()
+
+    def locs(self, xml):
+        return re.findall(r'<loc>([^<]+)</loc>', xml)
+
+    def all_urls(self):
+        return {f"https://example.com/articles/{a.slug}/" for a in self.articles} | {
+            f"https://example.com/blog/{b.slug}/" for b in self.blogs
+        }
+
+    def test_small_sitemap_is_one_urlset(self):
+        response, xml = self.get(reverse('sitemap'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('<urlset', xml)
+        self.assertEqual(set(self.locs(xml)), self.all_urls())
+        self.assertNotIn('hidden', xml)
+
+    @override_settings(SITEMAP_MAX_URLS=2)
+    def test_large_sitemap_is_an_index_of_shards(self):
+        _response, xml = self.get(reverse('sitemap'))
+        self.assertIn('<sitemapindex', xml)
+        shards = self.locs(xml)
+        self.assertEqual(shards, [
+            'http://testserver' + reverse('sitemap_shard', args=[name, page])
+            for name, page in (('article', 1), ('article', 2), ('blog', 1))
+        ])
+
+        urls = []
+        for shard in shards:
+            response, xml = self.get(shard)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(self.locs(xml)), 2)
+            urls += self.locs(xml)
+        self.assertEqual(sorted(urls), sorted(self.all_urls()))
+
+    @override_settings(SITEMAP_MAX_URLS=2)
+    def test_shard_bounds_skip_inactive_rows(self):
+        # Shards start at the 1st and 3rd active pk; the hidden row between doesn't count
+        self.assertEqual(shard_bounds('article'), (3, [self.articles[0].pk, self.articles[2].pk]))
+        self.assertEqual(self.client.get(reverse('sitemap_shard', args=['article', 3])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('sitemap_shard', args=['user', 1])).status_code, 404)
+
+    def test_feed_etag_follows_content(self):
+        for name in ('feed_rss', 'feed_atom'):
+            with self.subTest(feed=name):
+                url = reverse(name, args=['article'])
+                response, xml = self.get(url)
+                etag = response['ETag']
+                self.assertIn('Article 2', xml)
+                self.assertNotIn('Hidden', xml)
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+                self.articles[0].title = f"Renamed for {name}"
+                self.articles[0].save()
+                response, xml = self.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+                self.assertIn(f"Renamed for {name}", xml)
@@ -0,0 +1,59 @@
+from django.db.models.signals import post_init, post_save
+
+# Marker for "value was never loaded" (deferred field or instance built by hand)
+NOT_LOADED = object()
+
+
+def _value_of(instance, attname):
+    # Read __dict__ directly: getattr() on a deferred field would issue a query
+    value = instance.__dict__.get(attname, NOT_LOADED)
+    if value is NOT_LOADED or value is None:
+        return value
+    # FieldFile / ImageFieldFile -> stored name
+    return getattr(value, 'name', value)
+
+
+def _snapshot(instance, attnames):
+    instance._tracked_originals = {
+        attname: _value_of(instance, attname) for attname in attnames
+    }
+
+
+def track_fields(model, attnames):
+    """
+    Remember the value of `attnames` as loaded from the database (post_init
+    runs inside Model.from_db), so change detection needs no extra SELECT.
+    The snapshot is refreshed after every save.
+    """
+    attnames = tuple(attnames)
+    existing = getattr(model, '_tracked_attnames', ())
+    model._tracked_attnames = tuple(dict.fromkeys(existing + attnames))
+
+    def on_init(sender, instance, **kwargs):
+        _snapshot(instance, sender._tracked_attnames)
+
+    def on_save(sender, instance, raw=False, **kwargs):
+        _snapshot(instance, sender._tracked_attnames)
+
+    # weak=False: the closures would otherwise be garbage-collected right away
+    post_init.connect(on_init, sender=model, weak=False, dispatch_uid=f'track_fields:init:{model._meta.label}')
+    post_save.connect(on_save, sender=model, weak=False, dispatch_uid=f'track_fields:save:{model._meta.label}')
+
+
+def original_value(instance, attname):
+    """The value `attname` had when the instance was loaded, or NOT_LOADED."""
+    originals = getattr(instance, '_tracked_originals', None)
+    if originals is None:
+        return NOT_LOADED
+    return originals.get(attname, NOT_LOADED)
+
+
+def current_value(instance, attname):
+    return _value_of(instance, attname)
+
+
+def has_changed(instance, attname):
+    original = original_value(instance, attname)
+    if original is NOT_LOADED:
+        return True
+    return original != current_value(instance, attname)
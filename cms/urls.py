@@ -15,9 +15,12 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.contrib.admin.views.decorators import staff_member_required
+from django.urls import path, re_path, include
 from accounts.views import login_view, logout_view
-from .views import dashboard, toggle_status,delete_object,bulk_action,update_order,ajax_check_slug
+from .views import dashboard, toggle_status,delete_object,bulk_action,bulk_progress,update_order,move_item_view,ajax_check_slug,ajax_check_slugs,ckeditor_upload,image_rendition
+from .api import list_api, public_detail, public_homepage, public_list
+from .syndication import feed, sitemap, sitemap_shard
 from django.conf import settings
 from django.conf.urls.static import static
 
@@ -28,9 +31,18 @@ urlpatterns = [
     path('blog/', include('blog.urls')),
 
 
+    # Same route as ckeditor_uploader's, matched first so uploads get image validation
+    re_path(r'^ckeditor/upload/', staff_member_required(ckeditor_upload), name='ckeditor_upload'),
     path('ckeditor/', include('ckeditor_uploader.urls')), 
 
 
+    # Resized renditions; must come before the DEBUG media route below
+    re_path(
+        r'^' + settings.MEDIA_URL.lstrip('/') + r'r/(?P<width>\d+)x(?P<height>\d+)/(?P<path>.+)$',
+        image_rendition,
+        name='image_rendition',
+    ),
+
     path('admin/', admin.site.urls),
     path("login/", login_view, name="login"),
     path("logout/", logout_view, name="logout"),
@@ -42,8 +54,19 @@ urlpatterns = [
     path('toggle-status/<str:model_name>/<int:pk>/', toggle_status, name='toggle_status'),
     path("delete_object/<str:model_name>/<int:pk>/", delete_object, name="delete_object"),
     path('bulk/<str:model_name>/', bulk_action, name='bulk_action'),
+    path('bulk/progress/<int:job_id>/', bulk_progress, name='bulk_progress'),
     path('sort/<str:model_name>/', update_order, name='sort'),
+    path('move/<str:model_name>/', move_item_view, name='move_item'),
      path('ajax/check-slug/<str:model_name>/', ajax_check_slug, name='ajax_check_slug'),
+     path('ajax/check-slugs/<str:model_name>/', ajax_check_slugs, name='ajax_check_slugs'),
+    path('api/<str:model_name>/', list_api, name='list_api'),
+    path('api/public/homepage/', public_homepage, name='public_homepage'),
+    path('api/public/<str:model_name>/', public_list, name='public_list'),
+    path('api/public/<str:model_name>/<str:slug>/', public_detail, name='public_detail'),
+    path('sitemap.xml', sitemap, name='sitemap'),
+    path('sitemap-<str:model_name>-<int:page>.xml', sitemap_shard, name='sitemap_shard'),
+    path('feeds/<str:model_name>.rss', feed, {'kind': 'rss'}, name='feed_rss'),
+    path('feeds/<str:model_name>.atom', feed, {'kind': 'atom'}, name='feed_atom'),
     
 
 
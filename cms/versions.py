@@ -0,0 +1,109 @@
+"""
+Per-model content version counters.
+
+Every write to a content model (save, delete, toggle, reorder, bulk action)
+bumps a counter in the shared cache once its transaction commits. Anything
+derived from the table (cached counts, rendered partials, ETags) puts the
+version in its cache key, so it goes stale the moment the data changes
+without having to find and delete individual entries.
+"""
+import threading
+import time
+import weakref
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Max
+from django.db.models.signals import post_delete, post_save
+
+# Models with derived data (counts, partials, ETags, snapshots, feeds) cached
+# against their version; add a model here before caching anything for it
+VERSIONED_MODELS = {"articles.article", "blog.blog"}
+
+# Per thread: key -> the on_commit callback queued for it in the current
+# transaction. Weak values: when a rollback makes Django drop the callback,
+# its entry goes too, so the next write in a new transaction queues again.
+_pending = threading.local()
+
+
+def has_versions(model):
+    return model._meta.label_lower in VERSIONED_MODELS
+
+
+def version_key(model):
+    return f"content-version:{model._meta.label_lower}"
+
+
+def changed_key(model):
+    return f"content-changed:{model._meta.label_lower}"
+
+
+def get_version(model):
+    version = cache.get(version_key(model))
+    if version is None:
+        cache.add(version_key(model), 1, timeout=None)
+        version = cache.get(version_key(model), 1)
+    return version
+
+
+def last_changed(model):
+    """
+    Unix time of the last committed write to `model` (for Last-Modified).
+    If the cache lost it, falls back to the newest auto_now column value.
+    """
+    changed = cache.get(changed_key(model))
+    if changed is None:
+        auto_now = [f.name for f in model._meta.concrete_fields if getattr(f, 'auto_now', False)]
+        newest = model._default_manager.aggregate(newest=Max(auto_now[0]))['newest'] if auto_now else None
+        changed = newest.timestamp() if newest else time.time()
+        cache.add(changed_key(model), changed, timeout=None)
+    return changed
+
+
+def _bump(model):
+    try:
+        cache.incr(version_key(model))
+    except ValueError:
+        cache.add(version_key(model), 1, timeout=None)
+    cache.set(changed_key(model), time.time(), timeout=None)
+
+
+def on_commit_once(key, func):
+    """
+    Run func() once the current transaction commits, however many times
+    it is queued under `key` meanwhile; right away outside a transaction.
+    """
+    if not connection.in_atomic_block:
+        func()
+        return
+
+    pending = getattr(_pending, 'callbacks', None)
+    if pending is None:
+        pending = _pending.callbacks = weakref.WeakValueDictionary()
+    if key in pending:
+        return
+
+    def on_commit():
+        pending.pop(key, None)
+        func()
+
+    pending[key] = on_commit
+    transaction.on_commit(on_commit)
+
+
+def bump_version(model):
+    """
+    Mark `model`'s content as changed. Inside a transaction this happens on
+    commit, once per model however many rows were written.
+    """
+    on_commit_once(f"version:{model._meta.label_lower}", lambda: _bump(model))
+
+
+def _on_write(sender, raw=False, **kwargs):
+    if not raw:
+        bump_version(sender)
+
+
+def connect_versioning(model):
+    post_save.connect(_on_write, sender=model, dispatch_uid=f'versions:save:{model._meta.label}')
+    post_delete.connect(_on_write, sender=model, dispatch_uid=f'versions:delete:{model._meta.label}')
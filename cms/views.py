@@ -1,18 +1,36 @@
 import json
 import logging
+import os
 
 from django.shortcuts import render, get_object_or_404, redirect
-from django.db.models import Case, When, Value, BooleanField
-from django.http import JsonResponse
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, JsonResponse
 from django.contrib.auth.decorators import login_required
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_GET, require_POST
 from django.db import transaction
 from django.contrib.auth import get_user_model
 from django.contrib import messages
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils.html import escapejs
+from django.views.decorators.csrf import csrf_exempt
+from django.urls import reverse
+from django.utils.text import slugify
+from django.utils.http import http_date
+from django.views.static import was_modified_since
 from django_ratelimit.decorators import ratelimit
+from ckeditor_uploader import views as ckeditor_views
 
 from articles.models import Article
 from blog.models import Blog
+from .bulk import apply_action_to_ids, flip_field, start_bulk_job
+from .homepage import affects_homepage, homepage_changed
+from .images import is_image_upload, validate_image
+from .listing import filter_params
+from .models import BulkJob
+from .ordering import move_item
+from .renditions import get_rendition
+from .slugs import get_slug_index
+from .versions import bump_version
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -29,11 +47,20 @@ ACTIVE_FIELD_MAP = {
     "article": "is_active",
     "blog": "active",
 }
+MAX_SLUG_BATCH = 20
 
 def redirect_back(request, default='/'):
     """Redirect to previous page or default"""
     return redirect(request.META.get('HTTP_REFERER', default))
 
+def get_label_field(model_class):
+    """Column used as an object's display name"""
+    field_names = {f.name for f in model_class._meta.fields}
+    for name in ('title', 'username'):
+        if name in field_names:
+            return name
+    return model_class._meta.pk.name
+
 def get_obj_name(obj):
     """Return a display name for object"""
     return getattr(obj, 'title', getattr(obj, 'username', str(obj)))
@@ -79,24 +106,27 @@ def toggle_status(request, model_name, pk):
     if not model_class:
         return JsonResponse({"error": "Invalid model"}, status=400)
 
-    obj = get_object_or_404(model_class, pk=pk)
-
+    # A missing object is a 404 before the other errors, as when the row was
+    # fetched first; only the error paths pay for the lookup
     if not check_user_permission(request, model_class, action="change"):
+        get_object_or_404(model_class.objects.only('pk'), pk=pk)
         return JsonResponse({"error": "Permission denied"}, status=403)
 
     # Determine the active field dynamically
     active_field = ACTIVE_FIELD_MAP.get(model_name.lower())
     if not active_field:
+        get_object_or_404(model_class.objects.only('pk'), pk=pk)
         return JsonResponse({"error": "This model does not support status toggling"}, status=400)
 
-    # Toggle the field dynamically
-    current_status = getattr(obj, active_field)
-    setattr(obj, active_field, not current_status)
-    obj.save(update_fields=[active_field])
+    # Flip the flag in SQL: one round trip, no row fetch, no lost updates
+    result = flip_field(model_class, pk, active_field, get_label_field(model_class))
+    if result is None:
+        raise Http404("No object found")
 
+    new_status, name = result
     return JsonResponse({
-        "status": not current_status,
-        "message": f'"{get_obj_name(obj)}" status changed.'
+        "status": new_status,
+        "message": f'"{name}" status changed.'
     })
 
 
@@ -141,44 +171,77 @@ def bulk_action(request, model_name):
 
     selected_ids = request.POST.getlist("selected_ids") or request.POST.get("ids", "").split(',')
     selected_ids = [id_val for id_val in selected_ids if id_val]
+    # "Select all N matching": the filter is sent instead of every id
+    select_all = request.POST.get("select_all") == "1"
 
-    if not selected_ids:
+    if not selected_ids and not select_all:
         messages.warning(request, "No items selected.")
         return redirect_back(request)
 
-    action = request.POST.get("action") or ("delete" if request.POST.get("ids") else None)
-    queryset = model_class.objects.filter(pk__in=selected_ids)
+    action = request.POST.get("action") or ("delete" if request.POST.get("ids") or select_all else None)
+    if action not in ("toggle", "delete"):
+        messages.error(request, "Invalid action.")
+        return redirect_back(request)
 
-    if action == "toggle":
-        active_field = ACTIVE_FIELD_MAP.get(model_name.lower())
+    active_field = ACTIVE_FIELD_MAP.get(model_name.lower())
+    if action == "toggle" and not active_field:
+        messages.error(request, "This model does not support status toggling.")
+        return redirect_back(request)
+
+    if select_all:
+        job = BulkJob.objects.create(
+            model_name=model_name.lower(),
+            action=action,
+            filters=filter_params(model_name, request.POST),
+            created_by=request.user,
+        )
+        start_bulk_job(job)
+        progress_url = reverse('bulk_progress', args=[job.pk])
+
+        if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+            return JsonResponse({"status": "started", "job_id": job.pk, "progress_url": progress_url})
 
-        if not active_field:
-            messages.error(request, "This model does not support status toggling.")
-            return redirect_back(request)
+        messages.info(request, f"Bulk {action} of all matching {model_name}(s) started in the background.")
+        return redirect_back(request)
+
+    try:
+        selected_ids = [int(id_val) for id_val in selected_ids]
+    except ValueError:
+        messages.error(request, "Invalid selection.")
+        return redirect_back(request)
 
-        queryset.update(**{
-            active_field: Case(
-                When(**{active_field: True}, then=Value(False)),
-                When(**{active_field: False}, then=Value(True)),
-                output_field=BooleanField(),
-            )
-        })
+    # Chunked, so large selections stay under SQLite's bound-variable limit
+    count = apply_action_to_ids(model_class, action, selected_ids, active_field)
 
+    if action == "toggle":
         messages.success(
             request,
-            f"{queryset.count()} {model_name}(s) status toggled."
+            f"{count} {model_name}(s) status toggled."
         )
-    elif action == "delete":
-        count = queryset.count()
-        queryset.delete()
-        messages.success(request, f"{count} {model_name}(s) deleted successfully.")
-
     else:
-        messages.error(request, "Invalid action.")
+        messages.success(request, f"{count} {model_name}(s) deleted successfully.")
 
     return redirect_back(request)
 
 
+@login_required
+def bulk_progress(request, job_id):
+    """Progress of a filter-based bulk job, polled by the list page"""
+    job = get_object_or_404(BulkJob, pk=job_id)
+
+    if job.created_by_id != request.user.id and not request.user.is_superuser:
+        return JsonResponse({"error": "Permission denied"}, status=403)
+
+    return JsonResponse({
+        "status": job.status,
+        "action": job.action,
+        "processed": job.processed,
+        "total": job.total,
+        "percent": job.percent,
+        "error": job.error,
+    })
+
+
 @ratelimit(key='user', rate='60/m', method='POST')
 @login_required
 @require_POST
@@ -202,21 +265,27 @@ def update_order(request, model_name):
         except (TypeError, ValueError):
             return JsonResponse({'status': 'error', 'message': 'Invalid ID format'}, status=400)
 
-        # Get objects and create mapping
-        objs = model_class.objects.filter(id__in=order)
+        # Only the current page is sent, so reuse the positions these rows
+        # already occupy instead of renumbering from 0 (which collides
+        # with rows on other pages)
+        objs = list(model_class.objects.filter(id__in=order))
         obj_map = {obj.id: obj for obj in objs}
+        slots = sorted(obj.position for obj in objs)
 
         # Update positions
         updated_objs = []
-        for position, obj_id in enumerate(order):
+        for obj_id in order:
             if obj_id in obj_map:
-                obj = obj_map[obj_id]
-                obj.position = position
+                obj = obj_map.pop(obj_id)
+                obj.position = slots[len(updated_objs)]
                 updated_objs.append(obj)
 
         # Bulk update in transaction
         with transaction.atomic():
             model_class.objects.bulk_update(updated_objs, ['position'])
+            bump_version(model_class)
+            if any(affects_homepage(model_class, vars(obj)) for obj in updated_objs):
+                homepage_changed(model_class)
 
         return JsonResponse({'status': 'success'})
 
@@ -226,59 +295,170 @@ def update_order(request, model_name):
     except Exception as e:
         logger.error(f"Error updating order: {e}")
         return JsonResponse({'status': 'error', 'message': 'Failed to update order'}, status=500)
-    
 
-    
-@ratelimit(key='user', rate='30/m', method='GET')
+
+@ratelimit(key='user', rate='60/m', method='POST')
 @login_required
-def ajax_check_slug(request, model_name):
+@require_POST
+def move_item_view(request, model_name):
+    """Move one row before/after another; updates a single row in the common case"""
     model_class = MODEL_MAP.get(model_name.lower())
     if not model_class:
-        return JsonResponse({
-            "error": "Invalid model",
-            "slug": "",
-            "exists": False
-        }, status=400)
+        return JsonResponse({'status': 'error', 'message': 'Invalid model type'}, status=400)
+
+    if not check_user_permission(request, model_class, action="change"):
+        return JsonResponse({'status': 'error', 'message': 'Permission denied'}, status=403)
+
+    if not any(f.name == 'position' for f in model_class._meta.fields):
+        return JsonResponse({'status': 'error', 'message': 'This model does not support ordering'}, status=400)
+
+    try:
+        data = json.loads(request.body)
+        obj_id = int(data.get('id'))
+        target_id = int(data.get('target'))
+        place = data.get('place', 'before')
+    except json.JSONDecodeError:
+        return JsonResponse({'status': 'error', 'message': 'Invalid JSON'}, status=400)
+    except (TypeError, ValueError):
+        return JsonResponse({'status': 'error', 'message': 'Invalid ID format'}, status=400)
+
+    if place not in ('before', 'after') or obj_id == target_id:
+        return JsonResponse({'status': 'error', 'message': 'Invalid move'}, status=400)
+
+    try:
+        position = move_item(model_class, obj_id, target_id, place)
+    except model_class.DoesNotExist:
+        return JsonResponse({'status': 'error', 'message': 'Item not found'}, status=404)
+    except Exception as e:
+        logger.error(f"Error moving item: {e}")
+        return JsonResponse({'status': 'error', 'message': 'Failed to move item'}, status=500)
+
+    return JsonResponse({'status': 'success', 'position': position})
+
     
+def _slug_check_error(message):
+    return JsonResponse({
+        "error": message,
+        "slug": "",
+        "exists": False
+    }, status=400)
+
+
+def _slug_model(model_name):
+    """Return (model_class, error_response) for slug-check endpoints"""
+    model_class = MODEL_MAP.get(model_name.lower())
+    if not model_class:
+        return None, _slug_check_error("Invalid model")
+
     # Check if model has slug field
     if not hasattr(model_class, 'slug'):
-        return JsonResponse({
-            "error": f"{model_name} does not have a slug field",
-            "slug": "",
-            "exists": False
-        }, status=400)
+        return None, _slug_check_error(f"{model_name} does not have a slug field")
+
+    return model_class, None
+
+
+def _object_id(request):
+    object_id = request.GET.get("object_id", "").strip()
+    return int(object_id) if object_id.isdigit() else None
+
+
+def _check_slug(index, slug, object_id):
+    exists = index.is_taken(slug, exclude_pk=object_id)
+    return {
+        "slug": slug,
+        "exists": exists,
+        "suggestion": index.suggest(slug, exclude_pk=object_id) if exists else slug,
+    }
+
+
+# Answered from the in-memory slug index (no DB query), so the limit can be generous
+@ratelimit(key='user', rate='120/m', method='GET')
+@login_required
+def ajax_check_slug(request, model_name):
+    model_class, error = _slug_model(model_name)
+    if error:
+        return error
     
     # Get slug directly from request (not title)
     slug = request.GET.get("slug", "").strip()
-    object_id = request.GET.get("object_id", "").strip()
     
     # Validate inputs
     if not slug:
-        return JsonResponse({
-            "error": "Slug is required",
-            "slug": "",
-            "exists": False
-        }, status=400)
+        return _slug_check_error("Slug is required")
     
     # Slugify the input to ensure it's valid
-    from django.utils.text import slugify
     slug = slugify(slug)
     
     if not slug:
-        return JsonResponse({
-            "error": "Invalid slug format",
-            "slug": "",
-            "exists": False
-        }, status=400)
-    
-    # Check if slug exists in database
-    qs = model_class.objects.filter(slug=slug)
-    
-    # Exclude current object if editing
-    if object_id and object_id.isdigit():
-        qs = qs.exclude(pk=int(object_id))
+        return _slug_check_error("Invalid slug format")
     
+    index = get_slug_index(model_class)
+    return JsonResponse(_check_slug(index, slug, _object_id(request)))
+
+
+@ratelimit(key='user', rate='60/m', method='GET')
+@login_required
+def ajax_check_slugs(request, model_name):
+    """Batch form: ?slug=a&slug=b&... checked in one round trip"""
+    model_class, error = _slug_model(model_name)
+    if error:
+        return error
+
+    candidates = [slugify(s.strip()) for s in request.GET.getlist("slug")][:MAX_SLUG_BATCH]
+    candidates = [s for s in dict.fromkeys(candidates) if s]
+    if not candidates:
+        return _slug_check_error("Slug is required")
+
+    index = get_slug_index(model_class)
+    object_id = _object_id(request)
     return JsonResponse({
-        "slug": slug,
-        "exists": qs.exists()
-    })
\ No newline at end of file
+        "results": [_check_slug(index, slug, object_id) for slug in candidates]
+    })
+
+
+# -------------------------
+# CKEditor uploads
+# -------------------------
+def _ckeditor_upload_error(request, message):
+    """Error in the format the CKEditor upload dialog / uploadimage plugin expects"""
+    func_num = request.GET.get("CKEditorFuncNum")
+    if func_num:
+        return HttpResponse(
+            "<script type='text/javascript'>"
+            f"window.parent.CKEDITOR.tools.callFunction({escapejs(func_num)}, '', '{escapejs(message)}');"
+            "</script>"
+        )
+    return JsonResponse({"uploaded": 0, "error": {"message": message}})
+
+
+@csrf_exempt
+def ckeditor_upload(request):
+    """ckeditor_uploader's upload view, with images run through the same checks as article images"""
+    upload = request.FILES.get("upload")
+    allow_nonimages = getattr(settings, "CKEDITOR_ALLOW_NONIMAGE_FILES", True)
+    if upload and (is_image_upload(upload) or not allow_nonimages):
+        try:
+            validate_image(upload)
+        except ValidationError as e:
+            return _ckeditor_upload_error(request, e.messages[0])
+    return ckeditor_views.upload(request)
+
+
+# -------------------------
+# Image renditions
+# -------------------------
+@require_GET
+def image_rendition(request, width, height, path):
+    """Resized WebP of an upload, generated on first request and served from the rendition cache"""
+    target = get_rendition(path, int(width), int(height))
+    if target is None:
+        raise Http404("No such image")
+
+    stat = os.stat(target)
+    if not was_modified_since(request.META.get("HTTP_IF_MODIFIED_SINCE"), stat.st_mtime):
+        return HttpResponseNotModified()
+
+    response = FileResponse(open(target, "rb"), content_type="image/webp")
+    response["Last-Modified"] = http_date(stat.st_mtime)
+    response["Cache-Control"] = f"public, max-age={getattr(settings, 'IMAGE_RENDITION_MAX_AGE', 86400)}"
+    return response
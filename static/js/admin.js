@@ -128,9 +128,23 @@ function openDeleteModal(modelName, itemNameOrCount, url, isBulk = false) {
     if (!modal || !form) return;
 
     // Clear old hidden inputs
-    form.querySelectorAll('input[name="ids"]').forEach(i => i.remove());
+    form.querySelectorAll('input[name="ids"], input.bulk-filter').forEach(i => i.remove());
     
-    if (isBulk) {
+    if (isBulk && isSelectAllMatching()) {
+        // Post the list filter instead of ids; the server runs it as a chunked job
+        const banner = document.getElementById('select-all-banner');
+        modalText.innerText = `Are you sure you want to delete all ${banner.dataset.total} matching ${modelName}(s)?`;
+
+        document.querySelectorAll('#bulk-form input[name="select_all"], #bulk-form input[name="q"], #bulk-form input[name="homepage"]')
+            .forEach(source => {
+                const input = document.createElement('input');
+                input.type = 'hidden';
+                input.name = source.name;
+                input.value = source.value;
+                input.className = 'bulk-filter';
+                form.appendChild(input);
+            });
+    } else if (isBulk) {
         const selected = Array.from(document.querySelectorAll('.row-checkbox:checked'))
                               .map(cb => cb.value);
         if (!selected.length) {
@@ -154,6 +168,79 @@ function openDeleteModal(modelName, itemNameOrCount, url, isBulk = false) {
     setTimeout(() => modal.classList.add('show'), 10);
 }
 
+/**
+ * "Select all N matching" mode for bulk actions
+ */
+function isSelectAllMatching() {
+    const flag = document.getElementById('select-all-matching');
+    return !!flag && flag.value === '1';
+}
+
+function resetSelectAllMatching() {
+    const flag = document.getElementById('select-all-matching');
+    const banner = document.getElementById('select-all-banner');
+    if (flag) flag.value = '0';
+    if (banner) banner.style.display = 'none';
+}
+
+/**
+ * Start a filter-based bulk job and poll its progress until it finishes
+ */
+function runBulkJob(form, action) {
+    const data = new FormData(form);
+    data.set('action', action);
+
+    fetch(form.action, {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': getCSRFToken(),
+            'X-Requested-With': 'XMLHttpRequest'
+        },
+        body: data
+    })
+    .then(res => res.json())
+    .then(job => {
+        if (!job.progress_url) throw new Error('Bulk job was not started');
+        closeDeleteModal();
+        pollBulkJob(job.progress_url);
+    })
+    .catch(err => {
+        console.error("Bulk action failed:", err);
+        showFlashMessage('Bulk action failed. Please try again.', 'error');
+    });
+}
+
+function pollBulkJob(url) {
+    const container = document.getElementById('messages-container');
+    let status = document.getElementById('bulk-progress');
+    if (!status && container) {
+        status = document.createElement('div');
+        status.id = 'bulk-progress';
+        status.className = 'message info';
+        container.appendChild(status);
+    }
+
+    const timer = setInterval(() => {
+        fetch(url, { headers: { 'X-Requested-With': 'XMLHttpRequest' } })
+            .then(res => res.json())
+            .then(job => {
+                if (status) status.innerText = `Working... ${job.percent}% (${job.processed} of ${job.total})`;
+
+                if (job.status === 'done' || job.status === 'failed') {
+                    clearInterval(timer);
+                    if (status) status.remove();
+                    if (job.status === 'done') {
+                        showFlashMessage(`${job.processed} item(s) processed.`, 'success');
+                        setTimeout(() => window.location.reload(), 800);
+                    } else {
+                        showFlashMessage(`Bulk action failed: ${job.error}`, 'error');
+                    }
+                }
+            })
+            .catch(err => console.error("Progress check failed:", err));
+    }, 1000);
+}
+
 function closeDeleteModal() {
     const modal = document.getElementById('deleteModal');
     if (!modal) return;
@@ -340,7 +427,9 @@ function setFormAction(action) {
                 
                 if (slugMessage) {
                     if (data.exists) {
-                        slugMessage.textContent = `❌ Slug already in use`;
+                        slugMessage.textContent = data.suggestion
+                            ? `❌ Slug already in use (try "${data.suggestion}")`
+                            : `❌ Slug already in use`;
                         slugMessage.style.color = "#dc2626";
                     } else {
                         slugMessage.textContent = `✅ Slug available`;
@@ -416,25 +505,34 @@ function setFormAction(action) {
                 el.sortableInstance.destroy();
             }
 
-            const updateUrl = el.dataset.updateUrl;
-            
+            const moveUrl = el.dataset.moveUrl;
+
             el.sortableInstance = Sortable.create(el, {
                 handle: '.drag-handle',
                 animation: 150,
-                onEnd: function() {
-                    if (!updateUrl) return;
-                    const order = Array.from(el.querySelectorAll('tr'))
-                        .map(row => parseInt(row.getAttribute('data-id')))
-                        .filter(n => !isNaN(n));
-
-                    fetch(updateUrl, {
+                onEnd: function(evt) {
+                    if (!moveUrl || evt.oldIndex === evt.newIndex) return;
+
+                    // Send only "move X before/after its new neighbour" so a
+                    // single row is updated and other pages keep their order
+                    const row = evt.item;
+                    const next = row.nextElementSibling;
+                    const prev = row.previousElementSibling;
+                    const target = next || prev;
+                    if (!target) return;
+
+                    fetch(moveUrl, {
                         method: 'POST',
                         headers: {
                             'Content-Type': 'application/json',
                             'X-CSRFToken': getCSRFToken(),
                             'X-Requested-With': 'XMLHttpRequest'
                         },
-                        body: JSON.stringify({ order: order })
+                        body: JSON.stringify({
+                            id: parseInt(row.getAttribute('data-id')),
+                            target: parseInt(target.getAttribute('data-id')),
+                            place: next ? 'before' : 'after'
+                        })
                     }).then(res => res.json())
                     .then(data => console.log('Order update:', data.status));
                 }
@@ -644,9 +742,17 @@ document.addEventListener('change', function (e) {
     // Select-all checkbox
     if (e.target && e.target.id === 'select-all') {
         const checked = e.target.checked;
-        document.querySelectorAll('.row-checkbox').forEach(cb => {
+        const rows = document.querySelectorAll('.row-checkbox');
+        rows.forEach(cb => {
             cb.checked = checked;
         });
+
+        // Offer "select all N matching" when there are more rows than on this page
+        const banner = document.getElementById('select-all-banner');
+        resetSelectAllMatching();
+        if (banner && checked && parseInt(banner.dataset.total) > rows.length) {
+            banner.style.display = 'block';
+        }
     }
 
     // Individual row checkbox (keeps select-all in sync)
@@ -655,9 +761,37 @@ document.addEventListener('change', function (e) {
         const checked = document.querySelectorAll('.row-checkbox:checked');
         const selectAll = document.getElementById('select-all');
 
+        if (!e.target.checked) resetSelectAllMatching();
+
         if (!selectAll) return;
 
         selectAll.checked = all.length === checked.length;
         selectAll.indeterminate = checked.length > 0 && checked.length < all.length;
     }
+});
+
+document.addEventListener('click', function (e) {
+    const link = e.target && e.target.closest && e.target.closest('#select-all-matching-link');
+    if (!link) return;
+    e.preventDefault();
+
+    const flag = document.getElementById('select-all-matching');
+    const banner = document.getElementById('select-all-banner');
+    if (!flag || !banner) return;
+
+    flag.value = '1';
+    banner.innerText = `All ${banner.dataset.total} matching ${banner.dataset.label} are selected.`;
+});
+
+// Bulk forms in "select all matching" mode run as a background job with progress
+document.addEventListener('submit', function (e) {
+    const form = e.target;
+    if (!form || (form.id !== 'bulk-form' && form.id !== 'deleteForm')) return;
+
+    const selectAll = form.querySelector('input[name="select_all"]');
+    if (!selectAll || selectAll.value !== '1') return;
+
+    e.preventDefault();
+    const action = form.id === 'deleteForm' ? 'delete' : ((e.submitter && e.submitter.value) || 'toggle');
+    runBulkJob(form, action);
 });
\ No newline at end of file
@@ -1,8 +1,9 @@
 (function () {
     let ajaxController = null;
-    const container = document.getElementById('articles-list-container');
+    // Shared by the article and blog lists
+    const container = document.querySelector('[data-list-container]');
     const loader = document.getElementById('ajax-loader');
-    const searchInput = document.getElementById('article-search');
+    const searchInput = document.querySelector('[data-list-search]');
     const perPageSelect = document.querySelector('#per-page-form select[name="per_page"]');
     const homepageSelect = document.querySelector('#homepage-filter-form select[name="homepage"]');
 